@@ -1,19 +1,26 @@
 import click
 import os
-from rich.console import Console
-from rich.table import Table
+from cli.utils.console import console
 from sqlmodel import select
 from cli.db.session import get_session
 from cli.db.models import Asset, Project
+from cli.utils.listing import list_options
 
-console = Console()
 
 @click.command("asset")
 @click.argument("name", required=False)
 @click.option("--destination", help="Destination path")
 @click.option("--project", help="Project name")
 @click.option("--overwrite", is_flag=True, help="Overwrite existing file")
-def asset(name, destination, project, overwrite):
+@click.option(
+    "--link",
+    type=click.Choice(["copy", "hardlink", "symlink", "reflink"], case_sensitive=False),
+    default="copy",
+    show_default=True,
+    help="How to materialize the asset (linked modes share a cached copy)",
+)
+@list_options
+def asset(name, destination, project, overwrite, link, limit, offset, sort, name_filter, list_format):
     """Copies the specified asset (or lists assets if no name)."""
     
     with get_session() as session:
@@ -28,29 +35,15 @@ def asset(name, destination, project, overwrite):
 
         if not name:
             # LIST MODE
-            query = select(Asset)
-            if project_id:
-                query = query.where(Asset.project_id == project_id)
-            else:
-                query = query.where(Asset.project_id == None)
-            
-            assets = session.exec(query).all()
-            
-            title = f"Assets ({project if project else 'Unassigned'})"
-            table = Table(title=title)
-            table.add_column("ID", justify="right", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Source Path", style="dim")
-            
-            for a in assets:
-                table.add_row(str(a.id), a.name, a.source_path)
-                
-            console.print(table)
+            from cli.utils.listing import listing_query, print_listing
+
+            query = listing_query(Asset, project_id, sort=sort, name_filter=name_filter, limit=limit, offset=offset)
+            print_listing(session, Asset, query, f"Assets ({project if project else 'Unassigned'})", list_format)
             return
 
         # COPY MODE
-        ast = session.exec(select(Asset).where(Asset.name == name).where(Asset.project_id == project_id)).first()
-        if not ast:
+        asset_id = session.exec(select(Asset.id).where(Asset.name == name).where(Asset.project_id == project_id)).first()
+        if asset_id is None:
              console.print(f"[red]Asset '{name}' not found{f' in project `{project}`' if project else ''}.[/red]")
              return
 
@@ -62,9 +55,25 @@ def asset(name, destination, project, overwrite):
             console.print(f"[red]Destination file '{destination}' exists. Use --overwrite.[/red]")
             return
 
+        from cli.db.blobs import copy_asset_content
+
         try:
+            if link != "copy":
+                from cli.db.blobs import asset_digest, iter_asset_content
+                from cli.engine.asset_cache import AssetCache
+                from cli.engine.writer import FileWriter
+
+                _, digest = asset_digest(session, asset_id)
+                source = AssetCache().ensure(digest, iter_asset_content(session, asset_id))
+                try:
+                    FileWriter().link(destination, source, link)
+                    console.print(f"[green]Asset '{name}' linked to '{destination}' ({link}).[/green]")
+                    return
+                except OSError as e:
+                    console.print(f"[yellow]Cannot {link} asset ({e}), copying instead.[/yellow]")
+
             with open(destination, 'wb') as f:
-                f.write(ast.content)
+                copy_asset_content(session, asset_id, f)
             console.print(f"[green]Asset '{name}' copied to '{destination}'.[/green]")
         except Exception as e:
             console.print(f"[red]Error copying asset: {e}[/red]")
@@ -1,10 +1,10 @@
 import click
-from rich.console import Console
-from sqlmodel import select
+from cli.utils.console import console
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, update
 from cli.db.session import get_session
 from cli.db.models import Project, Recipe, Template, Asset
 
-console = Console()
 
 @click.command("assign")
 @click.option("--recipe", help="Recipe name")
@@ -19,34 +19,30 @@ def assign_cmd(recipe, template, asset, project):
             console.print(f"[red]Project '{project}' not found.[/red]")
             return
 
-        if recipe:
-            # logic to find recipe (unassigned or from another project?)
-            # Assuming we can find by name globally or we need to know where it is.
-            # If name is unique globally:
-            rec = session.exec(select(Recipe).where(Recipe.name == recipe)).first()
-            if rec:
-                rec.project_id = proj.id
-                session.add(rec)
-                console.print(f"[green]Recipe '{recipe}' assigned to '{project}'.[/green]")
-            else:
-                console.print(f"[red]Recipe '{recipe}' not found.[/red]")
-        
-        if template:
-            tmpl = session.exec(select(Template).where(Template.name == template)).first()
-            if tmpl:
-                tmpl.project_id = proj.id
-                session.add(tmpl)
-                console.print(f"[green]Template '{template}' assigned to '{project}'.[/green]")
-            else:
-                console.print(f"[red]Template '{template}' not found.[/red]")
+        # Names are unique within a project: check every requested move
+        # before making any, so a clash leaves everything as it was
+        moves = []
+        for kind, Model, name in (("Recipe", Recipe, recipe), ("Template", Template, template), ("Asset", Asset, asset)):
+            if not name:
+                continue
+            if session.exec(select(Model.id).where(Model.project_id == proj.id).where(Model.name == name)).first() is not None:
+                console.print(f"[red]Project '{project}' already has a {kind.lower()} named '{name}'.[/red]")
+                return
+            # Rows (and their contents) aren't loaded
+            item_id = session.exec(select(Model.id).where(Model.name == name)).first()
+            if item_id is None:
+                console.print(f"[red]{kind} '{name}' not found.[/red]")
+                continue
+            moves.append((kind, Model, name, item_id))
 
-        if asset:
-            ast = session.exec(select(Asset).where(Asset.name == asset)).first()
-            if ast:
-                ast.project_id = proj.id
-                session.add(ast)
-                console.print(f"[green]Asset '{asset}' assigned to '{project}'.[/green]")
-            else:
-                console.print(f"[red]Asset '{asset}' not found.[/red]")
+        for _, Model, _, item_id in moves:
+            session.execute(update(Model).where(Model.id == item_id).values(project_id=proj.id))
 
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            console.print(f"[red]Nothing assigned: a resource of the same name already exists in '{project}'.[/red]")
+            return
+        for kind, _, name, _ in moves:
+            console.print(f"[green]{kind} '{name}' assigned to '{project}'.[/green]")
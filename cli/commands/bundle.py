@@ -1,20 +1,46 @@
 import click
 import os
 import json
-from rich.console import Console
+from cli.utils.console import console
+from cli.utils.archive import check_level
 from cli.utils.bundler import expand_bundle_to_path, bundle_path_to_archive, init_bundle_structure
 
-console = Console()
 
-@click.command("bundle")
+class DefaultGroup(click.Group):
+    """A group that runs `default_command` when no subcommand is named, so `kt bundle PATH` keeps working."""
+
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        if not args or (args[0] not in self.commands and args[0] not in ("--help", "-h")):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group("bundle", cls=DefaultGroup, default_command="create")
+def bundle():
+    """Bundles on-disk projects and inspects bundle files."""
+    pass
+
+
+@bundle.command("create")
 @click.argument("path", required=False, default=".")
 @click.option("--destination", help="Destination path for the bundle archive")
 @click.option("--overwrite", is_flag=True, help="Overwrite existing bundle")
-def bundle(path, destination, overwrite):
+@click.option("--compression", type=click.Choice(["gz", "zstd", "none"], case_sensitive=False), default="gz", show_default=True, help="Bundle compression (zstd is multi-threaded)")
+@click.option("--level", type=click.IntRange(1, 22), help="Compression level (gz: 1-9, zstd: 1-22)")
+@click.option("--format", "fmt", type=click.Choice(["tar", "zip"], case_sensitive=False), default="tar", show_default=True, help="Archive layout (zip is indexed for random access)")
+def create(path, destination, overwrite, compression, level, fmt):
     """Bundles the project at the specified path."""
+    try:
+        check_level(compression, level)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--level'")
     # Proposal: bundle [path] --destination [destination_path]
     # "The *.project file will be output to the destination path."
-    
+
     if not destination:
         # Infer destination from path or project.json
         proj_json = os.path.join(path, "project.json")
@@ -24,21 +50,58 @@ def bundle(path, destination, overwrite):
                 project_name = meta.get("name")
         else:
             project_name = os.path.basename(os.path.abspath(path))
-        
+
         if not project_name:
             project_name = "project"
-            
-        # Default to ../project_name.project relative to the project path? 
+
+        # Default to ../project_name.project relative to the project path?
         # Or in current cwd?
         # Proposal example: kt bundle . --destination ../svelte.project
         # If no destination, usually bundling in place or parent is weird.
         # Let's default to cwd / name.project
         destination = os.path.join(os.getcwd(), f"{project_name}.project")
-        
+
     try:
         from cli.utils.bundler import bundle_path_to_archive
-        bundle_path_to_archive(path, destination, overwrite)
+        bundle_path_to_archive(path, destination, overwrite, compression=compression, level=level, fmt=fmt)
         console.print(f"[green]Successfully bundled '{path}' to '{destination}'.[/green]")
     except Exception as e:
         console.print(f"[red]Error bundling project: {e}[/red]")
 
+
+@bundle.command("inspect")
+@click.argument("file")
+def inspect(file):
+    """Lists the resources in a bundle with their sizes and hashes."""
+    from rich.table import Table
+    from cli.utils.bundler import inspect_bundle
+
+    try:
+        fmt, meta, resources = inspect_bundle(file)
+    except Exception as e:
+        console.print(f"[red]Cannot read bundle: {e}[/red]")
+        return
+
+    table = Table(title=f"{meta.get('name', os.path.basename(file))} ({fmt})")
+    table.add_column("Type", style="cyan")
+    table.add_column("Name", style="magenta")
+    table.add_column("Size", justify="right")
+    table.add_column("SHA256", style="dim")
+    for kind, name, size, sha256 in resources:
+        table.add_row(kind, name, str(size), sha256[:16] if sha256 else "-")
+    console.print(table)
+
+
+@bundle.command("cat")
+@click.argument("file")
+@click.argument("resource")
+def cat(file, resource):
+    """Writes one resource (e.g. template/NAME) from a bundle to stdout."""
+    from cli.utils.bundler import read_bundle_entry
+
+    try:
+        out = click.get_binary_stream("stdout")
+        read_bundle_entry(file, resource, out)
+        out.flush()
+    except Exception as e:
+        console.print(f"[red]Cannot read '{resource}': {e}[/red]")
@@ -1,10 +1,9 @@
 import click
-from rich.console import Console
-from sqlmodel import select
+from cli.utils.console import console
+from sqlmodel import select, delete
 from cli.db.session import get_session
 from cli.db.models import Project, Recipe, Template, Asset
 
-console = Console()
 
 @click.command("delete")
 @click.option("--recipe", help="Recipe name")
@@ -28,30 +27,19 @@ def delete_cmd(recipe, template, asset, project, recursive):
         
         if project and not any([recipe, template, asset]):
             # Delete Project
-            proj = session.exec(select(Project).where(Project.name == project)).first()
-            if not proj:
+            from cli.db.projects import delete_project
+
+            project_id = session.exec(select(Project.id).where(Project.name == project)).first()
+            if project_id is None:
                 console.print(f"[red]Project '{project}' not found.[/red]")
                 return
             
+            # Resources are deleted or unassigned in bulk, never loaded
+            delete_project(session, project_id, recursive)
+            session.commit()
             if recursive:
-                 session.delete(proj)
-                 session.commit()
                  console.print(f"[green]Project '{project}' and all associated resources deleted.[/green]")
             else:
-                # Unassign resources
-                for r in proj.recipes:
-                    r.project_id = None
-                    session.add(r)
-                for t in proj.templates:
-                    t.project_id = None
-                    session.add(t)
-                for a in proj.assets:
-                    a.project_id = None
-                    session.add(a)
-                session.commit()
-                
-                session.delete(proj)
-                session.commit()
                 console.print(f"[green]Project '{project}' deleted. Resources unassigned.[/green]")
             return
 
@@ -59,54 +47,25 @@ def delete_cmd(recipe, template, asset, project, recursive):
         
         project_id = None
         if project:
-            proj = session.exec(select(Project).where(Project.name == project)).first()
-            if not proj:
+            project_id = session.exec(select(Project.id).where(Project.name == project)).first()
+            if project_id is None:
                  console.print(f"[red]Project '{project}' not found.[/red]")
                  return
-            project_id = proj.id
 
-        if recipe:
-            query = select(Recipe).where(Recipe.name == recipe)
+        # Rows are deleted with one DELETE each; contents are never loaded
+        for kind, Model, name in (("Recipe", Recipe, recipe), ("Template", Template, template), ("Asset", Asset, asset)):
+            if not name:
+                continue
+            query = delete(Model).where(Model.name == name)
             if project_id:
-                query = query.where(Recipe.project_id == project_id)
+                query = query.where(Model.project_id == project_id)
             
             # If we don't have project_id, what if there are duplicates?
             # Proposal doesn't explicitly handle unassigned vs global conflict here except mentioning "name conflicts" for project deletion?
             # Let's assume name is unique or we need to be specific.
             
-            recs = session.exec(query).all()
-            if not recs:
-                console.print(f"[red]Recipe '{recipe}' not found{f' in project `{project}`' if project else ''}.[/red]")
-            else:
-                 for r in recs:
-                     session.delete(r)
-                 session.commit()
-                 console.print(f"[green]Recipe '{recipe}' deleted.[/green]")
-
-        if template:
-            query = select(Template).where(Template.name == template)
-            if project_id:
-                query = query.where(Template.project_id == project_id)
-            
-            tmpls = session.exec(query).all()
-            if not tmpls:
-                 console.print(f"[red]Template '{template}' not found{f' in project `{project}`' if project else ''}.[/red]")
-            else:
-                 for t in tmpls:
-                     session.delete(t)
-                 session.commit()
-                 console.print(f"[green]Template '{template}' deleted.[/green]")
-
-        if asset:
-            query = select(Asset).where(Asset.name == asset)
-            if project_id:
-                query = query.where(Asset.project_id == project_id)
-            
-            asts = session.exec(query).all()
-            if not asts:
-                 console.print(f"[red]Asset '{asset}' not found{f' in project `{project}`' if project else ''}.[/red]")
+            if not session.execute(query).rowcount:
+                console.print(f"[red]{kind} '{name}' not found{f' in project `{project}`' if project else ''}.[/red]")
             else:
-                 for a in asts:
-                     session.delete(a)
                  session.commit()
-                 console.print(f"[green]Asset '{asset}' deleted.[/green]")
+                 console.print(f"[green]{kind} '{name}' deleted.[/green]")
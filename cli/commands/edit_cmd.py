@@ -1,10 +1,9 @@
 import click
-from rich.console import Console
+from cli.utils.console import console
 from sqlmodel import select
 from cli.db.session import get_session
 from cli.db.models import Project, Recipe, Template
 
-console = Console()
 
 @click.command("edit")
 @click.option("--recipe", help="Recipe name to edit")
@@ -1,11 +1,10 @@
 import click
 import os
-from rich.console import Console
+from cli.utils.console import console
 
-console = Console()
 
 @click.command("import")
-@click.argument("type_or_path", required=False) # Supporting both "import type ..." and legacy "import path" logic potentially?
+@click.argument("type_or_path", nargs=-1) # Supporting both "import type ..." and legacy "import path" logic potentially?
 # The proposal says: import [type] [identifier]
 # or flags like --git, --bundle, --dir
 # Actually proposal:
@@ -24,9 +23,10 @@ console = Console()
 # Let's implement options on the main command.
 
 @click.option("--git", help="Import a project from a Git repository")
-@click.option("--bundle", help="Import a project from a bundle (.project)")
+@click.option("--bundle", help="Import a project from a bundle (.project); more bundles or directories of bundles may follow")
 @click.option("--dir", "directory", help="Import a project from a directory")
-@click.option("--url", help="Import a project from a URL to a bundle") # Not implemented in utils yet?
+@click.option("--url", help="Import a project from a URL to a bundle")
+@click.option("--sha256", help="Expected sha256 of the bundle downloaded with --url")
 
 # Other imports
 @click.option("--recipe", help="Import a recipe")
@@ -36,11 +36,20 @@ console = Console()
 @click.option("--file", help="File path for resource import")
 @click.option("--project", help="Project name to assign imported resource to")
 
+# Bulk imports (names are derived from paths relative to the directory)
+@click.option("--templates-dir", help="Import every template in a directory")
+@click.option("--recipes-dir", help="Import every recipe in a directory")
+@click.option("--assets-dir", help="Import every asset in a directory")
+@click.option("--glob", "pattern", default="**/*", show_default=True, help="Glob (relative to each --*-dir) selecting files to import")
+
 @click.option("--overwrite", is_flag=True, help="Overwrite existing")
+@click.option("--prune", is_flag=True, help="Delete project resources missing from the imported bundle, directory or repository")
+@click.option("--jobs", type=int, help="Worker processes for reading many bundles (default: one per CPU)")
 
-def import_cmd(type_or_path, git, bundle, directory, url, recipe, template, asset, file, project, overwrite):
+def import_cmd(type_or_path, git, bundle, directory, url, sha256, recipe, template, asset, file, project,
+               templates_dir, recipes_dir, assets_dir, pattern, overwrite, prune, jobs):
     """Imports a project or resource."""
-    from cli.utils.bundler import extract_bundle, import_project_from_dir, import_project_from_git
+    from cli.utils.bundler import extract_bundle, import_project_from_dir, import_project_from_git, import_project_from_url
     from cli.db.session import get_session
     from cli.db.models import Project, Recipe, Template, Asset
     from sqlmodel import select
@@ -48,29 +57,107 @@ def import_cmd(type_or_path, git, bundle, directory, url, recipe, template, asse
     # Project Import Logic
     if git:
         try:
-            import_project_from_git(git, overwrite)
-            console.print(f"[green]Project imported from git '{git}'.[/green]")
+            summary = import_project_from_git(git, overwrite, prune)
+            if summary.up_to_date:
+                console.print(f"[yellow]Project from git '{git}' is already up to date at {summary.up_to_date[:12]}.[/yellow]")
+            else:
+                console.print(f"[green]Project imported from git '{git}' ({summary}).[/green]")
         except Exception as e:
             console.print(f"[red]Import failed: {e}[/red]")
         return
     
     if directory:
         try:
-            import_project_from_dir(directory, overwrite)
-            console.print(f"[green]Project imported from directory '{directory}'.[/green]")
+            summary = import_project_from_dir(directory, overwrite, prune)
+            console.print(f"[green]Project imported from directory '{directory}' ({summary}).[/green]")
         except Exception as e:
              console.print(f"[red]Import failed: {e}[/red]")
         return
 
-    if bundle or (type_or_path and type_or_path.endswith('.project')):
-        path = bundle or type_or_path
+    if url:
+        try:
+            summary = import_project_from_url(url, overwrite, prune, sha256=sha256)
+            console.print(f"[green]Project imported from '{url}' ({summary}).[/green]")
+        except Exception as e:
+            console.print(f"[red]Import failed: {e}[/red]")
+        return
+
+    if bundle:
+        bundles = [bundle, *type_or_path]
+    else:
+        bundles = list(type_or_path) if type_or_path and all(p.endswith('.project') for p in type_or_path) else []
+    if len(bundles) > 1 or (bundles and os.path.isdir(bundles[0])):
+        from cli.utils.batch import import_bundles
+
+        imported = failed = 0
+        for path, summary, error in import_bundles(bundles, overwrite, prune, jobs):
+            if error is not None:
+                failed += 1
+                console.print(f"[red]Import of '{path}' failed: {error}[/red]")
+            else:
+                imported += 1
+                console.print(f"[green]Project imported from bundle '{path}' ({summary}).[/green]")
+        console.print(f"[{'yellow' if failed else 'green'}]{imported} bundles imported, {failed} failed.[/{'yellow' if failed else 'green'}]")
+        return
+
+    if bundles:
+        path = bundles[0]
         try:
-            extract_bundle(path, overwrite)
-            console.print(f"[green]Project imported from bundle '{path}'.[/green]")
+            summary = extract_bundle(path, overwrite, prune)
+            console.print(f"[green]Project imported from bundle '{path}' ({summary}).[/green]")
         except Exception as e:
             console.print(f"[red]Import failed: {e}[/red]")
         return
         
+    # Bulk Resource Import Logic
+    if templates_dir or recipes_dir or assets_dir:
+        from cli.engine.manifest import hash_file
+        from cli.utils.importer import collect_files, resource_name, bulk_upsert, stream_asset_files, text_values
+
+        sources = [
+            ("template", Template, templates_dir),
+            ("recipe", Recipe, recipes_dir),
+            ("asset", Asset, assets_dir),
+        ]
+        with get_session() as session:
+            project_id = None
+            if project:
+                proj = session.exec(select(Project).where(Project.name == project)).first()
+                if not proj:
+                    console.print(f"[red]Project '{project}' not found.[/red]")
+                    return
+                project_id = proj.id
+
+            results = []
+            try:
+                for kind, model, root in sources:
+                    if not root:
+                        continue
+                    rows = {}
+                    for rel, full in collect_files(root, pattern):
+                        if kind == "asset":
+                            # Content is streamed in once the rows exist; the
+                            # hash lets unchanged files be skipped
+                            rows[resource_name(kind, rel)] = {"content": b"", "source_path": full, "sha256": hash_file(full)}
+                        else:
+                            with open(full, 'r') as f:
+                                rows[resource_name(kind, rel)] = text_values(f.read())
+                    inserted, updated, skipped, unchanged = bulk_upsert(session, model, project_id, rows, overwrite)
+                    if kind == "asset":
+                        stream_asset_files(session, project_id, {name: rows[name]["source_path"] for name in inserted + updated})
+                    results.append((kind, (len(inserted), len(updated), len(skipped), len(unchanged))))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                console.print(f"[red]Import failed: {e}[/red]")
+                return
+
+        for kind, (inserted, updated, skipped, unchanged) in results:
+            console.print(f"[green]{kind.capitalize()}s: {inserted} added, {updated} updated, {unchanged} unchanged.[/green]")
+            if skipped:
+                console.print(f"[yellow]{skipped} existing {kind}s skipped. Use --overwrite to replace them.[/yellow]")
+        return
+
     # Resource Import Logic
     if recipe: # --recipe [name] --file [path]
         if not file:
@@ -142,9 +229,8 @@ def import_cmd(type_or_path, git, bundle, directory, url, recipe, template, asse
              console.print("[red]--file is required when importing an asset.[/red]")
              return
         
-        with open(file, 'rb') as f:
-            content = f.read()
-            
+        from cli.db.blobs import import_asset_file
+
         with get_session() as session:
             project_id = None
             if project:
@@ -154,16 +240,12 @@ def import_cmd(type_or_path, git, bundle, directory, url, recipe, template, asse
                     return
                 project_id = proj.id
             
-            existing = session.exec(select(Asset).where(Asset.name == asset).where(Asset.project_id == project_id)).first()
-            if existing and not overwrite:
+            existing_id = session.exec(select(Asset.id).where(Asset.name == asset).where(Asset.project_id == project_id)).first()
+            if existing_id is not None and not overwrite:
                  console.print(f"[red]Asset '{asset}' already exists. Use --overwrite.[/red]")
                  return
-            if existing:
-                existing.content = content
-                session.add(existing)
-            else:
-                 new_asset = Asset(name=asset, project_id=project_id, content=content)
-                 session.add(new_asset)
+            # The file is streamed into the database, never read whole
+            import_asset_file(session, asset, file, project_id=project_id, source_path=file, asset_id=existing_id)
             
             session.commit()
             console.print(f"[green]Asset '{asset}' imported.[/green]")
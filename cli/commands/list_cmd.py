@@ -1,46 +1,64 @@
 import click
-from rich.console import Console
-from rich.table import Table
+from cli.utils.console import console
 from sqlmodel import select, func
 from cli.db.session import get_session
 from cli.db.models import Project, Recipe, Template, Asset
+from cli.utils.listing import list_options
 
-console = Console()
 
 @click.command("list")
 @click.option("--type", required=False, type=click.Choice(['project', 'template', 'recipe', 'asset'], case_sensitive=False), help="Type of resource to list")
 @click.option("--project", help="Project name (conflict if type is 'project')")
-def list_cmd(type, project):
+@list_options
+def list_cmd(type, project, limit, offset, sort, name_filter, list_format):
     """List resources of a specific type or show a summary of all resources."""
+    from rich.table import Table
     
     # If no type is provided, show the summary view
     if not type:
         if project:
             console.print("[red]Error: --project cannot be used without --type[/red]")
             return
+        if limit is not None or offset or sort or name_filter or list_format:
+            console.print("[red]Error: listing options (--limit, --offset, --sort, --filter, --json, --ndjson) require --type[/red]")
+            return
             
         with get_session() as session:
+            # Only the columns shown are selected, so template/recipe text
+            # and asset blobs are never loaded
             # 1. Unassigned Recipes
-            unassigned_recipes = session.exec(select(Recipe).where(Recipe.project_id == None)).all()
+            unassigned_recipes = session.exec(select(Recipe.id, Recipe.name).where(Recipe.project_id == None)).all()
             
             # 2. Unassigned Templates
-            unassigned_templates = session.exec(select(Template).where(Template.project_id == None)).all()
+            unassigned_templates = session.exec(select(Template.id, Template.name).where(Template.project_id == None)).all()
             
             # 3. Unassigned Assets
-            unassigned_assets = session.exec(select(Asset).where(Asset.project_id == None)).all()
+            unassigned_assets = session.exec(
+                select(Asset.id, Asset.name, Asset.source_path).where(Asset.project_id == None)
+            ).all()
             
-            # 4. Projects with counts
-            # We fetch all projects and manually count for now to be simple and safe with SQLModel relationships
-            # Alternatively, we could do a joined query, but iterating is fine for reasonable datasets
-            projects = session.exec(select(Project)).all()
+            # 4. Projects with counts, from one query: each resource table is
+            # counted per project (GROUP BY over the project_id index) and
+            # outer-joined to the projects
+            counts = [
+                select(Model.project_id, func.count().label("n"))
+                .where(Model.project_id != None)
+                .group_by(Model.project_id)
+                .subquery()
+                for Model in (Recipe, Template, Asset)
+            ]
+            query = select(Project.id, Project.name, *(func.coalesce(c.c.n, 0) for c in counts))
+            for c in counts:
+                query = query.outerjoin(c, c.c.project_id == Project.id)
+            projects = session.exec(query.order_by(Project.id)).all()
             
             # Display Unassigned Recipes
             if unassigned_recipes:
                 table = Table(title="Unassigned Recipes", show_header=True, header_style="bold magenta")
                 table.add_column("ID", style="dim", width=4)
                 table.add_column("Name")
-                for r in unassigned_recipes:
-                    table.add_row(str(r.id), r.name)
+                for recipe_id, name in unassigned_recipes:
+                    table.add_row(str(recipe_id), name)
                 console.print(table)
                 console.print()
             else:
@@ -52,8 +70,8 @@ def list_cmd(type, project):
                 table = Table(title="Unassigned Templates", show_header=True, header_style="bold magenta")
                 table.add_column("ID", style="dim", width=4)
                 table.add_column("Name")
-                for t in unassigned_templates:
-                    table.add_row(str(t.id), t.name)
+                for template_id, name in unassigned_templates:
+                    table.add_row(str(template_id), name)
                 console.print(table)
                 console.print()
             else:
@@ -66,8 +84,8 @@ def list_cmd(type, project):
                 table.add_column("ID", style="dim", width=4)
                 table.add_column("Name")
                 table.add_column("Source Path", style="dim")
-                for a in unassigned_assets:
-                    table.add_row(str(a.id), a.name, a.source_path)
+                for asset_id, name, source_path in unassigned_assets:
+                    table.add_row(str(asset_id), name, source_path)
                 console.print(table)
                 console.print()
             else:
@@ -83,12 +101,8 @@ def list_cmd(type, project):
                 table.add_column("Templates", justify="right")
                 table.add_column("Assets", justify="right")
                 
-                for p in projects:
-                    # Using the relationships defined in models.py
-                    r_count = len(p.recipes)
-                    t_count = len(p.templates)
-                    a_count = len(p.assets)
-                    table.add_row(str(p.id), p.name, str(r_count), str(t_count), str(a_count))
+                for project_id, name, r_count, t_count, a_count in projects:
+                    table.add_row(str(project_id), name, str(r_count), str(t_count), str(a_count))
                 console.print(table)
             else:
                 console.print("[dim]No projects found[/dim]")
@@ -96,23 +110,16 @@ def list_cmd(type, project):
         return
 
     # EXISTING LOGIC FOR SPECIFIC TYPE LISTING
+    from cli.utils.listing import listing_query, print_listing
+
     if type == 'project':
         if project:
              console.print("[red]Error: --project cannot be used with --type project[/red]")
              return
         
         with get_session() as session:
-            projects = session.exec(select(Project)).all()
-            
-            table = Table(title="Projects")
-            table.add_column("ID", justify="right", style="cyan")
-            table.add_column("Name", style="magenta")
-            table.add_column("Created At", justify="right")
-            
-            for p in projects:
-                table.add_row(str(p.id), p.name, str(p.created_at))
-                
-            console.print(table)
+            query = listing_query(Project, assigned=False, sort=sort, name_filter=name_filter, limit=limit, offset=offset)
+            print_listing(session, Project, query, "Projects", list_format)
             return
 
     # For other types, we need to determine project_id
@@ -121,11 +128,10 @@ def list_cmd(type, project):
         project_name_display = "Unassigned"
         
         if project:
-            proj = session.exec(select(Project).where(Project.name == project)).first()
-            if not proj:
+            project_id = session.exec(select(Project.id).where(Project.name == project)).first()
+            if project_id is None:
                 console.print(f"[red]Project '{project}' not found.[/red]")
                 return
-            project_id = proj.id
             project_name_display = project
             
         # Select Model based on type
@@ -137,25 +143,5 @@ def list_cmd(type, project):
         elif type == 'asset':
             Model = Asset
             
-        query = select(Model)
-        if project_id:
-             query = query.where(Model.project_id == project_id)
-        else:
-             query = query.where(Model.project_id == None)
-             
-        items = session.exec(query).all()
-        
-        title = f"{type.capitalize()}s ({project_name_display})"
-        table = Table(title=title)
-        table.add_column("ID", justify="right", style="cyan")
-        table.add_column("Name", style="magenta")
-        if type == 'asset':
-             table.add_column("Source Path", style="dim")
-             
-        for item in items:
-            if type == 'asset':
-                table.add_row(str(item.id), item.name, item.source_path)
-            else:
-                table.add_row(str(item.id), item.name)
-                
-        console.print(table)
+        query = listing_query(Model, project_id, sort=sort, name_filter=name_filter, limit=limit, offset=offset)
+        print_listing(session, Model, query, f"{type.capitalize()}s ({project_name_display})", list_format)
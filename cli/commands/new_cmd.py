@@ -1,10 +1,9 @@
 import click
-from rich.console import Console
+from cli.utils.console import console
 from sqlmodel import select
 from cli.db.session import get_session
 from cli.db.models import Project, Recipe, Template, Asset
 
-console = Console()
 
 @click.command("new")
 @click.option("--project", help="Project name (for project creation or assignment)")
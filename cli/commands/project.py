@@ -1,13 +1,13 @@
 import click
 import os
 
-from rich.console import Console
-from rich.table import Table
+from cli.utils.archive import check_level
+from cli.utils.console import console
 from sqlmodel import select, delete
 from cli.db.session import get_session
 from cli.db.models import Project
+from cli.utils.listing import list_options
 
-console = Console()
 
 @click.group()
 def project():
@@ -15,20 +15,13 @@ def project():
     pass
 
 @project.command("list")
-def list_projects():
+@list_options
+def list_projects(limit, offset, sort, name_filter, list_format):
     """List all projects"""
+    from cli.utils.listing import listing_query, print_listing
     with get_session() as session:
-        projects = session.exec(select(Project)).all()
-        
-        table = Table(title="Projects")
-        table.add_column("ID", justify="right", style="cyan")
-        table.add_column("Name", style="magenta")
-        table.add_column("Created At", justify="right")
-        
-        for p in projects:
-            table.add_row(str(p.id), p.name, str(p.created_at))
-            
-        console.print(table)
+        query = listing_query(Project, assigned=False, sort=sort, name_filter=name_filter, limit=limit, offset=offset)
+        print_listing(session, Project, query, "Projects", list_format)
 
 @project.command("add")
 @click.argument("name")
@@ -51,68 +44,85 @@ def add_project(name):
 def delete_project(name, recursive):
     """Delete a project"""
     with get_session() as session:
-        project = session.exec(select(Project).where(Project.name == name)).first()
-        if not project:
+        from cli.db.projects import delete_project
+
+        project_id = session.exec(select(Project.id).where(Project.name == name)).first()
+        if project_id is None:
             console.print(f"[red]Project '{name}' not found.[/red]")
             return
             
+        # One UPDATE/DELETE per resource table; no resource rows are loaded
+        delete_project(session, project_id, recursive)
+        session.commit()
         if recursive:
-             # Cascading delete is handled by SQLModel/SQLAlchemy if configured, 
-             # but we can explicitly ensure it or rely on the relationship definition.
-             # In models.py we set cascade_delete=True
-             session.delete(project)
-             session.commit()
              console.print(f"[green]Project '{name}' and all associated resources deleted.[/green]")
         else:
-            # Unassign resources
-            for template in project.templates:
-                template.project_id = None
-                session.add(template)
-            for recipe in project.recipes:
-                recipe.project_id = None
-                session.add(recipe)
-            for asset in project.assets:
-                asset.project_id = None
-                session.add(asset)
-            
-            session.commit()
-            
-            # Need to re-fetch project or ensure it's attached to session for deletion?
-            # It should still be attached.
-            session.delete(project)
-            session.commit()
             console.print(f"[green]Project '{name}' deleted. Resources unassigned.[/green]")
 
 @project.command("import")
 @click.argument("path")
 @click.option("--overwrite", is_flag=True, help="Overwrite existing project")
 @click.option("--git", is_flag=True, help="Import from a Git repository")
-def import_project(path, overwrite, git):
+@click.option("--prune", is_flag=True, help="Delete project resources missing from the import source")
+def import_project(path, overwrite, git, prune):
     """Import a project from a bundle (.project), directory, or git repository"""
     from cli.utils.bundler import extract_bundle, import_project_from_dir, import_project_from_git
     try:
         if git:
-            import_project_from_git(path, overwrite)
+            summary = import_project_from_git(path, overwrite, prune)
         elif os.path.isdir(path):
-            import_project_from_dir(path, overwrite)
+            summary = import_project_from_dir(path, overwrite, prune)
         else:
-            extract_bundle(path, overwrite)
-        console.print(f"[green]Project imported from {'git ' if git else ''}'{path}'.[/green]")
+            summary = extract_bundle(path, overwrite, prune)
+        if summary.up_to_date:
+            console.print(f"[yellow]Project from git '{path}' is already up to date at {summary.up_to_date[:12]}.[/yellow]")
+        else:
+            console.print(f"[green]Project imported from {'git ' if git else ''}'{path}' ({summary}).[/green]")
     except Exception as e:
         console.print(f"[red]Import failed: {e}[/red]")
 
 @project.command("export")
-@click.argument("name")
+@click.argument("name", required=False)
 @click.option("--output", help="Output file path (.project)")
+@click.option("--all", "export_all", is_flag=True, help="Export every project into --output-dir")
+@click.option("--output-dir", help="Directory for bundles exported with --all")
+@click.option("--jobs", type=int, help="Worker processes for --all (default: one per CPU)")
 @click.option("--overwrite", is_flag=True, help="Overwrite existing file")
-def export_project(name, output, overwrite):
-    """Export a project to a bundle"""
+@click.option("--compression", type=click.Choice(["gz", "zstd", "none"], case_sensitive=False), default="gz", show_default=True, help="Bundle compression (zstd is multi-threaded)")
+@click.option("--level", type=click.IntRange(1, 22), help="Compression level (gz: 1-9, zstd: 1-22)")
+@click.option("--format", "fmt", type=click.Choice(["tar", "zip"], case_sensitive=False), default="tar", show_default=True, help="Archive layout (zip is indexed for random access)")
+def export_project(name, output, export_all, output_dir, jobs, overwrite, compression, level, fmt):
+    """Export a project (or every project with --all) to a bundle"""
+    try:
+        check_level(compression, level)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--level'")
+    if export_all:
+        from cli.utils.batch import export_projects
+
+        with get_session() as session:
+            names = session.exec(select(Project.name)).all()
+        exported = failed = 0
+        for project_name, path, error in export_projects(names, output_dir or os.getcwd(), overwrite,
+                                                          compression, level, fmt, jobs):
+            if error is not None:
+                failed += 1
+                console.print(f"[red]Export of '{project_name}' failed: {error}[/red]")
+            else:
+                exported += 1
+                console.print(f"[green]Project '{project_name}' exported to '{path}'.[/green]")
+        console.print(f"[{'yellow' if failed else 'green'}]{exported} projects exported, {failed} failed.[/{'yellow' if failed else 'green'}]")
+        return
+    if not name:
+        console.print("[red]Provide a project name or --all.[/red]")
+        return
+
     if not output:
         output = os.path.join(os.getcwd(), f"{name}.project")
-        
+
     from cli.utils.bundler import create_bundle
     try:
-        create_bundle(name, output, overwrite)
+        create_bundle(name, output, overwrite, compression=compression, level=level, fmt=fmt)
         console.print(f"[green]Project '{name}' exported to '{output}'.[/green]")
     except Exception as e:
         console.print(f"[red]Export failed: {e}[/red]")
@@ -160,11 +170,23 @@ def set_default_recipe(name, directory, recipe):
     show_default=True,
     help="Config format for generated files",
 )
-def render_project(name, config, output, config_format):
+@click.option("--no-cache", is_flag=True, help="Regenerate the config even if a cached one is current")
+@click.option("--trace", "trace_path", help="Write a Chrome trace-event timeline of the run to this file")
+@click.option("--quiet", "output_mode", flag_value="quiet", help="Only print errors and a final summary")
+@click.option("--progress", "output_mode", flag_value="progress", help="Show a live tally instead of one line per action")
+@click.option("--fsync", is_flag=True, help="Flush written files to disk (batched at the end of the run)")
+@click.option("--command-timeout", type=float, help="Seconds each r.run/r.eval command may take before it is killed")
+@click.option("--run-timeout", type=float, help="Seconds all r.run/r.eval commands of a run may take together")
+def render_project(name, config, output, config_format, no_cache, trace_path, output_mode, fsync, command_timeout,
+                   run_timeout):
     """Render the default recipe for a project"""
     import toml
     import json
     from cli.engine.core import RecipeEngine
+    from cli.engine.config_cache import generate_config
+    from cli.engine.resolver import FsResolver
+    from cli.engine import trace
+    from cli.engine.reporter import Reporter
 
     ctx = click.get_current_context()
     format_source = ctx.get_parameter_source("config_format")
@@ -176,6 +198,8 @@ def render_project(name, config, output, config_format):
 
     recipe_content = None
     project_context = None
+    # Resources of an on-disk project are read from its folders
+    resolver = None
 
     with get_session() as session:
         if name:
@@ -222,6 +246,7 @@ def render_project(name, config, output, config_format):
             with open(recipe_path, 'r') as f:
                 recipe_content = f.read()
             project_context = data.get('name', 'unbundled')
+            resolver = FsResolver(os.getcwd(), project_context)
 
     if recipe_content:
         context = {}
@@ -238,20 +263,30 @@ def render_project(name, config, output, config_format):
             console.print("[red]--format is only valid when generating a config file.[/red]")
             return
             
+        if trace_path:
+            trace.enable()
+
+        reporter = Reporter(output_mode or "normal")
         try:
-            engine = RecipeEngine(context=context, mode=mode)
-            engine.execute(recipe_content)
-            
             if mode == "GENERATE_CONFIG":
-                if engine.config_template and format_specified:
+                # Reused from the config cache when the recipe hasn't changed
+                generated, cached = generate_config(recipe_content, config_format, reporter, resolver, use_cache=not no_cache,
+                                                    command_timeout=command_timeout, run_timeout=run_timeout)
+                if generated.from_template and format_specified:
                     console.print("[red]--format cannot be used when a config template is provided via r.config.[/red]")
                     return
-                engine.render(output, output_format=config_format)
-                console.print(f"[green]Config generated at '{output}'[/green]")
+                generated.write(output, config_format)
+                reporter.finish(f"Config generated at '{output}'" + (" (cached)" if cached else ""))
             else:
-                 console.print(f"[green]Project '{project_context}' rendered using default recipe.[/green]")
+                engine = RecipeEngine(context=context, mode=mode, reporter=reporter, fsync=fsync, resolver=resolver,
+                                      command_timeout=command_timeout, run_timeout=run_timeout)
+                engine.execute(recipe_content)
+                reporter.finish(f"Project '{project_context}' rendered using default recipe.")
         except Exception as e:
-            console.print(f"[red]Error rendering project: {e}[/red]")
+            reporter.error(f"Error rendering project: {e}")
+            reporter.finish()
+        finally:
+            trace.write(trace_path)
 
 @project.command("unassign")
 @click.argument("name")
@@ -265,38 +300,24 @@ def unassign_resource(name, recipe, template, asset):
         return
         
     with get_session() as session:
-        proj = session.exec(select(Project).where(Project.name == name)).first()
-        if not proj:
+        project_id = session.exec(select(Project.id).where(Project.name == name)).first()
+        if project_id is None:
             console.print(f"[red]Project '{name}' not found.[/red]")
             return
             
+        from sqlmodel import update
         from cli.db.models import Recipe, Template, Asset
         
-        if recipe:
-            rec = session.exec(select(Recipe).where(Recipe.name == recipe).where(Recipe.project_id == proj.id)).first()
-            if rec:
-                rec.project_id = None
-                session.add(rec)
-                console.print(f"[green]Recipe '{recipe}' unassigned from project '{name}'.[/green]")
-            else:
-                console.print(f"[red]Recipe '{recipe}' not found in project '{name}'.[/red]")
-                
-        if template:
-            tmpl = session.exec(select(Template).where(Template.name == template).where(Template.project_id == proj.id)).first()
-            if tmpl:
-                tmpl.project_id = None
-                session.add(tmpl)
-                console.print(f"[green]Template '{template}' unassigned from project '{name}'.[/green]")
-            else:
-                console.print(f"[red]Template '{template}' not found in project '{name}'.[/red]")
-                
-        if asset:
-            ast = session.exec(select(Asset).where(Asset.name == asset).where(Asset.project_id == proj.id)).first()
-            if ast:
-                ast.project_id = None
-                session.add(ast)
-                console.print(f"[green]Asset '{asset}' unassigned from project '{name}'.[/green]")
+        # One UPDATE per resource; rows (and their contents) aren't loaded
+        for kind, Model, resource in (("Recipe", Recipe, recipe), ("Template", Template, template), ("Asset", Asset, asset)):
+            if not resource:
+                continue
+            result = session.execute(
+                update(Model).where(Model.name == resource).where(Model.project_id == project_id).values(project_id=None)
+            )
+            if result.rowcount:
+                console.print(f"[green]{kind} '{resource}' unassigned from project '{name}'.[/green]")
             else:
-                console.print(f"[red]Asset '{asset}' not found in project '{name}'.[/red]")
+                console.print(f"[red]{kind} '{resource}' not found in project '{name}'.[/red]")
                 
         session.commit()
@@ -1,15 +1,16 @@
 import click
 import os
-from rich.console import Console
+from cli.utils.console import console
 from sqlmodel import select
 from cli.db.session import get_session
 from cli.db.models import Project
 
-console = Console()
 
 @click.command("r")
 @click.argument("name", required=False)
 @click.option("--config", help="TOML or YAML config file")
+@click.option("--config-glob", multiple=True, help="Run once per matching config file, e.g. 'services/*.toml' (repeatable)")
+@click.option("--jobs", type=int, help="Worker processes for --config-glob (default: one per CPU)")
 @click.option("--create-config", help="Path to create a new config file")
 @click.option("--output", help="Output path for generated config (deprecated, use --create-config)")
 @click.option(
@@ -20,12 +21,25 @@ console = Console()
     show_default=True,
     help="Config format for generated files",
 )
-def r_cmd(name, config, create_config, output, config_format):
+@click.option("--no-cache", is_flag=True, help="Regenerate the config even if a cached one is current")
+@click.option("--trace", "trace_path", help="Write a Chrome trace-event timeline of the run to this file")
+@click.option("--quiet", "output_mode", flag_value="quiet", help="Only print errors and a final summary")
+@click.option("--progress", "output_mode", flag_value="progress", help="Show a live tally instead of one line per action")
+@click.option("--fsync", is_flag=True, help="Flush written files to disk (batched at the end of the run)")
+@click.option("--command-timeout", type=float, help="Seconds each r.run/r.eval command may take before it is killed")
+@click.option("--run-timeout", type=float, help="Seconds all r.run/r.eval commands of a run may take together")
+@click.option("--watch", is_flag=True, help="Keep running and update outputs as the on-disk project changes")
+def r_cmd(name, config, config_glob, jobs, create_config, output, config_format, no_cache, trace_path, output_mode, fsync,
+          command_timeout, run_timeout, watch):
     """Executes the default recipe for the specified project."""
     import toml
     import yaml
     import json
     from cli.engine.core import RecipeEngine
+    from cli.engine.config_cache import generate_config
+    from cli.engine.resolver import FsResolver
+    from cli.engine import trace
+    from cli.engine.reporter import Reporter
 
     ctx = click.get_current_context()
     format_source = ctx.get_parameter_source("config_format")
@@ -37,9 +51,18 @@ def r_cmd(name, config, create_config, output, config_format):
     if format_specified and not create_config:
         console.print("[red]--format requires --create-config (or --output).[/red]")
         return
+    if config_glob and (config or create_config or trace_path):
+        console.print("[red]--config-glob cannot be combined with --config, --create-config or --trace.[/red]")
+        return
+    if watch and (name or config_glob or create_config or trace_path):
+        console.print("[red]--watch runs an on-disk project (no project name) and cannot be combined with "
+                      "--config-glob, --create-config or --trace.[/red]")
+        return
 
     recipe_content = None
     project_context = None
+    # Resources of an on-disk project are read from its folders
+    resolver = None
 
     with get_session() as session:
         if name:
@@ -93,6 +116,26 @@ def r_cmd(name, config, create_config, output, config_format):
             with open(recipe_path, 'r') as f:
                 recipe_content = f.read()
             project_context = data.get('name', 'unbundled')
+            resolver = FsResolver(os.getcwd(), project_context)
+
+    if recipe_content and config_glob:
+        import time
+        from cli.engine.batch import expand_configs, print_summary, run_configs
+        from cli.engine.resolver import DbResolver
+
+        configs = expand_configs(config_glob)
+        if not configs:
+            console.print(f"[red]No config files match {', '.join(config_glob)}.[/red]")
+            return
+        # A stored project's templates and recipes are read once here and
+        # shared by every run
+        if name:
+            resolver = DbResolver().snapshot(project_context)
+        started = time.perf_counter()
+        results = list(run_configs(recipe_content, configs, resolver, jobs, fsync,
+                                   command_timeout=command_timeout, run_timeout=run_timeout))
+        print_summary(results, time.perf_counter() - started)
+        return
 
     if recipe_content:
         context = {}
@@ -115,17 +158,43 @@ def r_cmd(name, config, create_config, output, config_format):
             console.print("[red]--format is only valid when generating a config file.[/red]")
             return
             
+        if trace_path:
+            trace.enable()
+
+        reporter = Reporter(output_mode or "normal")
+        engine = None
         try:
-            engine = RecipeEngine(context=context, mode=mode)
-            engine.execute(recipe_content)
-            
             if mode == "GENERATE_CONFIG":
-                if engine.config_template and format_specified:
+                # Reused from the config cache when the recipe hasn't changed
+                generated, cached = generate_config(recipe_content, config_format, reporter, resolver, use_cache=not no_cache,
+                                                    command_timeout=command_timeout, run_timeout=run_timeout)
+                if generated.from_template and format_specified:
                     console.print("[red]--format cannot be used when a config template is provided via r.config.[/red]")
                     return
-                engine.render(create_config, output_format=config_format)
-                console.print(f"[green]Config generated at '{create_config}'[/green]")
+                generated.write(create_config, config_format)
+                reporter.finish(f"Config generated at '{create_config}'" + (" (cached)" if cached else ""))
             else:
-                 console.print(f"[green]Project '{project_context}' rendered using default recipe.[/green]")
+                engine = RecipeEngine(context=context, mode=mode, reporter=reporter, fsync=fsync, resolver=resolver,
+                                      command_timeout=command_timeout, run_timeout=run_timeout)
+                engine.execute(recipe_content)
+                reporter.finish(f"Project '{project_context}' rendered using default recipe.")
         except Exception as e:
-            console.print(f"[red]Error rendering project: {e}[/red]")
+            reporter.error(f"Error rendering project: {e}")
+            reporter.finish()
+        finally:
+            trace.write(trace_path)
+
+        if watch and engine is not None:
+            from cli.engine.batch import load_config
+            from cli.engine.watch import watch_recipe
+
+            def load():
+                # project.json may name another default recipe by now
+                with open(project_json, 'r') as f:
+                    default_recipe = json.load(f).get('default_recipe')
+                content = resolver.recipe(default_recipe) if default_recipe else None
+                if content is None:
+                    raise ValueError(f"Default recipe '{default_recipe}' not found in recipes/.")
+                return content, load_config(config) if config else {}
+
+            watch_recipe(engine, resolver, load, [project_json] + ([config] if config else []), output_mode or "normal")
@@ -1,17 +1,18 @@
 import click
 import os
-from rich.console import Console
-from rich.table import Table
+from cli.utils.console import console
 from sqlmodel import select
 from cli.db.session import get_session
 from cli.db.models import Recipe, Project
+from cli.utils.listing import list_options
 
-console = Console()
 
 @click.command("recipe")
 @click.argument("name", required=False)
 @click.option("--project", help="Project name")
 @click.option("--config", help="TOML config file")
+@click.option("--configs", multiple=True, help="Run once per config file or glob, e.g. 'services/*.toml' (repeatable)")
+@click.option("--jobs", type=int, help="Worker processes for --configs (default: one per CPU)")
 @click.option("--create-config", help="Path to create a new config file")
 @click.option(
     "--format",
@@ -22,7 +23,16 @@ console = Console()
     help="Config format for generated files",
 )
 @click.option("--set-default", is_flag=True, help="Set as default recipe for the project")
-def recipe(name, project, config, create_config, config_format, set_default):
+@click.option("--no-cache", is_flag=True, help="Regenerate the config even if a cached one is current")
+@click.option("--trace", "trace_path", help="Write a Chrome trace-event timeline of the run to this file")
+@click.option("--quiet", "output_mode", flag_value="quiet", help="Only print errors and a final summary")
+@click.option("--progress", "output_mode", flag_value="progress", help="Show a live tally instead of one line per action")
+@click.option("--fsync", is_flag=True, help="Flush written files to disk (batched at the end of the run)")
+@click.option("--command-timeout", type=float, help="Seconds each r.run/r.eval command may take before it is killed")
+@click.option("--run-timeout", type=float, help="Seconds all r.run/r.eval commands of a run may take together")
+@list_options
+def recipe(name, project, config, configs, jobs, create_config, config_format, set_default, no_cache, trace_path, output_mode, fsync,
+           command_timeout, run_timeout, limit, offset, sort, name_filter, list_format):
     """Executes the specified recipe (or lists recipes if no name)."""
     ctx = click.get_current_context()
     format_source = ctx.get_parameter_source("config_format")
@@ -31,6 +41,9 @@ def recipe(name, project, config, create_config, config_format, set_default):
     if format_specified and not create_config:
         console.print("[red]--format requires --create-config.[/red]")
         return
+    if configs and (config or create_config or trace_path):
+        console.print("[red]--configs cannot be combined with --config, --create-config or --trace.[/red]")
+        return
 
     with get_session() as session:
         # Project resolution
@@ -81,28 +94,10 @@ def recipe(name, project, config, create_config, config_format, set_default):
 
         if not name:
             # LIST MODE
-            query = select(Recipe)
-            if project_id:
-                query = query.where(Recipe.project_id == project_id)
-            else:
-                query = query.where(Recipe.project_id == None) # Unassigned only if no project specified? 
-                # Or list all?
-                # Proposal: "If the project name is specified... executed from that project. Otherwise it will be from the unassigned..."
-                # This applies to EXECUTION.
-                # For LISTING, usually if no project, maybe list all or unassigned?
-                # Existing list command listed unassigned by default.
+            from cli.utils.listing import listing_query, print_listing
 
-            recipes = session.exec(query).all()
-            
-            title = f"Recipes ({project if project else 'Unassigned'})"
-            table = Table(title=title)
-            table.add_column("ID", justify="right", style="cyan")
-            table.add_column("Name", style="magenta")
-            
-            for r in recipes:
-                table.add_row(str(r.id), r.name)
-                
-            console.print(table)
+            query = listing_query(Recipe, project_id, sort=sort, name_filter=name_filter, limit=limit, offset=offset)
+            print_listing(session, Recipe, query, f"Recipes ({project if project else 'Unassigned'})", list_format)
             return
 
         # EXECUTE MODE
@@ -111,9 +106,29 @@ def recipe(name, project, config, create_config, config_format, set_default):
              console.print(f"[red]Recipe '{name}' not found{f' in project `{project}`' if project else ''}.[/red]")
              return
              
+        if configs:
+            import time
+            from cli.engine.batch import expand_configs, print_summary, run_configs
+            from cli.engine.resolver import DbResolver
+
+            config_paths = expand_configs(configs)
+            if not config_paths:
+                console.print(f"[red]No config files match {', '.join(configs)}.[/red]")
+                return
+            # Templates and recipes are read once here and shared by every run
+            resolver = DbResolver().snapshot(project) if project else DbResolver()
+            started = time.perf_counter()
+            results = list(run_configs(rec.content, config_paths, resolver, jobs, fsync,
+                                       command_timeout=command_timeout, run_timeout=run_timeout))
+            print_summary(results, time.perf_counter() - started)
+            return
+
         # Import engine dependencies
         import toml
         from cli.engine.core import RecipeEngine
+        from cli.engine.config_cache import generate_config
+        from cli.engine import trace
+        from cli.engine.reporter import Reporter
         
         context = {}
         if config:
@@ -129,18 +144,28 @@ def recipe(name, project, config, create_config, config_format, set_default):
             console.print("[red]--format is only valid when generating a config file.[/red]")
             return
             
+        if trace_path:
+            trace.enable()
+
+        reporter = Reporter(output_mode or "normal")
         try:
-            engine = RecipeEngine(context=context, mode=mode)
-            engine.execute(rec.content)
-            
             if mode == "GENERATE_CONFIG":
-                if engine.config_template and format_specified:
+                # Reused from the config cache when the recipe hasn't changed
+                generated, cached = generate_config(rec.content, config_format, reporter, use_cache=not no_cache,
+                                                    command_timeout=command_timeout, run_timeout=run_timeout)
+                if generated.from_template and format_specified:
                     console.print("[red]--format cannot be used when a config template is provided via r.config.[/red]")
                     return
-                engine.render(create_config, output_format=config_format)
-                console.print(f"[green]Config generated at '{create_config}'[/green]")
+                generated.write(create_config, config_format)
+                reporter.finish(f"Config generated at '{create_config}'" + (" (cached)" if cached else ""))
             else:
-                 console.print(f"[green]Recipe '{name}' executed.[/green]")
+                engine = RecipeEngine(context=context, mode=mode, reporter=reporter, fsync=fsync,
+                                      command_timeout=command_timeout, run_timeout=run_timeout)
+                engine.execute(rec.content)
+                reporter.finish(f"Recipe '{name}' executed.")
                  
         except Exception as e:
-            console.print(f"[red]Error executing recipe: {e}[/red]")
+            reporter.error(f"Error executing recipe: {e}")
+            reporter.finish()
+        finally:
+            trace.write(trace_path)
@@ -0,0 +1,48 @@
+import click
+from cli.utils.console import console
+from sqlmodel import select
+from cli.db.session import get_session
+from cli.db.models import Project
+
+
+@click.command("search")
+@click.argument("query")
+@click.option("--type", type=click.Choice(['template', 'recipe'], case_sensitive=False), help="Only search this resource type")
+@click.option("--project", help="Only search resources of this project")
+@click.option("--limit", type=click.IntRange(min=1), default=20, show_default=True, help="Maximum number of hits")
+@click.option("--raw", is_flag=True, help="Pass QUERY through as an FTS5 query (prefix*, OR, NEAR, name:...)")
+def search_cmd(query, type, project, limit, raw):
+    """Full-text search over template and recipe names and contents."""
+    from rich.markup import escape
+    from rich.table import Table
+    from sqlalchemy.exc import OperationalError
+    from cli.db.search import MATCH_END, MATCH_START, SEARCH_TABLES, search
+
+    with get_session() as session:
+        project_id = None
+        if project:
+            project_id = session.exec(select(Project.id).where(Project.name == project)).first()
+            if project_id is None:
+                console.print(f"[red]Project '{project}' not found.[/red]")
+                return
+
+        try:
+            hits = search(session, query, (type.lower(),) if type else SEARCH_TABLES, project_id, limit, raw)
+        except OperationalError as e:
+            console.print(f"[red]Invalid search query: {e.orig}[/red]")
+            return
+
+    if not hits:
+        console.print(f"[dim]No matches for '{escape(query)}'[/dim]")
+        return
+
+    table = Table(title=f"Search: {escape(query)}")
+    table.add_column("Type", style="cyan")
+    table.add_column("Name", style="magenta")
+    table.add_column("Project", style="dim")
+    table.add_column("Match")
+    for kind, name, project_name, snippet in hits:
+        snippet = " ".join(escape(snippet).split())
+        snippet = snippet.replace(MATCH_START, "[bold yellow]").replace(MATCH_END, "[/bold yellow]")
+        table.add_row(kind, escape(name), escape(project_name or "-"), snippet)
+    console.print(table)
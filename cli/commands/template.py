@@ -1,13 +1,12 @@
 import click
 import os
-from rich.console import Console
-from rich.table import Table
+from cli.utils.console import console
 from sqlmodel import select
 from jinja2 import Template as JinjaTemplate
 from cli.db.session import get_session
 from cli.db.models import Template, Project
+from cli.utils.listing import list_options
 
-console = Console()
 
 @click.command("template")
 @click.argument("name", required=False)
@@ -16,9 +15,15 @@ console = Console()
 @click.option("--overwrite", is_flag=True, help="Overwrite existing file")
 @click.option("--config", help="TOML config file")
 @click.option("--create-config", help="Path to create a new config file")
-def template(name, destination, project, overwrite, config, create_config):
+@click.option("--watch", is_flag=True, help="Keep running and re-render when the template or config changes")
+@list_options
+def template(name, destination, project, overwrite, config, create_config, watch,
+             limit, offset, sort, name_filter, list_format):
     """Renders the specified template (or lists templates if no name)."""
-    
+    if watch and (not name or create_config):
+        console.print("[red]--watch needs a template name and --destination (not --create-config).[/red]")
+        return
+
     with get_session() as session:
         # Project resolution
         project_id = None
@@ -31,23 +36,10 @@ def template(name, destination, project, overwrite, config, create_config):
 
         if not name:
             # LIST MODE
-            query = select(Template)
-            if project_id:
-                query = query.where(Template.project_id == project_id)
-            else:
-                query = query.where(Template.project_id == None)
-            
-            templates = session.exec(query).all()
-            
-            title = f"Templates ({project if project else 'Unassigned'})"
-            table = Table(title=title)
-            table.add_column("ID", justify="right", style="cyan")
-            table.add_column("Name", style="magenta")
-            
-            for t in templates:
-                table.add_row(str(t.id), t.name)
-                
-            console.print(table)
+            from cli.utils.listing import listing_query, print_listing
+
+            query = listing_query(Template, project_id, sort=sort, name_filter=name_filter, limit=limit, offset=offset)
+            print_listing(session, Template, query, f"Templates ({project if project else 'Unassigned'})", list_format)
             return
 
         # RENDER MODE
@@ -101,7 +93,10 @@ def template(name, destination, project, overwrite, config, create_config):
             
         if skeleton:
              missing_any = check_missing(skeleton, context)
-             if missing_any:
+             if missing_any and watch:
+                # Re-renders only read the config file, so don't ask for values
+                console.print("[yellow]Template variables are missing from the config; they render empty.[/yellow]")
+             elif missing_any:
                 console.print("[yellow]Template variables are missing. Opening editor...[/yellow]")
                 prompt_data = skeleton.copy()
                 merge_recursive(prompt_data, context)
@@ -129,4 +124,51 @@ def template(name, destination, project, overwrite, config, create_config):
             console.print(f"[green]Template rendered to '{destination}'.[/green]")
         except Exception as e:
             console.print(f"[red]Error rendering template: {e}[/red]")
+            if not watch:
+                return
+        template_id, template_content = tmpl.id, tmpl.content
+
+    if watch:
+        _watch_template(template_id, template_content, context, name, destination, config)
+
+
+def _watch_template(template_id, template_content, context, name, destination, config):
+    """
+    Re-render `destination` whenever the template (edited in the database,
+    e.g. with `kt edit`) or the config file changes. Writes to the database
+    that leave both unchanged are ignored.
+    """
+    import toml
+    from cli.db.session import get_db_path
+    from cli.engine.jinja_utils import render_template_with_shell
+    from cli.engine.watch import Watcher
+
+    files = [get_db_path()] + ([config] if config else [])
+    with Watcher(files=files) as watcher:
+        console.print(f"[dim]Watching for changes ({watcher.method}), press Ctrl-C to stop.[/dim]")
+        try:
+            while True:
+                watcher.wait()
+                with get_session() as session:
+                    content = session.exec(select(Template.content).where(Template.id == template_id)).first()
+                if content is None:
+                    console.print(f"[red]Template '{name}' no longer exists.[/red]")
+                    continue
+                try:
+                    new_context = toml.load(config) if config else {}
+                except Exception as e:
+                    console.print(f"[red]Error reading config: {e}[/red]")
+                    continue
+                if content == template_content and new_context == context:
+                    continue
+                template_content, context = content, new_context
+                try:
+                    rendered = render_template_with_shell(template_content, context)
+                    with open(destination, 'w') as f:
+                        f.write(rendered)
+                    console.print(f"[green]Template re-rendered to '{destination}'.[/green]")
+                except Exception as e:
+                    console.print(f"[red]Error rendering template: {e}[/red]")
+        except KeyboardInterrupt:
+            console.print("[dim]Stopped watching.[/dim]")
 
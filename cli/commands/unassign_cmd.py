@@ -1,10 +1,9 @@
 import click
-from rich.console import Console
-from sqlmodel import select
+from cli.utils.console import console
+from sqlmodel import select, update
 from cli.db.session import get_session
 from cli.db.models import Project, Recipe, Template, Asset
 
-console = Console()
 
 @click.command("unassign")
 @click.option("--recipe", help="Recipe name")
@@ -18,36 +17,21 @@ def unassign_cmd(recipe, template, asset, project):
         return
 
     with get_session() as session:
-        proj = session.exec(select(Project).where(Project.name == project)).first()
-        if not proj:
+        project_id = session.exec(select(Project.id).where(Project.name == project)).first()
+        if project_id is None:
             console.print(f"[red]Project '{project}' not found.[/red]")
             return
 
-        if recipe:
-            rec = session.exec(select(Recipe).where(Recipe.name == recipe).where(Recipe.project_id == proj.id)).first()
-            if rec:
-                rec.project_id = None
-                session.add(rec)
-                console.print(f"[green]Recipe '{recipe}' unassigned from '{project}'.[/green]")
+        # One UPDATE per resource; rows (and their contents) aren't loaded
+        for kind, Model, name in (("Recipe", Recipe, recipe), ("Template", Template, template), ("Asset", Asset, asset)):
+            if not name:
+                continue
+            result = session.execute(
+                update(Model).where(Model.name == name).where(Model.project_id == project_id).values(project_id=None)
+            )
+            if result.rowcount:
+                console.print(f"[green]{kind} '{name}' unassigned from '{project}'.[/green]")
             else:
-                console.print(f"[red]Recipe '{recipe}' not found in project '{project}'.[/red]")
-        
-        if template:
-            tmpl = session.exec(select(Template).where(Template.name == template).where(Template.project_id == proj.id)).first()
-            if tmpl:
-                tmpl.project_id = None
-                session.add(tmpl)
-                console.print(f"[green]Template '{template}' unassigned from '{project}'.[/green]")
-            else:
-                 console.print(f"[red]Template '{template}' not found in project '{project}'.[/red]")
-
-        if asset:
-            ast = session.exec(select(Asset).where(Asset.name == asset).where(Asset.project_id == proj.id)).first()
-            if ast:
-                ast.project_id = None
-                session.add(ast)
-                console.print(f"[green]Asset '{asset}' unassigned from '{project}'.[/green]")
-            else:
-                console.print(f"[red]Asset '{asset}' not found in project '{project}'.[/red]")
+                console.print(f"[red]{kind} '{name}' not found in project '{project}'.[/red]")
 
         session.commit()
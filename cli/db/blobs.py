@@ -0,0 +1,132 @@
+import hashlib
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple
+from sqlalchemy import func, update
+from sqlmodel import select
+from cli.db.models import Asset
+
+# Assets are moved in and out of the database in pieces of this size, so
+# memory use stays flat no matter how large an asset is.
+CHUNK_SIZE = 1024 * 1024
+
+_SHA256_PLACEHOLDER = "0" * 64
+
+
+def _driver_connection(session):
+    """The sqlite3 connection behind `session` (same transaction)."""
+    return session.connection().connection.driver_connection
+
+
+def write_asset_content(session, asset_id: int, stream: BinaryIO, size: Optional[int] = None,
+                        **columns) -> Tuple[int, str]:
+    """
+    Stream `size` bytes of `stream` (by default, the size of the file behind
+    it) into the content of asset `asset_id` using incremental blob I/O,
+    in a single pass. Nothing is committed. Returns (size, sha256).
+
+    Any UPDATE of a row makes SQLite load its whole blob, so one statement
+    preallocates the content with `zeroblob(size)` and sets `size`, a
+    placeholder `sha256` of the final width, and any other `columns`. The
+    digest computed while streaming then overwrites the placeholder in place.
+    """
+    if size is None:
+        size = os.fstat(stream.fileno()).st_size
+
+    session.execute(
+        update(Asset)
+        .where(Asset.id == asset_id)
+        .values(content=func.zeroblob(size), size=size, sha256=_SHA256_PLACEHOLDER, **columns)
+    )
+
+    conn = _driver_connection(session)
+    digest = hashlib.sha256()
+    written = 0
+    with conn.blobopen("asset", "content", asset_id) as blob:
+        while written < size:
+            chunk = stream.read(min(CHUNK_SIZE, size - written))
+            if not chunk:
+                raise IOError(f"Asset source ended after {written} of {size} bytes.")
+            blob.write(chunk)
+            digest.update(chunk)
+            written += len(chunk)
+
+    sha256 = digest.hexdigest()
+    with conn.blobopen("asset", "sha256", asset_id) as blob:
+        blob.write(sha256.encode("ascii"))
+    return size, sha256
+
+
+def import_asset_file(session, name: str, path: str, project_id: Optional[int] = None,
+                      source_path: Optional[str] = None, asset_id: Optional[int] = None) -> int:
+    """
+    Create (or, given `asset_id`, replace) an asset from the file at `path`
+    without reading it into memory. Nothing is committed. Returns the asset id.
+    """
+    if asset_id is None:
+        asset_obj = Asset(name=name, project_id=project_id, source_path=source_path or path, content=b"")
+        session.add(asset_obj)
+        session.flush()
+        asset_id = asset_obj.id
+
+    columns = {"source_path": source_path} if source_path is not None else {}
+    with open(path, 'rb') as f:
+        write_asset_content(session, asset_id, f, **columns)
+    return asset_id
+
+
+@contextmanager
+def open_asset_content(session, asset_id: int):
+    """Open the content of asset `asset_id` as a read-only file-like blob."""
+    with _driver_connection(session).blobopen("asset", "content", asset_id, readonly=True) as blob:
+        yield blob
+
+
+def iter_asset_content(session, asset_id: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the content of asset `asset_id` in chunks."""
+    with open_asset_content(session, asset_id) as blob:
+        while True:
+            chunk = blob.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def copy_asset_content(session, asset_id: int, out: BinaryIO):
+    """Write the content of asset `asset_id` to the open binary file `out`."""
+    for chunk in iter_asset_content(session, asset_id):
+        out.write(chunk)
+
+
+def _hash_blob(driver_connection, asset_id: int) -> Tuple[int, str]:
+    digest = hashlib.sha256()
+    size = 0
+    with driver_connection.blobopen("asset", "content", asset_id, readonly=True) as blob:
+        while chunk := blob.read(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def asset_digest(session, asset_id: int) -> Tuple[int, str]:
+    """
+    Return (size, sha256) of asset `asset_id`. Read-only: assets stored
+    before these columns existed are hashed in memory by streaming their
+    content (`backfill_asset_digests` stores the result once, at startup).
+    """
+    size, sha256 = session.exec(select(Asset.size, Asset.sha256).where(Asset.id == asset_id)).one()
+    if size is not None and sha256 is not None:
+        return size, sha256
+    return _hash_blob(_driver_connection(session), asset_id)
+
+
+def backfill_asset_digests(conn):
+    """
+    Store size and sha256 for assets saved before those columns existed
+    (a one-time cost per asset, since saving rewrites the row). Called from
+    `init_db` on a SQLAlchemy connection; the caller commits.
+    """
+    ids = conn.execute(select(Asset.id).where((Asset.size.is_(None)) | (Asset.sha256.is_(None)))).scalars().all()
+    for asset_id in ids:
+        size, sha256 = _hash_blob(conn.connection.driver_connection, asset_id)
+        conn.execute(update(Asset).where(Asset.id == asset_id).values(size=size, sha256=sha256))
@@ -1,7 +1,18 @@
+import hashlib
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import Index, event, text
+from sqlalchemy.orm.attributes import PASSIVE_NO_INITIALIZE, get_history
 from sqlmodel import Field, SQLModel, Relationship
 
+
+def _unique_name_per_project(table: str) -> Index:
+    """Names are unique within a project (unassigned resources are not constrained)."""
+    return Index(
+        f"ux_{table}_project_name", "project_id", "name",
+        unique=True, sqlite_where=text("project_id IS NOT NULL"),
+    )
+
 class Project(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, unique=True)
@@ -11,28 +22,64 @@ class Project(SQLModel, table=True):
     recipes: List["Recipe"] = Relationship(back_populates="project", cascade_delete=True)
     assets: List["Asset"] = Relationship(back_populates="project", cascade_delete=True)
     default_recipe: Optional[str] = Field(default=None)
+    # Where the project was last imported from (git imports only)
+    source_uri: Optional[str] = Field(default=None)
+    source_commit: Optional[str] = Field(default=None)
 
 class Template(SQLModel, table=True):
+    __table_args__ = (_unique_name_per_project("template"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     content: str
-    project_id: Optional[int] = Field(default=None, foreign_key="project.id", nullable=True)
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id", nullable=True, index=True, ondelete="SET NULL")
+    sha256: Optional[str] = Field(default=None)
     
     project: Optional[Project] = Relationship(back_populates="templates")
 
 class Recipe(SQLModel, table=True):
+    __table_args__ = (_unique_name_per_project("recipe"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     content: str
-    project_id: Optional[int] = Field(default=None, foreign_key="project.id", nullable=True)
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id", nullable=True, index=True, ondelete="SET NULL")
+    sha256: Optional[str] = Field(default=None)
     
     project: Optional[Project] = Relationship(back_populates="recipes")
 
 class Asset(SQLModel, table=True):
+    __table_args__ = (_unique_name_per_project("asset"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     source_path: str
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id", nullable=True, index=True, ondelete="SET NULL")
+    size: Optional[int] = Field(default=None)
+    sha256: Optional[str] = Field(default=None)
+    # Kept as the last column so large contents can be streamed in with
+    # incremental blob I/O (see cli/db/blobs.py)
     content: bytes
-    project_id: Optional[int] = Field(default=None, foreign_key="project.id", nullable=True)
     
     project: Optional[Project] = Relationship(back_populates="assets")
+
+
+@event.listens_for(Template, "before_insert")
+@event.listens_for(Template, "before_update")
+@event.listens_for(Recipe, "before_insert")
+@event.listens_for(Recipe, "before_update")
+@event.listens_for(Asset, "before_insert")
+@event.listens_for(Asset, "before_update")
+def _hash_content(mapper, connection, target):
+    """
+    Keep `sha256` (and `size` for assets) in step with content written
+    through the ORM. Core and blob writers set them explicitly.
+    """
+    # Never load an unmodified (possibly large) content just to check it
+    added = get_history(target, "content", passive=PASSIVE_NO_INITIALIZE).added
+    if not added or added[0] is None:
+        return
+    data = added[0].encode("utf-8") if isinstance(added[0], str) else added[0]
+    target.sha256 = hashlib.sha256(data).hexdigest()
+    if isinstance(target, Asset):
+        target.size = len(data)
@@ -0,0 +1,32 @@
+from sqlalchemy import delete, update
+
+from cli.db.models import Asset, Project, Recipe, Template
+
+RESOURCE_MODELS = (Template, Recipe, Asset)
+
+
+def unassign_resources(session, project_id: int) -> int:
+    """Unassign every resource of a project with one UPDATE per table. Returns the count."""
+    return sum(
+        session.execute(update(model).where(model.project_id == project_id).values(project_id=None)).rowcount
+        for model in RESOURCE_MODELS
+    )
+
+
+def delete_resources(session, project_id: int) -> int:
+    """Delete every resource of a project with one DELETE per table. Returns the count."""
+    return sum(
+        session.execute(delete(model).where(model.project_id == project_id)).rowcount
+        for model in RESOURCE_MODELS
+    )
+
+
+def delete_project(session, project_id: int, recursive: bool = False) -> int:
+    """
+    Delete a project, deleting (`recursive`) or unassigning its resources
+    first, without loading any of them. Returns the number of resources
+    affected. Nothing is committed.
+    """
+    affected = delete_resources(session, project_id) if recursive else unassign_resources(session, project_id)
+    session.execute(delete(Project).where(Project.id == project_id))
+    return affected
@@ -0,0 +1,92 @@
+from sqlalchemy import text
+
+# Resource tables with a full-text index over their name and content
+SEARCH_TABLES = ("template", "recipe")
+
+# Snippet highlight markers (control characters never appear in markup)
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+
+def _fts(table: str) -> str:
+    return f"{table}_fts"
+
+
+def _search_schema(table: str):
+    """(name, CREATE statement) of the FTS5 table and sync triggers for `table`."""
+    fts = _fts(table)
+    insert = f"INSERT INTO {fts}(rowid, name, content) VALUES (new.id, new.name, new.content);"
+    delete = f"INSERT INTO {fts}({fts}, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);"
+    return [
+        (fts, f"CREATE VIRTUAL TABLE {fts} USING fts5(name, content, content='{table}', content_rowid='id')"),
+        (f"{fts}_ai", f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END"),
+        (f"{fts}_ad", f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END"),
+        (f"{fts}_au", f"CREATE TRIGGER {fts}_au AFTER UPDATE OF name, content ON {table} BEGIN {delete} {insert} END"),
+    ]
+
+
+def ensure_search_index(conn):
+    """
+    Create the FTS5 indexes over template and recipe names and contents,
+    kept in sync by triggers on every write path. The index only stores
+    tokens (external content); it is rebuilt from the tables whenever it
+    or one of its triggers had to be (re)created, e.g. for a new database
+    or after a table rebuild dropped the triggers. Skipped when SQLite was
+    built without FTS5 (`kt search` is then unavailable).
+    """
+    options = {row[0] for row in conn.execute(text("PRAGMA compile_options"))}
+    if "ENABLE_FTS5" not in options:
+        return
+    existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master"))}
+    for table in SEARCH_TABLES:
+        missing = [(name, ddl) for name, ddl in _search_schema(table) if name not in existing]
+        if not missing:
+            continue
+        for _, ddl in missing:
+            conn.execute(text(ddl))
+        conn.execute(text(f"INSERT INTO {_fts(table)}({_fts(table)}) VALUES ('rebuild')"))
+
+
+def match_expression(query: str) -> str:
+    """Turn plain search text into an FTS5 query: every word must appear."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search(session, query: str, kinds=SEARCH_TABLES, project_id=None, limit: int = 20, raw: bool = False):
+    """
+    Return the best `limit` matches for `query` as (kind, name, project
+    name, snippet) tuples, ranked by bm25 with name hits weighted above
+    content hits. `raw` passes `query` through as FTS5 syntax (prefixes,
+    OR, NEAR, column filters). Snippets mark matches with MATCH_START and
+    MATCH_END.
+
+    Each table is ranked on its own first, so snippets are only built for
+    the top `limit` hits rather than for every match.
+    """
+    ranked, selects = [], []
+    for table in kinds:
+        fts = _fts(table)
+        scope = (
+            f"JOIN {table} r ON r.id = {fts}.rowid WHERE {fts} MATCH :query AND r.project_id = :project_id"
+            if project_id is not None else f"WHERE {fts} MATCH :query"
+        )
+        ranked.append(
+            f"{table}_hits AS (SELECT {fts}.rowid AS id, bm25({fts}, 10.0, 1.0) AS score "
+            f"FROM {fts} {scope} ORDER BY score LIMIT :limit)"
+        )
+        selects.append(
+            f"SELECT '{table}' AS kind, r.name AS name, p.name AS project, "
+            f"snippet({fts}, -1, :start, :end, '…', 16) AS snippet, h.score AS score "
+            f"FROM {table}_hits h CROSS JOIN {fts} ON {fts}.rowid = h.id JOIN {table} r ON r.id = h.id "
+            f"LEFT JOIN project p ON p.id = r.project_id "
+            f"WHERE {fts} MATCH :query"
+        )
+    sql = "WITH " + ", ".join(ranked) + " " + " UNION ALL ".join(selects) + " ORDER BY score LIMIT :limit"
+    params = {
+        "query": query if raw else match_expression(query),
+        "project_id": project_id,
+        "limit": limit,
+        "start": MATCH_START,
+        "end": MATCH_END,
+    }
+    return [tuple(row[:4]) for row in session.execute(text(sql), params)]
@@ -1,6 +1,10 @@
 import os
 import click
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
 from sqlmodel import SQLModel, create_engine, Session
+from cli.db.search import ensure_search_index
 
 def get_db_path():
     app_dir = click.get_app_dir("kt")
@@ -11,8 +15,111 @@ def get_db_path():
 db_url = f"sqlite:///{get_db_path()}"
 engine = create_engine(db_url)
 
+@event.listens_for(engine, "connect")
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    # SQLite leaves foreign key enforcement (and ON DELETE actions) off by default
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+_initialized = False
+
+def _add_missing_columns(conn):
+    """
+    Lightweight migration: add nullable columns that exist on the models but
+    not yet in an older database (create_all only creates missing tables).
+    """
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}'))
+
+def _foreign_key_actions(conn, table: str):
+    """(column, referenced table, ON DELETE action) of each foreign key of `table` as stored."""
+    return {
+        (row[3], row[2], row[6].upper())
+        for row in conn.exec_driver_sql(f'PRAGMA foreign_key_list("{table}")')
+    }
+
+def _model_foreign_key_actions(table):
+    """(column, referenced table, ON DELETE action) of each foreign key declared on the model."""
+    return {
+        (fk.parent.name, fk.column.table.name, (fk.ondelete or "NO ACTION").upper())
+        for fk in table.foreign_keys
+    }
+
+def _rebuild_outdated_tables(conn):
+    """
+    Rebuild tables whose column order or foreign key actions differ from
+    the model (SQLite can neither reorder columns nor alter a foreign key
+    in place). Asset keeps `content` as its last column so a preallocated
+    `zeroblob` stays compact and can be filled incrementally; databases
+    created before the project_id foreign keys got ON DELETE SET NULL
+    gain it here.
+    """
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = [col["name"] for col in inspector.get_columns(table.name)]
+        wanted = [column.name for column in table.columns]
+        if set(existing) != set(wanted):
+            continue
+        if existing == wanted and _foreign_key_actions(conn, table.name) == _model_foreign_key_actions(table):
+            continue
+        old_name = f"_{table.name}_old"
+        columns = ", ".join(f'"{name}"' for name in wanted)
+        indexes = [index["name"] for index in inspector.get_indexes(table.name)]
+        conn.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "{old_name}"'))
+        for index in indexes:
+            conn.execute(text(f'DROP INDEX IF EXISTS "{index}"'))
+        conn.execute(CreateTable(table))
+        conn.execute(text(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{old_name}"'))
+        conn.execute(text(f'DROP TABLE "{old_name}"'))
+
+def _create_missing_indexes():
+    """
+    Create indexes declared on the models that an older database lacks.
+    A unique index that existing duplicate rows violate is left out; code
+    relying on it checks `has_index` and falls back.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with engine.begin() as conn:
+                    index.create(conn, checkfirst=True)
+            except IntegrityError:
+                continue
+
+def has_index(session, name: str) -> bool:
+    return session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {"name": name}
+    ).first() is not None
+
 def init_db():
+    global _initialized
+    if _initialized:
+        return
     SQLModel.metadata.create_all(engine)
+    with engine.connect() as conn:
+        # Rebuilt tables are copied as they are; foreign keys are neither
+        # checked nor acted on meanwhile (the pragma is ignored inside a
+        # transaction, hence the commits around it)
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.commit()
+        _add_missing_columns(conn)
+        _rebuild_outdated_tables(conn)
+        conn.commit()
+        conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+        conn.commit()
+    _create_missing_indexes()
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+        # Hashes of legacy assets are filled in here, once, so read paths
+        # (exports, batch workers) never write to the database
+        from cli.db.blobs import backfill_asset_digests
+        backfill_asset_digests(conn)
+    _initialized = True
 
 def get_session():
     init_db()
@@ -1,20 +1,26 @@
 import click
-import subprocess
 import os
 import toml
 import re
 from typing import Dict, Any, List
 from jinja2 import Template as JinjaTemplate
-from rich.console import Console
 from collections import OrderedDict
-
-console = Console()
+from cli.engine.manifest import hash_bytes, hash_text, hash_context
+from cli.engine.trace import span
+from cli.engine.asset_cache import AssetCache, LINK_MODES
 
 class Actions:
     def __init__(self, engine):
         self.engine = engine
         self.collected_prompts = OrderedDict()
         self.config_call_count = 0
+        self._asset_cache = None
+
+    @property
+    def asset_cache(self):
+        if self._asset_cache is None:
+            self._asset_cache = AssetCache()
+        return self._asset_cache
         
     def _resolve_var(self, path: str):
         """Resolve a dot-notation path in self.engine.context"""
@@ -121,28 +127,11 @@ class Actions:
             options = dict(options)
             template_name = options.get("template")
             if template_name and self.engine.mode == "GENERATE_CONFIG":
-                 # Resolve template
-                 proj_name = None
-                 tmpl_name = template_name
-                 if "::" in template_name:
-                    proj_name, tmpl_name = template_name.split("::")
-                 
-                 from cli.db.session import get_session
-                 from cli.db.models import Template, Project
-                 from sqlmodel import select
-                 
-                 with get_session() as session:
-                    query = select(Template).where(Template.name == tmpl_name)
-                    if proj_name:
-                        proj = session.exec(select(Project).where(Project.name == proj_name)).first()
-                        if proj:
-                             query = query.where(Template.project_id == proj.id)
-                    
-                    tmpl_obj = session.exec(query).first()
-                    if tmpl_obj:
-                         self.engine.config_template = tmpl_obj.content
-                    else:
-                         console.print(f"[red]Config template '{template_name}' not found. Falling back to default generation.[/red]")
+                 config_template = self.engine.resolve("template", template_name)
+                 if config_template is not None:
+                     self.engine.config_template = config_template
+                 else:
+                     self.engine.reporter.error(f"Config template '{template_name}' not found. Falling back to default generation.")
 
         # Heuristic to find the correct r.config block in the script
         # We search for r.config to preserve order of keys for TOML generation
@@ -355,6 +344,8 @@ class Actions:
 
         if self.engine.mode == "GENERATE_CONFIG": 
             return default if default is not None else ""
+        if not self.engine.interactive:
+            return self._unattended_answer("question", store, default)
         
         # Check if stored variable exists? User might want to overwrite or if missing invoke question.
         # But 'question' implies interaction.
@@ -378,6 +369,8 @@ class Actions:
 
         if self.engine.mode == "GENERATE_CONFIG": 
              return default
+        if not self.engine.interactive:
+            return self._unattended_answer("confirm", store, args.get("default"))
         
         # In Execute mode
         val = click.confirm(prompt_text, default=default)
@@ -387,6 +380,26 @@ class Actions:
         
         return val
 
+    def _unattended_answer(self, action, store, default):
+        """
+        The answer to a prompt when nobody can be asked: the value already
+        in the context under `store` (e.g. from the config file), else the
+        prompt's default. Fails the run when there is neither.
+        """
+        if store and store in self.engine.context:
+            return self.engine.context[store]
+        if default is None:
+            hint = f"set '{store}' in the config or give it a default" if store else "give it a default"
+            raise RuntimeError(f"r.{action} is not available in batch runs; {hint}")
+        if store:
+            self.engine.context[store] = default
+        return default
+
+    def _replaceable(self, path):
+        """An existing output that may be replaced without `overwrite` (see RecipeEngine.replace_own_outputs)."""
+        manifest = self.engine.manifest
+        return self.engine.replace_own_outputs and manifest is not None and manifest.is_own(path)
+
     def template(self, name, args):
         """Render template"""
         if self.engine.mode == "GENERATE_CONFIG": return
@@ -398,57 +411,68 @@ class Actions:
         context = args.get("context", {})
         
         if not output:
-             console.print(f"[red]Template action missing destination.[/red]")
+             self.engine.reporter.error(f"Template action missing destination.")
              return
-             
-        # Resolve 'name'. Name might be "project::template_name" or just "template_name"
-        # If "::", first part is project name.
-        proj_name = None
-        tmpl_name = name
-        if "::" in name:
-            proj_name, tmpl_name = name.split("::")
-            
-        # Fetch template
-        from cli.db.session import get_session
-        from cli.db.models import Template, Project
-        from sqlmodel import select
-        
-        with get_session() as session:
-            query = select(Template).where(Template.name == tmpl_name)
-            if proj_name:
-                proj = session.exec(select(Project).where(Project.name == proj_name)).first()
-                if proj:
-                     query = query.where(Template.project_id == proj.id)
-            
-            tmpl_obj = session.exec(query).first()
-            if not tmpl_obj:
-                console.print(f"[red]Template '{name}' not found.[/red]")
-                return
-                
-            template_content = tmpl_obj.content
-            
+
+        # Convert context to python objects to play nice with Jinja2
+        context = self._lua_to_python(context)
+        self.engine.template_calls.append((name, output, overwrite, context))
+        self.render_template(name, output, overwrite, context)
+
+    def render_template(self, name, output, overwrite, context):
+        """
+        Render template `name` to `output` (the work of r.template, after its
+        arguments are read). Returns True if the file was written.
+        """
+        # Name might be "project::template_name" or just "template_name"
+        template_content = self.engine.resolver.template(name)
+        if template_content is None:
+            self.engine.reporter.error(f"Template '{name}' not found.")
+            return
+
+        manifest = self.engine.manifest
+        inputs = {
+            "kind": "template",
+            "template": hash_text(template_content),
+            "context": hash_context(context),
+        }
+
+        # Shell tag output isn't part of the inputs, so such templates are
+        # always rendered (an identical result still keeps the file as is)
+        has_shell = "{>" in template_content
+
+        writer = self.engine.writer
+        exists = writer.exists(output)
+        if exists and manifest and not has_shell and manifest.is_current(output, inputs):
+            self.engine.reporter.event("unchanged", f"Unchanged {output}", "dim")
+            return
+        if exists and not overwrite and not self._replaceable(output):
+            self.engine.reporter.event("skipped", f"Skipping template '{output}', exists.", "yellow")
+            return
+
         # Render
         try:
-             # Convert context to python objects to play nice with Jinja2
-             context = self._lua_to_python(context)
-
              from cli.engine.jinja_utils import render_template_with_shell
              rendered = render_template_with_shell(template_content, context)
-             
-             # Ensure directory exists
-             out_dir = os.path.dirname(output)
-             if out_dir and not os.path.exists(out_dir):
-                 os.makedirs(out_dir)
-                 
-             if os.path.exists(output) and not overwrite:
-                 console.print(f"[yellow]Skipping template '{output}', exists.[/yellow]")
+             data = rendered.encode("utf-8")
+             if has_shell:
+                 # Shell tags may have touched the filesystem
+                 writer.external_change()
+
+             # Identical output: keep the file (and its mtime) as is
+             if exists and manifest and manifest.has_content(output, data):
+                 manifest.record(output, inputs, hash_bytes(data))
+                 self.engine.reporter.event("unchanged", f"Unchanged {output}", "dim")
                  return
-                 
-             with open(output, 'w') as f:
-                 f.write(rendered)
-             console.print(f"[green]Rendered {output}[/green]")
+
+             with span("write", "io", path=output):
+                 st = writer.write(output, data, replace=exists)
+             if manifest:
+                 manifest.record(output, inputs, hash_bytes(data), st)
+             self.engine.reporter.event("rendered", f"Rendered {output}")
+             return True
         except Exception as e:
-            console.print(f"[red]Error rendering template {name}: {e}[/red]")
+            self.engine.reporter.error(f"Error rendering template {name}: {e}")
 
     def asset(self, name, args):
         """Copy asset"""
@@ -457,86 +481,92 @@ class Actions:
         args = dict(args)
         destination = args.get("destination")
         overwrite = args.get("overwrite", False)
+        link = args.get("link") or "copy"
         
         if not destination:
-             console.print(f"[red]Asset action missing destination.[/red]")
+             self.engine.reporter.error(f"Asset action missing destination.")
+             return
+        if link not in LINK_MODES:
+             self.engine.reporter.error(f"Asset action has invalid link mode '{link}' (expected one of: {', '.join(LINK_MODES)}).")
              return
 
-        proj_name = None
-        asset_name = name
-        if "::" in name:
-            proj_name, asset_name = name.split("::")
+        # Only the size and digest are known here; the content itself is
+        # streamed from the source straight into the destination below
+        resolved = self.engine.resolver.asset(name)
+        if resolved is None:
+            self.engine.reporter.error(f"Asset '{name}' not found.")
+            return
+        size, digest = resolved.size, resolved.digest
+        if link != "copy" and not self.asset_cache.can_link(link, os.path.dirname(destination)):
+            self.engine.reporter.info(f"Cannot {link} asset '{destination}' on this filesystem, copying instead.")
+            link = "copy"
+
+        manifest = self.engine.manifest
+        inputs = {"kind": "asset", "asset": digest}
+        if link != "copy":
+            inputs["link"] = link
+
+        writer = self.engine.writer
+        exists = writer.exists(destination)
+        # A link into the asset cache with the right content still has to become a copy
+        relink = link == "copy" and exists and writer.is_shared(destination)
+        if exists and manifest and not relink and manifest.is_current(destination, inputs):
+            self.engine.reporter.event("unchanged", f"Unchanged {destination}", "dim")
+            return
+        if exists and not overwrite and not self._replaceable(destination):
+             self.engine.reporter.event("skipped", f"Skipping asset '{destination}', exists.", "yellow")
+             return
 
-        from cli.db.session import get_session
-        from cli.db.models import Asset, Project
-        from sqlmodel import select
-        
-        with get_session() as session:
-            query = select(Asset).where(Asset.name == asset_name)
-            if proj_name:
-                proj = session.exec(select(Project).where(Project.name == proj_name)).first()
-                if proj:
-                     query = query.where(Asset.project_id == proj.id)
-            
-            asset_obj = session.exec(query).first()
-            if not asset_obj:
-                console.print(f"[red]Asset '{name}' not found.[/red]")
-                return
-                
-            content = asset_obj.content
+        if link == "copy" and exists and manifest and not relink and manifest.has_digest(destination, digest, size):
+            manifest.record(destination, inputs, digest)
+            self.engine.reporter.event("unchanged", f"Unchanged {destination}", "dim")
+            return
 
-        # Ensure directory
-        out_dir = os.path.dirname(destination)
-        if out_dir and not os.path.exists(out_dir):
-            os.makedirs(out_dir)
-            
-        if os.path.exists(destination) and not overwrite:
-             console.print(f"[yellow]Skipping asset '{destination}', exists.[/yellow]")
-             return
-             
-        with open(destination, 'wb') as f:
-            f.write(content)
-        console.print(f"[green]Copied asset {destination}[/green]")
+        with span("write", "io", path=destination, link=link):
+            st = None
+            if link != "copy":
+                source = self.asset_cache.ensure(digest, resolved.chunks())
+                try:
+                    st = writer.link(destination, source, link)
+                except OSError as e:
+                    self.engine.reporter.info(f"Cannot {link} asset '{destination}' ({e}), copying instead.")
+                    link = "copy"
+            if st is None:
+                st = writer.write(destination, resolved.chunks(), replace=exists)
+        if manifest:
+            manifest.record(destination, inputs, digest, st)
+        if link == "copy":
+            self.engine.reporter.event("copied", f"Copied asset {destination}")
+        else:
+            self.engine.reporter.event("linked", f"Linked asset {destination} ({link})")
 
-    def eval(self, command):
+    def eval(self, command, options=None):
         """Run shell command and return stdout"""
-        # command is a string
+        # command is a string; options may have cwd and timeout (seconds)
+        opts = dict(options) if options else {}
 
-        
         try:
             # We use shell=True to support pipes etc if needed, be careful with security but this is a dev tool
-            output = subprocess.check_output(command, shell=True, text=True)
-            return output.strip()
-        except subprocess.CalledProcessError as e:
-            console.print(f"[red]Eval command failed: {e}[/red]")
+            result = self.engine.processes.run(command, shell=True, cwd=opts.get("cwd"),
+                                               timeout=opts.get("timeout"), capture=True)
+        except OSError as e:
+            self.engine.reporter.error(f"Eval command failed: {e}")
+            return ""
+        finally:
+            self.engine.writer.external_change()
+        if not result.ok:
+            self.engine.reporter.error(f"Eval command failed ({result.failure}): {command}", result.tail)
             return ""
+        return result.output.strip()
 
     def recipe(self, name):
         """Execute another recipe"""
-        # Resolve 'name'. Name might be "project::recipe_name" or just "recipe_name"
-        proj_name = None
-        recipe_name = name
-        if "::" in name:
-            proj_name, recipe_name = name.split("::")
-
-        from cli.db.session import get_session
-        from cli.db.models import Recipe, Project
-        from sqlmodel import select
-
-        with get_session() as session:
-            query = select(Recipe).where(Recipe.name == recipe_name)
-            if proj_name:
-                proj = session.exec(select(Project).where(Project.name == proj_name)).first()
-                if proj:
-                     query = query.where(Recipe.project_id == proj.id)
-            
-            recipe_obj = session.exec(query).first()
-            if not recipe_obj:
-                console.print(f"[red]Recipe '{name}' not found.[/red]")
-                # Should we raise error? For now, just return/log
-                return
-
-            recipe_content = recipe_obj.content
+        # Name might be "project::recipe_name" or just "recipe_name"
+        recipe_content = self.engine.resolve("recipe", name)
+        if recipe_content is None:
+            self.engine.reporter.error(f"Recipe '{name}' not found.")
+            # Should we raise error? For now, just return/log
+            return
 
         # Save current state
         old_content = self.engine.script_content
@@ -548,9 +578,9 @@ class Actions:
         
         try:
             # Execute
-            self.engine.lua.execute(recipe_content)
+            self.engine.run_chunk(recipe_content)
         except Exception as e:
-            console.print(f"[red]Error executing recipe '{name}': {e}[/red]")
+            self.engine.reporter.error(f"Error executing recipe '{name}': {e}")
             raise e
         finally:
             # Restore state
@@ -563,23 +593,34 @@ class Actions:
         if self.engine.mode == "GENERATE_CONFIG": return
 
         # cmd_args is list of strings
-        # options might have cwd
+        # options might have cwd and timeout (seconds)
         
         # Use _lua_to_python to handle command arguments reliably
         cmd_list = self._lua_to_python(cmd_args)
         if not isinstance(cmd_list, list):
             cmd_list = [cmd_list]
+        cmd_list = [str(x) for x in cmd_list]
         
         opts = dict(options) if options else {}
         cwd = opts.get("cwd")
+        command = ' '.join(cmd_list)
         
-        console.print(f"[dim]Running: {' '.join(str(x) for x in cmd_list)}[/dim]")
+        self.engine.reporter.info(f"Running: {command}")
         
         try:
-            subprocess.run(cmd_list, cwd=cwd, check=True)
-        except subprocess.CalledProcessError as e:
-            console.print(f"[red]Command failed: {e}[/red]")
+            # Attached to the terminal (when there's no time limit) unless output is hidden
+            result = self.engine.processes.run(cmd_list, cwd=cwd, timeout=opts.get("timeout"),
+                                               attach=self.engine.reporter.shows_output)
+        except OSError as e:
+            self.engine.reporter.error(f"Command failed: {command}: {e}")
+            return
+        finally:
+            self.engine.writer.external_change()
+        if result.ok:
+            self.engine.reporter.event("ran", f"Ran {command} ({result.usage()})", "dim")
+        else:
             # Should we raise? use 'gate'?
+            self.engine.reporter.error(f"Command failed ({result.failure}, {result.usage()}): {command}", result.tail)
 
     def touch(self, raw_path, options=None):
         """Create a file with optional content"""
@@ -592,18 +633,30 @@ class Actions:
             content = self.f(content)
         overwrite = opts.get("overwrite", False)
 
-        # Ensure directory exists
-        out_dir = os.path.dirname(path)
-        if out_dir and not os.path.exists(out_dir):
-            os.makedirs(out_dir)
+        manifest = self.engine.manifest
+        data = content.encode("utf-8")
+        digest = hash_bytes(data)
+        inputs = {"kind": "touch", "content": digest}
+
+        writer = self.engine.writer
+        exists = writer.exists(path)
+        if exists and manifest and manifest.is_current(path, inputs):
+            self.engine.reporter.event("unchanged", f"Unchanged {path}", "dim")
+            return
+        if exists and not overwrite and not self._replaceable(path):
+            self.engine.reporter.event("skipped", f"Skipping touch '{path}', exists.", "yellow")
+            return
 
-        if os.path.exists(path) and not overwrite:
-            console.print(f"[yellow]Skipping touch '{path}', exists.[/yellow]")
+        if exists and manifest and manifest.has_content(path, data):
+            manifest.record(path, inputs, digest)
+            self.engine.reporter.event("unchanged", f"Unchanged {path}", "dim")
             return
 
-        with open(path, 'w') as f:
-            f.write(content)
-        console.print(f"[green]Touched {path}[/green]")
+        with span("write", "io", path=path):
+            st = writer.write(path, data, replace=exists)
+        if manifest:
+            manifest.record(path, inputs, digest, st)
+        self.engine.reporter.event("touched", f"Touched {path}")
 
     def mkdir(self, raw_path, options=None):
         """Create a directory"""
@@ -616,9 +669,10 @@ class Actions:
         if os.path.exists(path):
             if os.path.isdir(path):
                 # Already exists, nothing to do
+                self.engine.writer.mark_dir(path)
                 return
             else:
-                console.print(f"[red]Cannot create directory '{path}', a file exists at this path.[/red]")
+                self.engine.reporter.error(f"Cannot create directory '{path}', a file exists at this path.")
                 return
 
         try:
@@ -626,25 +680,28 @@ class Actions:
                 os.makedirs(path, exist_ok=True)
             else:
                 os.mkdir(path)
-            console.print(f"[green]Created directory {path}[/green]")
+            self.engine.writer.mark_dir(path, created=True)
+            self.engine.reporter.event("created", f"Created directory {path}")
         except Exception as e:
-            console.print(f"[red]Error creating directory {path}: {e}[/red]")
+            self.engine.reporter.error(f"Error creating directory {path}: {e}")
 
     def delete(self, path):
         """Delete a file or directory recursively"""
         if self.engine.mode == "GENERATE_CONFIG": return
         
         if not os.path.exists(path):
-            console.print(f"[yellow]Skipping delete '{path}', does not exist.[/yellow]")
+            self.engine.reporter.event("skipped", f"Skipping delete '{path}', does not exist.", "yellow")
             return
 
         try:
             if os.path.isfile(path) or os.path.islink(path):
                 os.remove(path)
-                console.print(f"[green]Deleted file {path}[/green]")
+                self.engine.reporter.event("deleted", f"Deleted file {path}")
             elif os.path.isdir(path):
                 import shutil
                 shutil.rmtree(path)
-                console.print(f"[green]Deleted directory {path}[/green]")
+                self.engine.reporter.event("deleted", f"Deleted directory {path}")
         except Exception as e:
-            console.print(f"[red]Error deleting {path}: {e}[/red]")
+            self.engine.reporter.error(f"Error deleting {path}: {e}")
+        finally:
+            self.engine.writer.forget(path)
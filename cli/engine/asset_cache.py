@@ -0,0 +1,114 @@
+import os
+import click
+
+LINK_MODES = ("copy", "hardlink", "symlink", "reflink")
+
+
+def get_cache_dir() -> str:
+    return os.path.join(click.get_app_dir("kt"), "asset-cache")
+
+
+class AssetCache:
+    """
+    Content-addressed store of materialized asset files under the app dir.
+
+    Assets stamped into many workspaces with `link = "hardlink" | "symlink" |
+    "reflink"` point at a single cached copy keyed by the asset's sha256
+    instead of writing the bytes out again every time. Cached files are made
+    read-only so an edit through a hard link can't corrupt other workspaces
+    by accident; hardlinked and symlinked outputs are read-only as a result.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or get_cache_dir()
+        # st_dev -> whether reflinks work on that filesystem
+        self._reflinks = {}
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def can_link(self, mode: str, directory: str) -> bool:
+        """
+        Whether `mode` can point a file in `directory` at the cache. Checked
+        before `ensure`, so a fallback to copying doesn't leave a cache copy
+        nothing links to: hard links and reflinks need the cache on the same
+        filesystem, and reflinks one that supports them.
+        """
+        if mode == "symlink":
+            return True
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            device = os.stat(self.root).st_dev
+            # The directory may not exist yet; its nearest existing parent decides
+            directory = os.path.abspath(directory or ".")
+            while not os.path.isdir(directory):
+                directory = os.path.dirname(directory)
+            if os.stat(directory).st_dev != device:
+                return False
+        except OSError:
+            return False
+        if mode != "reflink":
+            return True
+        if device not in self._reflinks:
+            self._reflinks[device] = _probe_reflink(self.root)
+        return self._reflinks[device]
+
+    def ensure(self, digest: str, content) -> str:
+        """
+        Return the cached file for `digest`, writing `content` (bytes or an
+        iterable of byte chunks) there first if needed.
+        """
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                if isinstance(content, (bytes, bytearray, memoryview)):
+                    f.write(content)
+                else:
+                    for chunk in content:
+                        f.write(chunk)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return path
+
+
+def _probe_reflink(directory: str) -> bool:
+    """Try a reflink between two scratch files in `directory`."""
+    source = os.path.join(directory, f".probe.{os.getpid()}")
+    clone = f"{source}.clone"
+    try:
+        with open(source, 'wb') as f:
+            f.write(b"kt")
+        reflink(source, clone)
+        return True
+    except OSError:
+        return False
+    finally:
+        for path in (source, clone):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def reflink(source: str, destination: str):
+    """
+    Create `destination` as a copy-on-write clone of `source`.
+    Raises OSError where the platform or filesystem doesn't support it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflinks are not supported on this platform")
+    FICLONE = 0x40049409  # Linux ioctl (btrfs, XFS, bcachefs, ...)
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
@@ -0,0 +1,145 @@
+"""
+Run one recipe over many config files.
+
+Every config gets its own RecipeEngine (and so its own LuaRuntime) in a
+worker process. The recipe source and a snapshot of the project's
+templates and recipes are loaded once by the parent and handed to every
+worker, so a run over N configs doesn't do N rounds of database lookups.
+Runs are non-interactive, also when they run in this process:
+`r.question`/`r.confirm` answer with the value the config sets for their
+`store` key or with their default, and fail the config when there is
+neither.
+"""
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import NamedTuple, Optional
+
+from cli.engine.reporter import Reporter, strip_markup
+
+# Lines of command output shown per failed command in the summary
+SUMMARY_DETAIL_LINES = 5
+
+# Resolver shared by every run in this process (see `_init_worker`)
+_resolver = None
+
+
+class ConfigResult(NamedTuple):
+    config: str
+    counts: dict
+    errors: list
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class _CollectingReporter(Reporter):
+    """Keeps a run's tallies and errors for the summary instead of printing them."""
+
+    def __init__(self):
+        super().__init__("quiet")
+        self.messages = []
+
+    def error(self, message: str, details=None):
+        self.errors += 1
+        self.messages.append(strip_markup(message))
+        # Enough command output to tell what went wrong in the summary
+        self.messages.extend(f"  {line}" for line in (details or [])[-SUMMARY_DETAIL_LINES:])
+
+
+def expand_configs(patterns):
+    """Expand glob `patterns` (plain paths are kept as they are) into a sorted, de-duplicated list."""
+    configs = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        configs.extend(path for path in matches if path not in configs)
+    return configs
+
+
+def load_config(path: str) -> dict:
+    """Load a TOML or YAML (by extension) config file."""
+    _, ext = os.path.splitext(path)
+    if ext.lower() in (".yaml", ".yml"):
+        import yaml
+        with open(path, "r") as config_file:
+            return yaml.safe_load(config_file) or {}
+    import toml
+    return toml.load(path)
+
+
+def _init_worker(resolver):
+    global _resolver
+    _resolver = resolver
+    # Connections inherited from the parent must not be reused
+    from cli.db.session import engine
+    engine.dispose(close=False)
+
+
+def run_config(config: str, recipe_content: str, fsync: bool = False, command_timeout: Optional[float] = None,
+               run_timeout: Optional[float] = None) -> ConfigResult:
+    """Execute `recipe_content` with the context loaded from `config`."""
+    from cli.engine.core import RecipeEngine
+
+    reporter = _CollectingReporter()
+    started = time.perf_counter()
+    try:
+        engine = RecipeEngine(context=load_config(config), reporter=reporter, fsync=fsync, resolver=_resolver,
+                              command_timeout=command_timeout, run_timeout=run_timeout, interactive=False)
+        engine.execute(recipe_content)
+    except Exception as e:
+        reporter.error(str(e) or type(e).__name__)
+    return ConfigResult(config, dict(reporter.counts), reporter.messages, time.perf_counter() - started)
+
+
+def run_configs(recipe_content: str, configs, resolver=None, jobs: Optional[int] = None, fsync: bool = False,
+                command_timeout: Optional[float] = None, run_timeout: Optional[float] = None):
+    """
+    Yield a ConfigResult per config, in completion order. `jobs` defaults
+    to the CPU count; 1 runs every config in this process. The timeouts
+    apply to each config's run separately.
+    """
+    global _resolver
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(configs) <= 1:
+        _resolver = resolver
+        for config in configs:
+            yield run_config(config, recipe_content, fsync, command_timeout, run_timeout)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(configs)), initializer=_init_worker,
+                             initargs=(resolver,)) as pool:
+        pending = {pool.submit(run_config, config, recipe_content, fsync, command_timeout, run_timeout): config
+                   for config in configs}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                config = pending.pop(future)
+                error = future.exception()
+                # A worker that died (rather than a failing recipe) still gets a result
+                yield future.result() if error is None else ConfigResult(config, {}, [str(error) or type(error).__name__], 0.0)
+
+
+def print_summary(results, elapsed: float):
+    """Print one table of per-config outcomes and a total line."""
+    from rich.markup import escape
+    from rich.table import Table
+    from cli.engine.reporter import KINDS
+    from cli.utils.console import console
+
+    table = Table(title="Batch run")
+    table.add_column("Config", style="magenta")
+    table.add_column("Status")
+    table.add_column("Actions")
+    table.add_column("Time", justify="right")
+    for result in sorted(results, key=lambda r: r.config):
+        counts = ", ".join(f"{result.counts[k]} {k}" for k in KINDS if result.counts.get(k)) or "-"
+        status = "[green]ok[/green]" if result.ok else f"[red]failed[/red]\n{escape(chr(10).join(result.errors))}"
+        table.add_row(escape(result.config), status, counts, f"{result.elapsed:.2f}s")
+    console.print(table)
+
+    failed = sum(1 for result in results if not result.ok)
+    style = "red" if failed else "green"
+    console.print(f"[{style}]{len(results) - failed} succeeded, {failed} failed in {elapsed:.2f}s.[/{style}]")
@@ -0,0 +1,167 @@
+"""
+Cache of generated config files (`--create-config`).
+
+Generating a config runs the whole recipe in GENERATE_CONFIG mode, yet
+the result only depends on the recipe, the recipes it pulls in with
+`r.recipe` and the `r.config` template. Each entry is keyed by the hash of
+the top-level recipe and records the hash of every nested recipe and
+config template the run resolved; when all of them still resolve to the
+same content, the stored config is reused without starting Lua.
+
+Shell commands make the result depend on more than that (the working
+directory, the user, the time, git state), so a config whose generation
+ran an `r.eval` command or rendered a `{>command<}` tag is never stored.
+Neither is one whose recipe read the environment or the clock from Lua
+(`os.getenv`, `os.time`, `os.date`, ...; see `RecipeEngine.volatile_reads`).
+Pass `--no-cache` to regenerate anyway.
+"""
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import click
+import toml
+
+from cli.engine.manifest import hash_text
+from cli.engine.trace import span
+
+# 2: entries holding r.eval output (stored by version 1) are no longer valid
+# 3: nor are entries holding os.getenv/os.time/os.date results
+CACHE_VERSION = 3
+
+
+def format_config(tree: Dict[str, Any], output_format: str = "toml") -> str:
+    """Serialize a config tree as TOML or YAML, keeping its key order."""
+    normalized_format = (output_format or "toml").lower()
+    if normalized_format == "toml":
+        # toml keeps the order of (Ordered)dicts
+        return toml.dumps(tree)
+    if normalized_format in ("yaml", "yml"):
+        import yaml
+
+        def plain(node):
+            # safe_dump can't represent OrderedDict; plain dicts keep their order
+            if isinstance(node, dict):
+                return {k: plain(v) for k, v in node.items()}
+            if isinstance(node, list):
+                return [plain(v) for v in node]
+            return node
+        return yaml.safe_dump(plain(tree), sort_keys=False)
+    raise ValueError(f"Unsupported config format: {output_format}")
+
+
+def get_cache_dir() -> str:
+    return os.path.join(click.get_app_dir("kt"), "config-cache")
+
+
+class GeneratedConfig:
+    """
+    A generated config: the ordered defaults tree, plus either the rendered
+    `r.config` template or the tree serialized per format.
+    """
+
+    def __init__(self, sources: Dict[str, Optional[str]], tree: OrderedDict,
+                 template_output: Optional[str] = None, outputs: Dict[str, str] = None):
+        self.sources = sources
+        self.tree = tree
+        self.template_output = template_output
+        self.outputs = outputs or {}
+
+    @property
+    def from_template(self) -> bool:
+        return self.template_output is not None
+
+    def text(self, output_format: str = "toml") -> str:
+        if self.from_template:
+            return self.template_output
+        output_format = "yaml" if output_format.lower() == "yml" else output_format.lower()
+        if output_format not in self.outputs:
+            self.outputs[output_format] = format_config(self.tree, output_format)
+        return self.outputs[output_format]
+
+    def write(self, output_path: str, output_format: str = "toml"):
+        text = self.text(output_format)
+        with open(output_path, 'w') as f:
+            f.write(text)
+
+
+class ConfigCache:
+    """On-disk store of GeneratedConfig entries under the app dir, one JSON file per recipe."""
+
+    def __init__(self, root: str = None):
+        self.root = root or get_cache_dir()
+
+    def _path(self, recipe_content: str) -> str:
+        return os.path.join(self.root, f"{hash_text(recipe_content)}.json")
+
+    def lookup(self, recipe_content: str, resolver) -> Optional[GeneratedConfig]:
+        """The cached config for `recipe_content`, or None if missing or stale."""
+        try:
+            with open(self._path(recipe_content), 'r') as f:
+                entry = json.load(f, object_pairs_hook=OrderedDict)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+
+        with span("config.cache", "io"):
+            for source, digest in entry["sources"].items():
+                kind, name = source.split(":", 1)
+                content = getattr(resolver, kind)(name)
+                if (hash_text(content) if content is not None else None) != digest:
+                    return None
+        return GeneratedConfig(entry["sources"], entry["tree"], entry.get("template_output"), entry.get("outputs"))
+
+    def store(self, recipe_content: str, config: GeneratedConfig):
+        path = self._path(recipe_content)
+        entry = {
+            "version": CACHE_VERSION,
+            "sources": config.sources,
+            "tree": config.tree,
+            "template_output": config.template_output,
+            "outputs": config.outputs,
+        }
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+
+def generate_config(recipe_content: str, output_format: str = "toml", reporter=None, resolver=None,
+                    use_cache: bool = True, command_timeout: Optional[float] = None,
+                    run_timeout: Optional[float] = None):
+    """
+    Return (GeneratedConfig, cached) for `recipe_content`, running the
+    recipe in GENERATE_CONFIG mode only when no cached config is current.
+    The result is stored for next time (also when `use_cache` is off),
+    unless generating it ran shell commands or read the environment or
+    the clock from Lua.
+    The timeouts apply to `r.eval` commands, as in RecipeEngine.
+    """
+    from cli.engine.resolver import DbResolver
+
+    resolver = resolver or DbResolver()
+    cache = ConfigCache()
+    config = cache.lookup(recipe_content, resolver) if use_cache else None
+    cached = config is not None
+    cacheable = True
+    if config is None:
+        from cli.engine.core import RecipeEngine
+
+        engine = RecipeEngine(mode="GENERATE_CONFIG", reporter=reporter, resolver=resolver,
+                              command_timeout=command_timeout, run_timeout=run_timeout)
+        engine.execute(recipe_content)
+        template_output = engine.config_text() if engine.config_template else None
+        config = GeneratedConfig(dict(engine.sources), engine.config_tree(), template_output)
+        # Shell output, the environment and the clock can differ from one
+        # directory (or minute) to the next
+        cacheable = (not engine.processes.history and not engine.volatile_reads
+                     and "{>" not in (engine.config_template or ""))
+
+    known_formats = set(config.outputs)
+    config.text(output_format)
+    if cacheable and (not cached or set(config.outputs) != known_formats):
+        cache.store(recipe_content, config)
+    return config, cached
@@ -1,56 +1,185 @@
 import lupa
 from lupa import LuaRuntime
 from cli.engine.actions import Actions
+from cli.engine.config_cache import format_config
+from cli.engine.manifest import OutputManifest, hash_text
+from cli.engine.process import ProcessSupervisor
+from cli.engine.reporter import Reporter
+from cli.engine.resolver import DbResolver
+from cli.engine.writer import FileWriter
+from cli.engine.trace import span, traced
 from typing import Dict, Any, Optional
 import os
 import toml
 from collections import OrderedDict
 
+# Compiled chunks an engine keeps before starting over
+MAX_CHUNKS = 64
+# Lua library functions whose result depends on the environment, the time
+# or the shell rather than on the recipe (see `RecipeEngine.volatile_reads`)
+VOLATILE_FUNCTIONS = (("os", "getenv"), ("os", "time"), ("os", "date"), ("os", "clock"),
+                      ("os", "execute"), ("io", "popen"))
+
 class RecipeEngine:
-    def __init__(self, context: Dict[str, Any] = None, mode: str = "EXECUTE"):
+    def __init__(self, context: Dict[str, Any] = None, mode: str = "EXECUTE", reporter: Optional[Reporter] = None, fsync: bool = False,
+                 resolver=None, command_timeout: Optional[float] = None, run_timeout: Optional[float] = None,
+                 interactive: bool = True):
         """
         mode: "EXECUTE" or "GENERATE_CONFIG"
+        reporter: where per-action output goes (defaults to printing every action)
+        fsync: sync all written files to disk in one batch at the end of the run
+        resolver: where templates, recipes and assets are looked up (defaults to the database)
+        command_timeout: seconds each r.run/r.eval command may take (None: no limit)
+        run_timeout: seconds all commands of a run may take together (None: no limit)
+        interactive: False when nobody is there to answer prompts (batch runs): r.question
+            and r.confirm then take the value from the context or their default, or fail
         """
         self.lua = LuaRuntime(unpack_returned_tuples=True)
         self.context = context or {}
         self.mode = mode
+        self.interactive = interactive
+        self.reporter = reporter or Reporter()
+        self.resolver = resolver or DbResolver()
         self.actions = Actions(self)
         self.script_content = ""
         self.config_template = None
-        
+        # "kind:name" -> sha256 of what each recipe and config template
+        # lookup resolved to (None if missing); see `resolve`
+        self.sources = OrderedDict()
+        # (name, destination, overwrite, context) of every r.template call of
+        # the last run, so single outputs can be re-rendered (watch mode)
+        self.template_calls = []
+        # Compiled Lua chunks by source, kept for repeated runs
+        self._chunks = {}
+        # Output manifest for incremental re-renders (only needed when writing files)
+        self.manifest = OutputManifest() if mode == "EXECUTE" else None
+        # Replace existing outputs without `overwrite` when they are still
+        # what kt wrote (watch mode, where re-runs are expected to update them)
+        self.replace_own_outputs = False
+        self.writer = FileWriter(fsync=fsync)
+        self.processes = ProcessSupervisor(timeout=command_timeout, total_timeout=run_timeout,
+                                           echo=lambda line, err: self.reporter.output(line, err))
+        # Names ("os.getenv", ...) of the VOLATILE_FUNCTIONS the last run called
+        self.volatile_reads = set()
+        self._record_volatile_reads()
+
+    def _record_volatile_reads(self):
+        """Wrap the VOLATILE_FUNCTIONS of the Lua runtime so calls land in `volatile_reads`."""
+        wrap = self.lua.eval("""
+            function(library, name, record)
+                local original = _G[library][name]
+                _G[library][name] = function(...)
+                    record(library .. "." .. name)
+                    return original(...)
+                end
+            end
+        """)
+        for library, name in VOLATILE_FUNCTIONS:
+            wrap(library, name, self.volatile_reads.add)
+
     def execute(self, script_content: str):
         self.script_content = script_content
+        # Per-run state, for engines that run more than once
+        self.actions.config_call_count = 0
+        self.template_calls = []
+        self.volatile_reads.clear()
+        self.processes.start()
         # Setup 'r' table
         r = self.lua.table()
         
-        # Bind actions
-        # Bind actions
-        r.declare = self.actions.declare
-        r.config = self.actions.config
-        r.question = self.actions.question
-        r.confirm = self.actions.confirm
-        r.template = self.actions.template
-        r.asset = self.actions.asset
-        r.run = self.actions.run
-        r.touch = self.actions.touch
-        r.eval = self.actions.eval
-
-        r.mkdir = self.actions.mkdir
-        r.delete = self.actions.delete
-        r.f = self.actions.f
-        r.ref = self.actions.ref
-        r.splice = self.actions.splice
-        r.recipe = self.actions.recipe
+        # Bind actions (each call is recorded as a span when tracing)
+        bindings = {
+            "declare": self.actions.declare,
+            "config": self.actions.config,
+            "question": self.actions.question,
+            "confirm": self.actions.confirm,
+            "template": self.actions.template,
+            "asset": self.actions.asset,
+            "run": self.actions.run,
+            "touch": self.actions.touch,
+            "eval": self.actions.eval,
+            "mkdir": self.actions.mkdir,
+            "delete": self.actions.delete,
+            "f": self.actions.f,
+            "ref": self.actions.ref,
+            "splice": self.actions.splice,
+            "recipe": self.actions.recipe,
+        }
+        for action_name, func in bindings.items():
+            r[action_name] = traced(f"r.{action_name}", func)
         
         self.lua.globals().r = r
         
         # Execute script
         try:
-            self.lua.execute(script_content)
+            with span("recipe", "recipe", mode=self.mode):
+                self.run_chunk(script_content)
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            raise RuntimeError(f"Lua execution error: {e}")
+            if self.interactive:
+                import traceback
+                traceback.print_exc()
+            # Some exceptions (click.Abort) have no message
+            raise RuntimeError(f"Lua execution error: {str(e) or type(e).__name__}")
+        finally:
+            # Persist whatever was written, even if the recipe failed part way
+            if self.manifest:
+                self.manifest.save()
+            self.writer.flush()
+
+    def run_chunk(self, script_content: str):
+        """Run Lua source, compiling each distinct source only once per engine."""
+        chunk = self._chunks.get(script_content)
+        if chunk is None:
+            if len(self._chunks) >= MAX_CHUNKS:
+                self._chunks.clear()
+            chunk = self._chunks[script_content] = self.lua.compile(script_content)
+        return chunk()
+
+    def resolve(self, kind: str, name: str) -> Optional[str]:
+        """
+        Look up a "template" or "recipe" through the resolver, recording
+        which content the name resolved to (see `sources`).
+        """
+        content = getattr(self.resolver, kind)(name)
+        self.sources[f"{kind}:{name}"] = hash_text(content) if content is not None else None
+        return content
+
+    def config_tree(self) -> OrderedDict:
+        """The collected config defaults, overridden by values already in the context."""
+        def deep_filter(mask, source):
+            result = OrderedDict()
+            for k, v in mask.items():
+                if isinstance(v, dict):
+                    if k in source and isinstance(source[k], dict):
+                        nested = deep_filter(v, source[k])
+                        if nested:
+                            result[k] = nested
+                else:
+                    # Leaf
+                    if k in source:
+                        result[k] = source[k]
+                    else:
+                        result[k] = v
+            return result
+
+        return deep_filter(self.actions.collected_prompts, self.context)
+
+    def config_text(self, output_format: str = "toml") -> str:
+        """The generated config file: the r.config template rendered, or the config tree in `output_format`."""
+        if self.config_template:
+            # Render using the stored template logic
+            # We need to render the template with the collected context
+            from cli.engine.jinja_utils import render_template_with_shell
+
+            # Combine collected prompts and context
+            render_context = self.context.copy()
+            render_context.update(self.actions.collected_prompts)
+
+            # Convert to python objects for Jinja
+            render_context = self.actions._lua_to_python(render_context)
+
+            return render_template_with_shell(self.config_template, render_context)
+        return format_config(self.config_tree(), output_format)
 
     def render(self, output_path: Optional[str] = None, output_format: str = "toml"):
         """
@@ -60,54 +189,9 @@ class RecipeEngine:
         if self.mode == "GENERATE_CONFIG":
             if not output_path:
                 raise ValueError("output_path is required for GENERATE_CONFIG mode")
-
-            def deep_filter(mask, source):
-                result = OrderedDict()
-                for k, v in mask.items():
-                    if isinstance(v, dict):
-                        if k in source and isinstance(source[k], dict):
-                            nested = deep_filter(v, source[k])
-                            if nested:
-                                result[k] = nested
-                    else:
-                        # Leaf
-                        if k in source:
-                            result[k] = source[k]
-                        else:
-                            result[k] = v
-                return result
-
-            if self.config_template:
-                # Render using the stored template logic
-                # We need to render the template with the collected context
-                from cli.engine.jinja_utils import render_template_with_shell
-                
-                # Combine collected prompts and context
-                render_context = self.context.copy()
-                render_context.update(self.actions.collected_prompts)
-                
-                # Convert to python objects for Jinja
-                render_context = self.actions._lua_to_python(render_context)
-                
-                rendered = render_template_with_shell(self.config_template, render_context)
-                
-                with open(output_path, 'w') as f:
-                    f.write(rendered)
-            else:
-                final_output = deep_filter(self.actions.collected_prompts, self.context)
-                normalized_format = (output_format or "toml").lower()
-
-                if normalized_format == "toml":
-                    # Use toml.dump with OrderedDict support if possible
-                    # Standard toml library supports OrderedDict if passed directly
-                    with open(output_path, 'w') as f:
-                        toml.dump(final_output, f)
-                elif normalized_format in ("yaml", "yml"):
-                    import yaml
-                    with open(output_path, 'w') as f:
-                        yaml.safe_dump(final_output, f, sort_keys=False)
-                else:
-                    raise ValueError(f"Unsupported config format: {output_format}")
-
+            text = self.config_text(output_format)
+            with open(output_path, 'w') as f:
+                f.write(text)
             return True
         return False
+
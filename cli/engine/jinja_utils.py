@@ -1,6 +1,8 @@
 import re
 import subprocess
+from functools import lru_cache
 from jinja2 import Environment, nodes, meta, Template as JinjaTemplate
+from cli.engine.trace import span
 
 def extract_nested_variables(content):
     """
@@ -83,6 +85,20 @@ def check_missing(skel, ctx):
     return False
 
 
+_env = Environment()
+
+
+@lru_cache(maxsize=256)
+def compile_template(template_content):
+    """
+    Compile template source, once per distinct content in this process
+    (a template rendered to many outputs, or again in watch mode, is not
+    recompiled).
+    """
+    with span("jinja.compile", "jinja"):
+        return _env.from_string(template_content)
+
+
 def render_template_with_shell(template_content, context):
     """
     Renders a Jinja2 template and then processes shell command tags {>command<}.
@@ -90,22 +106,23 @@ def render_template_with_shell(template_content, context):
     """
     # 1. First Pass: Render Jinja2 variables
     # This allows things like {>echo {{name}}<}
-    env = Environment()
-    template = env.from_string(template_content)
-    intermediate_content = template.render(context)
+    template = compile_template(template_content)
+    with span("jinja.render", "jinja"):
+        intermediate_content = template.render(context)
 
     # 2. Second Pass: Process shell commands {>...<}
     def replace_shell(match):
         command = match.group(1).strip()
         try:
             # Execute command and return output
-            result = subprocess.run(
-                command,
-                shell=True,
-                check=True,
-                capture_output=True,
-                text=True
-            )
+            with span("shell", "process", command=command):
+                result = subprocess.run(
+                    command,
+                    shell=True,
+                    check=True,
+                    capture_output=True,
+                    text=True
+                )
             return result.stdout.strip()
         except subprocess.CalledProcessError as e:
             return f"ERROR: Command '{command}' failed with exit code {e.returncode}: {e.stderr.strip()}"
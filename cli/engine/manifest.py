@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+MANIFEST_NAME = ".kt-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_context(context: Any) -> str:
+    """
+    Hash a template context in canonical form (sorted keys, no whitespace),
+    so that key order coming from Lua tables doesn't change the result.
+    """
+    canonical = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+    return hash_text(canonical)
+
+
+class OutputManifest:
+    """
+    Records, for every file written by a recipe run, the hashes of the inputs
+    that produced it and of the bytes that were written.
+
+    The manifest lives at the root of the target tree (the working directory
+    of the run). On the next run, an output whose inputs are unchanged and
+    whose file on disk still matches the recorded hash is left untouched.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or os.getcwd())
+        self.path = os.path.join(self.root, MANIFEST_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = self._read()
+        # Entries recorded by this run (merged into the file on save)
+        self.changed: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # A corrupt manifest only costs us a full re-render
+            return {}
+        if data.get("version") == MANIFEST_VERSION:
+            return data.get("outputs", {})
+        return {}
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def _file_matches(self, path: str, entry: Dict[str, Any]) -> bool:
+        """Check whether the file on disk is still the one we wrote."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_size != entry.get("size"):
+            return False
+        # Same size and mtime: trust it without reading the file back
+        if st.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        return hash_file(path) == entry.get("sha256")
+
+    def is_current(self, path: str, inputs: Dict[str, str]) -> bool:
+        """
+        True if `path` was produced from exactly `inputs` and has not been
+        edited by hand since.
+        """
+        entry = self.entries.get(self._key(path))
+        if not entry or entry.get("inputs") != inputs:
+            return False
+        return self._file_matches(path, entry)
+
+    def is_own(self, path: str) -> bool:
+        """True if `path` is still exactly what a recipe run last wrote there (whatever the inputs)."""
+        entry = self.entries.get(self._key(path))
+        return bool(entry) and self._file_matches(path, entry)
+
+    def has_content(self, path: str, data: bytes) -> bool:
+        """True if the file at `path` already holds exactly `data`."""
+        return self.has_digest(path, hash_bytes(data), len(data))
+
+    def has_digest(self, path: str, sha256: str, size: int) -> bool:
+        """True if the file at `path` has the given size and sha256."""
+        try:
+            if os.path.getsize(path) != size:
+                return False
+        except OSError:
+            return False
+        return hash_file(path) == sha256
+
+    def record(self, path: str, inputs: Dict[str, str], sha256: str, st: Optional[os.stat_result] = None):
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+        key = self._key(path)
+        self.entries[key] = self.changed[key] = {
+            "inputs": inputs,
+            "sha256": sha256,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        self.dirty = True
+
+    def save(self):
+        """
+        Merge this run's entries into the manifest file. Runs sharing a
+        target tree (e.g. a batch over many configs) save under a lock and
+        re-read the file first, so none of them drops the others' entries.
+        """
+        if not self.dirty:
+            return
+        with _locked(self.root):
+            self.entries = self._read()
+            self.entries.update(self.changed)
+            data = {"version": MANIFEST_VERSION, "outputs": self.entries}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        self.changed = {}
+        self.dirty = False
+
+
+@contextmanager
+def _locked(directory: str):
+    """
+    Hold an exclusive lock on `directory` itself, so no lock file is left
+    in the target tree (a no-op where fcntl is unavailable).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
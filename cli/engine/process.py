@@ -0,0 +1,288 @@
+"""
+Supervised subprocesses for `r.run` and `r.eval`.
+
+A command with no time limit whose output isn't captured runs attached to
+the terminal, as a plain subprocess would: it can prompt, open an editor
+or detect a TTY. Any other command (and every command when output is to
+be hidden) runs supervised instead: in its own process group with stdin
+closed, its output streamed line by line as it arrives (only the last
+lines are kept, for error reports, so a chatty command doesn't grow
+memory). A supervised command that outlives its timeout, or the time left
+for the whole run, is killed together with everything it started; so is a
+command running when the user presses Ctrl-C. CPU time and peak memory
+are recorded for each command.
+"""
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+from cli.engine.trace import span
+
+# Lines of output kept for error reports
+TAIL_LINES = 40
+# Longest partial line buffered before it's passed on as is
+MAX_LINE = 8192
+# Most output `capture` collects (r.eval returns it as a string)
+MAX_CAPTURE = 16 * 1024 * 1024
+# Time a command gets to exit after SIGTERM (or Ctrl-C) before SIGKILL
+KILL_GRACE = 2.0
+# Time output is still read after a command exited (children it left
+# behind may hold its pipes open)
+EXIT_DRAIN = 1.0
+
+_POSIX = os.name == "posix"
+
+
+class CommandResult(NamedTuple):
+    returncode: Optional[int]
+    # Captured stdout (`capture=True` only)
+    output: Optional[str]
+    # Last lines of output, for error reports (supervised commands only)
+    tail: List[str]
+    elapsed: float
+    # User + system CPU seconds and peak resident memory (KiB), where known
+    cpu: Optional[float]
+    max_rss: Optional[int]
+    # Why the command failed ("exit 1", "timed out after 30s", ...), None if it didn't
+    failure: Optional[str]
+    # max_rss is only an upper bound: Linux charges a child with the memory
+    # of the process it was forked from, so a peak no higher than kt's own
+    # may be kt's rather than the command's
+    rss_upper_bound: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.failure is None
+
+    def usage(self) -> str:
+        parts = [f"{self.elapsed:.2f}s"]
+        if self.cpu is not None:
+            parts.append(f"cpu {self.cpu:.2f}s")
+        if self.max_rss is not None:
+            bound = "≤ " if self.rss_upper_bound else ""
+            parts.append(f"max rss {bound}{self.max_rss / 1024:.1f} MB")
+        return ", ".join(parts)
+
+
+def _echo(line: str, err: bool):
+    stream = sys.stderr if err else sys.stdout
+    stream.write(line + "\n")
+    stream.flush()
+
+
+class ProcessSupervisor:
+    """
+    Runs the commands of a recipe run. `timeout` is the default limit per
+    command and `total_timeout` the time all commands of a run may take
+    together (counted from `start`); both are in seconds, None for no limit.
+    `echo(line, err)` receives the output of supervised commands (stdout or
+    stderr) line by line.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, total_timeout: Optional[float] = None,
+                 echo: Callable[[str, bool], None] = _echo):
+        self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.echo = echo
+        self.deadline = None
+        # (command, CommandResult) of every command run so far
+        self.history = []
+        self.start()
+
+    def start(self):
+        """Begin a run: the total timeout counts from now."""
+        self.deadline = time.monotonic() + self.total_timeout if self.total_timeout else None
+        self.history = []
+
+    def run(self, args, shell: bool = False, cwd: Optional[str] = None, timeout: Optional[float] = None,
+            capture: bool = False, attach: bool = True) -> CommandResult:
+        """
+        Run `args` (a list, or a string with `shell`). With `capture`,
+        stdout is collected and returned instead of echoed. `attach` lets a
+        command with no time limit inherit the terminal; pass False to have
+        its output go through `echo` (e.g. when output is hidden). Raises
+        OSError if the command can't be started.
+        """
+        command = args if isinstance(args, str) else " ".join(str(a) for a in args)
+        started = time.monotonic()
+        limit = timeout if timeout is not None else self.timeout
+        per_call = started + limit if limit else None
+        deadlines = [d for d in (per_call, self.deadline) if d is not None]
+        deadline = min(deadlines) if deadlines else None
+        if deadline is not None and deadline <= started:
+            result = CommandResult(None, None, [], 0.0, None, None, "not started (run time limit reached)")
+            self.history.append((command, result))
+            return result
+
+        with span("process", "process", command=command):
+            if attach and deadline is None and not capture:
+                result = self._run_attached(args, shell, cwd, started)
+            else:
+                result = self._run(args, shell, cwd, capture, started, deadline, limit, per_call)
+        self.history.append((command, result))
+        return result
+
+    def _run_attached(self, args, shell, cwd, started) -> CommandResult:
+        own_peak = _own_peak()
+        # Same process group as kt: Ctrl-C at the terminal reaches the command directly
+        proc = subprocess.Popen(args, shell=shell, cwd=cwd)
+        try:
+            status, rusage = self._reap(proc)
+        except KeyboardInterrupt:
+            try:
+                proc.wait(KILL_GRACE)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            raise
+        return _result(proc, status, rusage, None, [], None, started, own_peak)
+
+    def _run(self, args, shell, cwd, capture, started, deadline, limit, per_call) -> CommandResult:
+        own_peak = _own_peak()
+        kwargs = {"process_group": 0} if _POSIX else {}
+        proc = subprocess.Popen(args, shell=shell, cwd=cwd, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        tail = deque(maxlen=TAIL_LINES)
+        captured = bytearray() if capture else None
+        partial = {proc.stdout: b"", proc.stderr: b""}
+        failure = None
+        exited = None  # (status, rusage, time) once reaped
+
+        def timed_out():
+            return f"timed out after {limit:g}s" if deadline == per_call else "timed out (run time limit reached)"
+
+        def emit(pipe, line: bytes):
+            text = line.decode(errors="replace")
+            tail.append(text)
+            self.echo(text, pipe is proc.stderr)
+
+        selector = selectors.DefaultSelector()
+        for pipe in partial:
+            selector.register(pipe, selectors.EVENT_READ)
+        try:
+            while selector.get_map():
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    failure = timed_out()
+                    break
+                if exited and now - exited[2] >= EXIT_DRAIN:
+                    break
+                wait = 0.2 if deadline is None else max(0.0, min(0.2, deadline - now))
+                for key, _ in selector.select(wait):
+                    pipe = key.fileobj
+                    data = os.read(pipe.fileno(), 64 * 1024)
+                    if not data:
+                        selector.unregister(pipe)
+                        if partial[pipe]:
+                            emit(pipe, partial[pipe])
+                            partial[pipe] = b""
+                        continue
+                    if captured is not None and pipe is proc.stdout:
+                        captured += data
+                        if len(captured) > MAX_CAPTURE:
+                            failure = f"output exceeded {MAX_CAPTURE // (1024 * 1024)} MB"
+                            break
+                        continue
+                    *lines, rest = (partial[pipe] + data).split(b"\n")
+                    for line in lines:
+                        emit(pipe, line)
+                    if len(rest) > MAX_LINE:
+                        emit(pipe, rest)
+                        rest = b""
+                    partial[pipe] = rest
+                if failure:
+                    break
+                if exited is None:
+                    exited = self._poll(proc)
+        except KeyboardInterrupt:
+            self._kill(proc, exited)
+            raise
+        finally:
+            selector.close()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        # Both pipes are closed; the command itself may still be running
+        while failure is None and exited is None:
+            if deadline is None:
+                status, rusage = self._reap(proc)
+                exited = (status, rusage, time.monotonic())
+            elif time.monotonic() >= deadline:
+                failure = timed_out()
+            else:
+                exited = self._poll(proc) or time.sleep(0.01)
+        if failure:
+            exited = self._kill(proc, exited)
+        status, rusage = exited[:2]
+        output = captured.decode(errors="replace") if captured is not None else None
+        return _result(proc, status, rusage, output, list(tail), failure, started, own_peak)
+
+    def _poll(self, proc):
+        """(status, rusage, time) if the command has exited (reaping it), else None."""
+        if not _POSIX:
+            return (proc.returncode, None, time.monotonic()) if proc.poll() is not None else None
+        pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+        return (status, rusage, time.monotonic()) if pid else None
+
+    def _reap(self, proc):
+        """Wait for the command to exit; returns (status, rusage)."""
+        if not _POSIX:
+            return proc.wait(), None
+        _, status, rusage = os.wait4(proc.pid, 0)
+        return status, rusage
+
+    def _kill(self, proc, exited=None):
+        """
+        Terminate the command's process group (SIGTERM, then SIGKILL after
+        KILL_GRACE). Returns (status, rusage, time) of the command.
+        """
+        if not _POSIX:
+            proc.kill()
+            return exited or (proc.wait(), None, time.monotonic())
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(proc.pid, sig)
+            except ProcessLookupError:
+                pass
+            if exited:
+                # Only children it left behind were still running
+                return exited
+            give_up = time.monotonic() + KILL_GRACE
+            while time.monotonic() < give_up:
+                exited = self._poll(proc)
+                if exited:
+                    return exited
+                time.sleep(0.05)
+        status, rusage = self._reap(proc)
+        return status, rusage, time.monotonic()
+
+
+def _own_peak() -> Optional[int]:
+    """kt's own peak resident memory (in ru_maxrss units), before starting a command."""
+    if not _POSIX:
+        return None
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _result(proc, status, rusage, output, tail, failure, started, own_peak) -> CommandResult:
+    returncode = proc.returncode = _exit_code(status)
+    if failure is None and returncode != 0:
+        failure = f"killed by signal {-returncode}" if returncode < 0 else f"exit {returncode}"
+    cpu = max_rss = None
+    upper_bound = False
+    if rusage is not None:
+        cpu = rusage.ru_utime + rusage.ru_stime
+        upper_bound = own_peak is not None and rusage.ru_maxrss <= own_peak
+        # ru_maxrss is in bytes on macOS, KiB elsewhere
+        max_rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    return CommandResult(returncode, output, tail, time.monotonic() - started, cpu, max_rss, failure, upper_bound)
+
+
+def _exit_code(status) -> int:
+    return os.waitstatus_to_exitcode(status) if _POSIX else status
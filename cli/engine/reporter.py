@@ -0,0 +1,130 @@
+import re
+import sys
+import time
+from collections import Counter
+
+OUTPUT_MODES = ("normal", "quiet", "progress")
+
+# Order in which tallies are shown
+KINDS = ("rendered", "copied", "linked", "touched", "created", "deleted", "ran", "unchanged", "skipped")
+
+_MARKUP_RE = re.compile(r'\[/?[a-z ]+\]')
+
+
+def strip_markup(text: str) -> str:
+    return _MARKUP_RE.sub("", text)
+
+
+class _Tally:
+    """Renderable for the live progress line; formatted only when rich refreshes."""
+
+    def __init__(self, reporter):
+        self.reporter = reporter
+
+    def __rich__(self):
+        from rich.text import Text
+        return Text(f"{self.reporter.total} actions  {self.reporter.format_counts()}", style="cyan")
+
+
+class Reporter:
+    """
+    Routes per-action output from a recipe run.
+
+    - normal: every action prints a line through rich (the default)
+    - quiet: only errors and a final summary are printed
+    - progress: a single live line with per-action tallies, then the summary
+
+    In quiet and progress modes rich is never imported when stdout is not a
+    TTY; output is plain text instead.
+    """
+
+    def __init__(self, mode: str = "normal"):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {mode}")
+        self.mode = mode
+        self.counts = Counter()
+        self.total = 0
+        self.errors = 0
+        self.interactive = sys.stdout.isatty()
+        self.use_rich = mode == "normal" or self.interactive
+        self._live = None
+        self._started = time.perf_counter()
+
+    @property
+    def console(self):
+        from cli.utils.console import get_console
+        return get_console()
+
+    def _print(self, message: str, style: str = None, err: bool = False):
+        if self.use_rich:
+            self.console.print(f"[{style}]{message}[/{style}]" if style else message)
+        else:
+            stream = sys.stderr if err else sys.stdout
+            stream.write(strip_markup(message) + "\n")
+
+    def _start_live(self):
+        from rich.live import Live
+        self._live = Live(_Tally(self), console=self.console, refresh_per_second=8, transient=True)
+        self._live.start()
+
+    def event(self, kind: str, message: str = None, style: str = "green"):
+        """Record a completed action (rendered file, copied asset, skip, ...)."""
+        self.counts[kind] += 1
+        self.total += 1
+        if self.mode == "normal":
+            if message:
+                self._print(message, style)
+        elif self.mode == "progress" and self.interactive and self._live is None:
+            self._start_live()
+
+    def info(self, message: str, style: str = "dim"):
+        """Informational output that is only shown in normal mode."""
+        if self.mode == "normal":
+            self._print(message, style)
+
+    def output(self, line: str, err: bool = False):
+        """A line of output from a command the recipe runs (not shown in quiet mode)."""
+        if self.mode == "quiet":
+            return
+        if self._live is not None:
+            # Printed above the live line
+            self.console.print(line, markup=False, highlight=False, style="red" if err else None)
+            return
+        stream = sys.stderr if err else sys.stdout
+        stream.write(line + "\n")
+        stream.flush()
+
+    @property
+    def shows_output(self) -> bool:
+        """Whether commands may write straight to the terminal (only in normal mode)."""
+        return self.mode == "normal"
+
+    def error(self, message: str, details=None):
+        """An error, optionally followed by `details` lines (e.g. command output) printed as they are."""
+        self.errors += 1
+        self._print(message, "red", err=True)
+        for line in details or ():
+            if self.use_rich:
+                self.console.print(f"  {line}", style="dim", markup=False, highlight=False)
+            else:
+                sys.stderr.write(f"  {line}\n")
+
+    def format_counts(self) -> str:
+        parts = [f"{self.counts[k]} {k}" for k in KINDS if self.counts[k]]
+        parts.extend(f"{v} {k}" for k, v in self.counts.items() if k not in KINDS)
+        if self.errors:
+            parts.append(f"{self.errors} errors")
+        return ", ".join(parts) if parts else "nothing to do"
+
+    def finish(self, message: str = None):
+        """Stop live output and print the final message (plus summary when not in normal mode)."""
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+        if self.mode == "normal":
+            if message:
+                self._print(message, "green")
+            return
+        elapsed = time.perf_counter() - self._started
+        summary = f"{self.format_counts()} in {elapsed:.2f}s"
+        self._print(f"{message} ({summary})" if message else summary, "green")
@@ -0,0 +1,228 @@
+"""
+Where recipes find the templates, recipes and assets they refer to.
+
+`r.template`, `r.asset`, `r.recipe` and `r.config{template=...}` resolve
+names through the engine's resolver. Names are "resource" or
+"project::resource"; a qualified name whose project doesn't exist is looked
+up by resource name alone.
+"""
+import os
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from cli.engine.trace import span
+
+
+class ResolvedAsset(NamedTuple):
+    size: int
+    digest: str
+    # Returns the content as an iterator of byte chunks
+    chunks: Callable[[], Iterator[bytes]]
+
+
+def split_name(name: str):
+    """"project::resource" -> (project, resource); (None, name) when unqualified."""
+    if "::" in name:
+        proj_name, resource_name = name.split("::")
+        return proj_name, resource_name
+    return None, name
+
+
+class DbResolver:
+    """Resolves names against the database, one lookup per call."""
+
+    def _query(self, session, query, model, name: str):
+        from sqlmodel import select
+        from cli.db.models import Project
+
+        proj_name, resource_name = split_name(name)
+        query = query.where(model.name == resource_name)
+        if proj_name:
+            proj_id = session.exec(select(Project.id).where(Project.name == proj_name)).first()
+            if proj_id is not None:
+                query = query.where(model.project_id == proj_id)
+        return session.exec(query).first()
+
+    def _content(self, model, name: str) -> Optional[str]:
+        from sqlmodel import select
+        from cli.db.session import get_session
+
+        with span("db.fetch", "db", resource=name), get_session() as session:
+            return self._query(session, select(model.content), model, name)
+
+    def template(self, name: str) -> Optional[str]:
+        from cli.db.models import Template
+        return self._content(Template, name)
+
+    def recipe(self, name: str) -> Optional[str]:
+        from cli.db.models import Recipe
+        return self._content(Recipe, name)
+
+    def asset(self, name: str) -> Optional[ResolvedAsset]:
+        from sqlmodel import select
+        from cli.db.blobs import asset_digest
+        from cli.db.models import Asset
+        from cli.db.session import get_session
+
+        # Only the id and digest are loaded here; the content is streamed
+        # from the database when the caller iterates `chunks()`
+        with span("db.fetch", "db", resource=name), get_session() as session:
+            asset_id = self._query(session, select(Asset.id), Asset, name)
+            if asset_id is None:
+                return None
+            size, digest = asset_digest(session, asset_id)
+        return ResolvedAsset(size, digest, lambda: _db_asset_chunks(asset_id))
+
+    def snapshot(self, project_name: str) -> "SnapshotResolver":
+        """
+        Load every template and recipe of `project_name` (as both
+        "project::name" and plain "name") into a SnapshotResolver, so
+        repeated runs of the project's recipes don't go back to the database.
+        """
+        from sqlmodel import select
+        from cli.db.models import Project, Recipe, Template
+        from cli.db.session import get_session
+
+        entries = {"template": {}, "recipe": {}}
+        with span("db.fetch", "db", resource=project_name), get_session() as session:
+            proj_id = session.exec(select(Project.id).where(Project.name == project_name)).first()
+            for kind, model in (("template", Template), ("recipe", Recipe)):
+                if proj_id is None:
+                    continue
+                rows = session.exec(select(model.name, model.content).where(model.project_id == proj_id)).all()
+                for name, content in rows:
+                    entries[kind][f"{project_name}::{name}"] = content
+                # A plain name resolves to the first match in any project,
+                # which isn't necessarily this project's resource
+                names = [name for name, _ in rows]
+                first = session.exec(
+                    select(model.name, model.content).where(model.name.in_(names)).order_by(model.id)
+                ).all() if names else []
+                for name, content in first:
+                    entries[kind].setdefault(name, content)
+        return SnapshotResolver(entries, self)
+
+
+def _db_asset_chunks(asset_id: int) -> Iterator[bytes]:
+    from cli.db.blobs import iter_asset_content
+    from cli.db.session import get_session
+
+    with get_session() as session:
+        yield from iter_asset_content(session, asset_id)
+
+
+class SnapshotResolver:
+    """
+    Serves templates and recipes from memory, falling back to `base` (and
+    remembering the answer) for names outside the snapshot. Assets always
+    come from `base`. Picklable, so one snapshot can be handed to every
+    worker of a batch run.
+    """
+
+    def __init__(self, entries: dict, base):
+        self.entries = entries
+        self.base = base
+
+    def _lookup(self, kind: str, name: str) -> Optional[str]:
+        known = self.entries.setdefault(kind, {})
+        if name not in known:
+            known[name] = getattr(self.base, kind)(name)
+        return known[name]
+
+    def template(self, name: str) -> Optional[str]:
+        return self._lookup("template", name)
+
+    def recipe(self, name: str) -> Optional[str]:
+        return self._lookup("recipe", name)
+
+    def asset(self, name: str) -> Optional[ResolvedAsset]:
+        return self.base.asset(name)
+
+
+class FsResolver:
+    """
+    Serves the templates, recipes and assets of an on-disk project straight
+    from its `templates/`, `recipes/` and `assets/` folders, named as
+    `kt import --dir` would name them. The folders are listed once, when
+    the resolver is created; files are only read when a resource is used.
+    Names of other projects (and names the project doesn't have) are
+    resolved by `base`.
+    """
+
+    FOLDERS = {"template": "templates", "recipe": "recipes", "asset": "assets"}
+
+    def __init__(self, root: str, project_name: str = None, base=None):
+        self.root = os.path.abspath(root)
+        self.project_name = project_name
+        self.base = base or DbResolver()
+        self.reindex()
+        # (path, size, mtime_ns) -> sha256 of assets hashed so far
+        self._digests = {}
+
+    def folder(self, kind: str) -> str:
+        return os.path.join(self.root, self.FOLDERS[kind])
+
+    def reindex(self):
+        """(Re)list the project folders, e.g. after files were added or removed."""
+        from cli.utils.importer import resource_name
+
+        self.index = {}
+        for kind in self.FOLDERS:
+            self.index[kind] = {}
+            directory = self.folder(kind)
+            if not os.path.isdir(directory):
+                continue
+            # Files in subfolders are nested names ("sub/name"), as on import
+            for dirpath, _, fnames in os.walk(directory):
+                for fname in fnames:
+                    path = os.path.join(dirpath, fname)
+                    self.index[kind][resource_name(kind, os.path.relpath(path, directory))] = path
+
+    def path(self, kind: str, name: str) -> Optional[str]:
+        """The file behind `name` in this project, or None if it's resolved elsewhere."""
+        proj_name, resource_name = split_name(name)
+        if proj_name and proj_name != self.project_name:
+            return None
+        return self.index[kind].get(resource_name)
+
+    def _text(self, kind: str, name: str) -> Optional[str]:
+        path = self.path(kind, name)
+        if path is None:
+            return getattr(self.base, kind)(name)
+        try:
+            with span("fs.read", "io", path=path), open(path, 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def template(self, name: str) -> Optional[str]:
+        return self._text("template", name)
+
+    def recipe(self, name: str) -> Optional[str]:
+        return self._text("recipe", name)
+
+    def asset(self, name: str) -> Optional[ResolvedAsset]:
+        from cli.engine.manifest import hash_file
+
+        path = self.path("asset", name)
+        if path is None:
+            return self.base.asset(name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (path, st.st_size, st.st_mtime_ns)
+        if key not in self._digests:
+            with span("fs.hash", "io", path=path):
+                self._digests[key] = hash_file(path)
+        return ResolvedAsset(st.st_size, self._digests[key], lambda: _file_chunks(path))
+
+
+def _file_chunks(path: str) -> Iterator[bytes]:
+    from cli.db.blobs import CHUNK_SIZE
+
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
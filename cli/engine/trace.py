@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    Collects timing spans in Chrome trace-event format.
+
+    Spans are recorded as complete ("X") events, so nesting is derived from
+    timestamps and the file opens directly in Perfetto or chrome://tracing.
+    Tracing is off by default and `span` is a no-op until `enable` is called.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self._origin = time.perf_counter_ns()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: Dict[str, Any]):
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": start,
+                "dur": self._now_us() - start,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def span(self, name: str, cat: str = "kt", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args)
+
+    def write(self, path: str):
+        data = {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": "kt"}},
+                *sorted(self.events, key=lambda e: e["ts"]),
+            ],
+            "displayTimeUnit": "ms",
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+
+tracer = Tracer()
+
+
+def span(name: str, cat: str = "kt", **args):
+    """Time a block of work; a no-op unless tracing has been enabled."""
+    return tracer.span(name, cat, **args)
+
+
+def traced(name: str, func, cat: str = "action"):
+    """Wrap a callable so every call is recorded as a span."""
+    def wrapper(*args):
+        if not tracer.enabled:
+            return func(*args)
+        detail = {"arg": args[0]} if args and isinstance(args[0], str) else {}
+        with tracer.span(name, cat, **detail):
+            return func(*args)
+    return wrapper
+
+
+def enable():
+    tracer.enable()
+
+
+def write(path: Optional[str]):
+    if path:
+        tracer.write(path)
@@ -0,0 +1,262 @@
+"""
+Watch project files and re-run as little as possible when they change.
+
+Changes are picked up with inotify (through ctypes, Linux only) or, where
+that isn't available, by polling file stats. Bursts of events (an editor
+saving through a temporary file, a `git checkout`) are debounced into one
+batch of changed paths.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterable, Optional, Set
+
+# Quiet time that ends a batch of changes
+DEBOUNCE = 0.2
+# Interval between stat passes of the polling fallback
+POLL_INTERVAL = 0.5
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _is_scratch(name: str) -> bool:
+    """Editor swap/backup files and kt's own temporary files."""
+    return name.startswith(".") or name.endswith(("~", ".swp", ".swx", ".tmp"))
+
+
+class _Inotify:
+    method = "inotify"
+
+    def __init__(self, watched: Dict[str, Optional[Set[str]]]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watched = watched
+        self.dirs = {}
+        try:
+            for directory in watched:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"Cannot watch '{directory}'")
+                self.dirs[wd] = directory
+        except OSError:
+            self.close()
+            raise
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return set()
+            # Events for files nobody asked about don't count
+            changed = self._drain()
+            if changed:
+                return changed
+
+    def _drain(self) -> Set[str]:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    # Events were lost: report every watched directory
+                    changed.update(self.watched)
+                    continue
+                directory = self.dirs.get(wd)
+                names = self.watched.get(directory, ())
+                if directory and name and (name in names if names is not None else not _is_scratch(name)):
+                    changed.add(os.path.join(directory, name))
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _Polling:
+    method = "polling"
+
+    def __init__(self, watched: Dict[str, Optional[Set[str]]], interval: float = POLL_INTERVAL):
+        self.watched = watched
+        self.interval = interval
+        self.state = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        state = {}
+        for directory, names in self.watched.items():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if names is not None and entry.name not in names:
+                    continue
+                if names is None and (_is_scratch(entry.name) or entry.is_dir()):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                state[entry.path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def read(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return set()
+            time.sleep(min(self.interval, remaining))
+            state = self._scan()
+            changed = {path for path in state.keys() | self.state.keys() if state.get(path) != self.state.get(path)}
+            self.state = state
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class Watcher:
+    """
+    Watches every entry of `dirs` (not recursively) plus the given
+    `files`. `wait()` blocks until something changed and returns the
+    changed paths, once no further change came in for `debounce` seconds.
+    """
+
+    def __init__(self, dirs: Iterable[str] = (), files: Iterable[str] = (), debounce: float = DEBOUNCE,
+                 polling: bool = False):
+        # directory -> names to report (None: every entry)
+        watched: Dict[str, Optional[Set[str]]] = {}
+        for directory in dirs:
+            if os.path.isdir(directory):
+                watched[os.path.abspath(directory)] = None
+        for path in files:
+            directory, name = os.path.split(os.path.abspath(path))
+            if directory in watched and watched[directory] is None:
+                continue
+            watched.setdefault(directory, set()).add(name)
+
+        self.debounce = debounce
+        self._backend = None
+        if not polling:
+            try:
+                self._backend = _Inotify(watched)
+            except (OSError, AttributeError):
+                pass
+        if self._backend is None:
+            self._backend = _Polling(watched)
+
+    @property
+    def method(self) -> str:
+        return self._backend.method
+
+    def wait(self) -> Set[str]:
+        changed = set()
+        while not changed:
+            changed = self._backend.read(None)
+        while True:
+            more = self._backend.read(self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def watch_recipe(engine, resolver, load, files: Iterable[str] = (), output_mode: str = "normal"):
+    """
+    Keep `engine` (which has run the recipe once) up to date with an
+    on-disk project served by FsResolver `resolver`.
+
+    A batch of changes that only touches templates re-renders the outputs
+    of the r.template calls that used them, with the arguments of the last
+    run. Anything else (a recipe, an asset, `files` such as project.json
+    or the config) calls `load()` for a fresh (recipe content, context)
+    and runs the recipe again. The engine, with its Lua runtime and
+    compiled chunks, and compiled Jinja templates are reused throughout.
+    Outputs still as kt wrote them are replaced even without `overwrite`;
+    files edited by hand are left alone. Returns on Ctrl-C.
+    """
+    from cli.engine.reporter import Reporter
+    from cli.utils.console import console
+
+    templates_dir = resolver.folder("template")
+    # Outputs kt wrote itself are kept up to date, also without `overwrite`
+    engine.replace_own_outputs = True
+
+    def project_dirs():
+        # The project folders and their subfolders (nested resource names)
+        return sorted(path for kind in resolver.FOLDERS for path, _, _ in os.walk(resolver.folder(kind)))
+
+    dirs = project_dirs()
+    watcher = Watcher(dirs, files)
+    console.print(f"[dim]Watching for changes ({watcher.method}), press Ctrl-C to stop.[/dim]")
+    try:
+        while True:
+            changed = watcher.wait()
+            resolver.reindex()
+            if project_dirs() != dirs:
+                # Folders were added or removed: watch the new set
+                watcher.close()
+                dirs = project_dirs()
+                watcher = Watcher(dirs, files)
+            reporter = engine.reporter = Reporter(output_mode)
+            names = ", ".join(sorted(os.path.relpath(path, resolver.root) for path in changed))
+            console.print(f"[cyan]Changed: {names}[/cyan]")
+
+            # Deleted templates go through a full run, which reports (or
+            # resolves elsewhere) the names that are gone
+            if all(path.startswith(templates_dir + os.sep) and os.path.isfile(path) for path in changed):
+                calls = [call for call in engine.template_calls if resolver.path("template", call[0]) in changed]
+                rendered = sum(1 for call in calls if engine.actions.render_template(*call))
+                engine.manifest.save()
+                engine.writer.flush()
+                reporter.finish(f"Re-rendered {rendered} output(s) of changed templates.")
+                continue
+
+            try:
+                recipe_content, engine.context = load()
+                engine.execute(recipe_content)
+                reporter.finish("Recipe re-run.")
+            except Exception as e:
+                reporter.error(f"Error rendering project: {e}")
+                reporter.finish()
+    except KeyboardInterrupt:
+        console.print("[dim]Stopped watching.[/dim]")
+    finally:
+        watcher.close()
@@ -0,0 +1,206 @@
+import os
+import secrets
+import stat
+
+
+class FileWriter:
+    """
+    Shared file writer for a recipe run.
+
+    - Directories created or seen during the run are cached, so writing many
+      files into the same tree doesn't repeat `exists`/`makedirs` calls.
+    - Files in a directory this writer created can't pre-exist unless we
+      wrote them, so existence checks there need no syscall at all.
+    - Every write goes to a temp file next to the target and is moved into
+      place with `os.replace`, so a crash never leaves a half-written file.
+    - With `fsync=True`, written files and their directories are synced in
+      one batch when the run finishes (`flush`) instead of once per file.
+    """
+
+    def __init__(self, fsync: bool = False):
+        self.fsync = fsync
+        self._known_dirs = set()
+        self._created_dirs = set()
+        self._written = set()
+        self._pending_sync = []
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        return os.path.normpath(path) if path else ""
+
+    def ensure_dir(self, directory: str) -> bool:
+        """Create `directory` (and parents) if needed. Returns True if it was created."""
+        directory = self._norm(directory)
+        if not directory or directory == "." or directory in self._known_dirs:
+            return False
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            self._known_dirs.add(directory)
+            return False
+        except FileNotFoundError:
+            self.ensure_dir(os.path.dirname(directory))
+            os.mkdir(directory)
+        self._known_dirs.add(directory)
+        self._created_dirs.add(directory)
+        return True
+
+    def mark_dir(self, directory: str, created: bool = False):
+        """Record a directory made outside the writer (e.g. by `r.mkdir`)."""
+        directory = self._norm(directory)
+        self._known_dirs.add(directory)
+        if created:
+            self._created_dirs.add(directory)
+
+    def exists(self, path: str) -> bool:
+        path = self._norm(path)
+        if os.path.dirname(path) in self._created_dirs:
+            return path in self._written
+        return os.path.exists(path)
+
+    def external_change(self):
+        """
+        Something outside the writer (a subprocess, a shell tag) may have
+        written files, so stop assuming created directories only hold our files.
+        """
+        self._created_dirs.clear()
+
+    def forget(self, path: str):
+        """Drop cached knowledge about `path` and everything under it (after a delete)."""
+        path = self._norm(path)
+        prefix = path + os.sep
+        for cache in (self._known_dirs, self._created_dirs, self._written):
+            for entry in [e for e in cache if e == path or e.startswith(prefix)]:
+                cache.discard(entry)
+
+    @staticmethod
+    def is_shared(path: str) -> bool:
+        """True if `path` is a symlink or has other hard links, so writing through it would change other files."""
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return False
+        return not stat.S_ISREG(st.st_mode) or st.st_nlink > 1
+
+    def write(self, path: str, data, replace: bool = False) -> os.stat_result:
+        """
+        Atomically write `data` (bytes, or an iterable of byte chunks for
+        streamed content) to `path`. Pass `replace=True` when the file
+        already exists so its permission bits are kept.
+        Returns the stat of the written file.
+        """
+        chunks = (data,) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        path = self._norm(path)
+        directory = os.path.dirname(path)
+        self.ensure_dir(directory)
+        tmp_path = _tmp_path(path)
+
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileNotFoundError:
+            # Directory was removed behind our back; rebuild it
+            self.forget(directory)
+            self.ensure_dir(directory)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+
+        try:
+            try:
+                for chunk in chunks:
+                    view = memoryview(chunk)
+                    while view:
+                        written = os.write(fd, view)
+                        view = view[written:]
+                if replace:
+                    # A shared file (e.g. a link into the asset cache) doesn't lend its mode
+                    if not self.is_shared(path):
+                        try:
+                            os.fchmod(fd, os.stat(path).st_mode & 0o7777)
+                        except OSError:
+                            pass
+                st = os.fstat(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._written.add(path)
+        if self.fsync:
+            self._pending_sync.append(path)
+        return st
+
+    def link(self, path: str, source: str, mode: str) -> os.stat_result:
+        """
+        Atomically place `source` at `path` as a "hardlink", "symlink" or
+        "reflink". Raises OSError if the filesystem can't do it, so callers
+        can fall back to `write`.
+        Returns the stat of the file the new entry points at.
+        """
+        from cli.engine.asset_cache import reflink
+
+        path = self._norm(path)
+        directory = os.path.dirname(path)
+        self.ensure_dir(directory)
+        tmp_path = _tmp_path(path)
+
+        try:
+            if mode == "hardlink":
+                os.link(source, tmp_path)
+            elif mode == "symlink":
+                os.symlink(os.path.abspath(source), tmp_path)
+            elif mode == "reflink":
+                reflink(source, tmp_path)
+            else:
+                raise ValueError(f"Unknown link mode: {mode}")
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._written.add(path)
+        if self.fsync:
+            self._pending_sync.append(path)
+        return os.stat(path)
+
+    def flush(self):
+        """Fsync everything written since the last flush (no-op unless fsync is enabled)."""
+        if not self._pending_sync:
+            return
+        directories = set()
+        for path in self._pending_sync:
+            _sync_path(path)
+            directories.add(os.path.dirname(path) or ".")
+        for directory in directories:
+            _sync_path(directory)
+        self._pending_sync = []
+
+
+def _tmp_path(path: str) -> str:
+    """
+    A fresh temp file name next to `path`. Unique per write, so writers
+    racing for the same output (batch workers, two kt processes) never
+    share one; the last `os.replace` wins with a complete file.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{os.getpid()}-{secrets.token_hex(4)}.kt-tmp")
+
+
+def _sync_path(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some filesystems don't support fsync on directories
+        pass
+    finally:
+        os.close(fd)
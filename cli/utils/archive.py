@@ -0,0 +1,256 @@
+import io
+import os
+import shutil
+import tarfile
+import time
+from contextlib import contextmanager
+
+COMPRESSIONS = ("gz", "zstd", "none")
+# Valid --level range of each compression ("none" takes no level)
+COMPRESSION_LEVELS = {"gz": (1, 9), "zstd": (1, 22)}
+
+# Leading bytes of each container/compression format we can be handed
+MAGIC = (
+    (b"\x1f\x8b", "gz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"PK\x03\x04", "zip"),
+)
+
+
+def check_level(compression: str, level=None):
+    """Raise ValueError unless `level` is None or a valid level for `compression`."""
+    if level is None:
+        return
+    if compression not in COMPRESSION_LEVELS:
+        raise ValueError(f"Compression '{compression}' takes no level.")
+    low, high = COMPRESSION_LEVELS[compression]
+    if not low <= level <= high:
+        raise ValueError(f"Level for {compression} compression must be between {low} and {high}, not {level}.")
+
+
+def _zstd_options(level=None):
+    """Compression options for multi-threaded zstd (one worker per CPU)."""
+    try:
+        from compression.zstd import CompressionParameter
+    except ImportError:
+        raise RuntimeError("zstd bundles need Python 3.14 or newer (compression.zstd).")
+
+    options = {}
+    if level is not None:
+        low, high = CompressionParameter.compression_level.bounds()
+        options[CompressionParameter.compression_level] = max(low, min(high, level))
+    # bounds() is (0, 0) when libzstd was built without thread support
+    _, max_workers = CompressionParameter.nb_workers.bounds()
+    workers = min(os.cpu_count() or 1, max_workers)
+    if workers > 1:
+        options[CompressionParameter.nb_workers] = workers
+    return options
+
+
+def open_tar_writer(path: str, compression: str = "gz", level=None) -> tarfile.TarFile:
+    """
+    Open a tarball for writing with the given compression ("gz", "zstd" or
+    "none"). `level` is the codec's compression level (gzip 1-9, zstd 1-22).
+    """
+    if compression == "gz":
+        return tarfile.open(path, "w:gz", compresslevel=9 if level is None else level)
+    if compression == "zstd":
+        return tarfile.open(path, "w:zst", options=_zstd_options(level))
+    if compression == "none":
+        return tarfile.open(path, "w")
+    raise ValueError(f"Unknown compression '{compression}' (expected one of: {', '.join(COMPRESSIONS)}).")
+
+
+def detect_format(head: bytes) -> str:
+    """
+    Identify a bundle from its first bytes: "gz", "zstd", "zip" or "tar"
+    (uncompressed). Raises ValueError for anything else.
+    """
+    for magic, name in MAGIC:
+        if head.startswith(magic):
+            return name
+    if head[257:262] == b"ustar" or (len(head) >= 512 and not head.strip(b"\0")):
+        return "tar"
+    raise ValueError("Unrecognized bundle format.")
+
+
+def _peek(fileobj, size: int = 512):
+    """
+    Return (first bytes, file object positioned at the start). Non-seekable
+    streams are wrapped in a buffered reader so the bytes can be read again.
+    """
+    if fileobj.seekable():
+        start = fileobj.tell()
+        head = fileobj.read(size)
+        fileobj.seek(start)
+        return head, fileobj
+    if not hasattr(fileobj, "peek"):
+        fileobj = io.BufferedReader(fileobj, buffer_size=max(size, io.DEFAULT_BUFFER_SIZE))
+    return fileobj.peek(size)[:size], fileobj
+
+
+_STREAM_MODES = {"gz": "r|gz", "zstd": "r|zst", "tar": "r|"}
+_RANDOM_MODES = {"gz": "r:gz", "zstd": "r:zst", "tar": "r:"}
+
+
+def open_tar_reader(source, stream: bool = True) -> tarfile.TarFile:
+    """
+    Open a bundle tarball (path or binary file object), detecting its
+    compression from the magic bytes. `stream=True` reads members strictly
+    in order without seeking (`r|...`).
+    """
+    modes = _STREAM_MODES if stream else _RANDOM_MODES
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            fmt = detect_format(f.read(512))
+        if fmt not in modes:
+            raise ValueError(f"Not a tar bundle ({fmt}).")
+        return tarfile.open(source, modes[fmt])
+
+    head, fileobj = _peek(source)
+    fmt = detect_format(head)
+    if fmt not in modes:
+        raise ValueError(f"Not a tar bundle ({fmt}).")
+    return tarfile.open(fileobj=fileobj, mode=modes[fmt])
+
+
+FORMATS = ("tar", "zip")
+
+
+class TarBundleWriter:
+    """Writes bundle entries into a (compressed) tarball."""
+
+    def __init__(self, path: str, compression: str = "gz", level=None):
+        self.tar = open_tar_writer(path, compression, level)
+
+    def _info(self, name: str, mtime: float) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(name)
+        info.mtime = mtime
+        info.mode = 0o644
+        return info
+
+    def add_dir(self, name: str, mtime: float):
+        info = self._info(name, mtime)
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+        self.tar.addfile(info)
+
+    def add_stream(self, name: str, fileobj, size: int, mtime: float):
+        info = self._info(name, mtime)
+        info.size = size
+        self.tar.addfile(info, fileobj)
+
+    def add_path(self, path: str, name: str):
+        self.tar.add(path, arcname=name)
+
+    def close(self):
+        self.tar.close()
+
+
+class ZipBundleWriter:
+    """
+    Writes bundle entries into a zip archive. Each entry is compressed on its
+    own and listed in the central directory, so readers can list the bundle
+    or pull out one entry without decompressing the rest.
+    """
+
+    def __init__(self, path: str, compression: str = "gz", level=None):
+        import zipfile
+
+        if compression == "gz":
+            method = zipfile.ZIP_DEFLATED
+        elif compression == "zstd":
+            method = getattr(zipfile, "ZIP_ZSTANDARD", None)
+            if method is None:
+                raise RuntimeError("zstd bundles need Python 3.14 or newer (compression.zstd).")
+        elif compression == "none":
+            method = zipfile.ZIP_STORED
+        else:
+            raise ValueError(f"Unknown compression '{compression}' (expected one of: {', '.join(COMPRESSIONS)}).")
+        self.zipfile = zipfile
+        self.zip = zipfile.ZipFile(path, "w", compression=method, compresslevel=level)
+
+    def _info(self, name: str, mtime: float):
+        info = self.zipfile.ZipInfo(name, date_time=time.localtime(max(mtime, 315532800))[:6])
+        info.compress_type = self.zip.compression
+        info.compress_level = self.zip.compresslevel
+        info.external_attr = 0o644 << 16
+        return info
+
+    def add_dir(self, name: str, mtime: float):
+        info = self._info(name.rstrip("/") + "/", mtime)
+        # mkdir() only fills these in when given a plain name
+        info.CRC = info.compress_size = info.file_size = 0
+        info.compress_type = self.zipfile.ZIP_STORED
+        info.external_attr = (0o40755 << 16) | 0x10
+        self.zip.mkdir(info)
+
+    def add_stream(self, name: str, fileobj, size: int, mtime: float):
+        info = self._info(name, mtime)
+        info.file_size = size
+        # Zip64 headers are only needed past 4 GiB but must be decided up front
+        with self.zip.open(info, "w", force_zip64=size >= 0xFFFFFFFF) as out:
+            shutil.copyfileobj(fileobj, out, 1024 * 1024)
+
+    def add_path(self, path: str, name: str):
+        if os.path.isdir(path):
+            self.add_dir(name, os.path.getmtime(path))
+            for entry in sorted(os.listdir(path)):
+                self.add_path(os.path.join(path, entry), f"{name}/{entry}")
+        else:
+            with open(path, 'rb') as f:
+                self.add_stream(name, f, os.fstat(f.fileno()).st_size, os.path.getmtime(path))
+
+    def close(self):
+        self.zip.close()
+
+
+def open_bundle_writer(path: str, fmt: str = "tar", compression: str = "gz", level=None):
+    """Open a bundle for writing as a tarball ("tar") or an indexed zip ("zip")."""
+    check_level(compression, level)
+    if fmt == "tar":
+        return TarBundleWriter(path, compression, level)
+    if fmt == "zip":
+        return ZipBundleWriter(path, compression, level)
+    raise ValueError(f"Unknown bundle format '{fmt}' (expected one of: {', '.join(FORMATS)}).")
+
+
+def sniff_format(source) -> str:
+    """Detect the format of a bundle given as a path or a seekable file object."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return detect_format(f.read(512))
+    head, _ = _peek(source)
+    return detect_format(head)
+
+
+def _member_order(name: str) -> tuple:
+    # Metadata first, so importers never have to look back
+    # (the shallowest project.json is the project's own)
+    base = name.rstrip("/").rsplit("/", 1)[-1]
+    return {"project.json": 0, "manifest.json": 1}.get(base, 2), name.count("/")
+
+
+@contextmanager
+def bundle_members(source):
+    """
+    Iterate over the regular-file members of a bundle (path or binary file
+    object) as (name, size, open) tuples, where open() returns a readable
+    file object for the member. Tarballs are read as a stream; each member
+    must be opened before moving to the next. Zip bundles need a path or a
+    seekable file and yield project.json and manifest.json first.
+    """
+    seekable = isinstance(source, (str, os.PathLike)) or source.seekable()
+    if seekable and sniff_format(source) == "zip":
+        import zipfile
+
+        with zipfile.ZipFile(source) as zf:
+            infos = sorted((i for i in zf.infolist() if not i.is_dir()), key=lambda i: _member_order(i.filename))
+            yield ((i.filename, i.file_size, (lambda i=i: zf.open(i))) for i in infos)
+        return
+
+    with open_tar_reader(source) as tar:
+        yield (
+            (m.name, m.size, (lambda m=m: tar.extractfile(m)))
+            for m in tar if m.isfile()
+        )
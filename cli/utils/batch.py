@@ -0,0 +1,243 @@
+"""
+Import and export many project bundles in one run.
+
+Reading bundles (decompression, parsing, hashing) and writing them
+(compression) run in a process pool. For imports, workers stage asset
+contents in a temporary directory and hand back plain rows; the parent is
+the only process that writes to the database, applying several projects
+per transaction.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cli.utils.importer import ImportSummary
+
+# Projects applied per database transaction
+BATCH_SIZE = 16
+
+# Stored asset hashes ({project name: {asset name: sha256}}), set in workers
+_known_assets = {}
+
+
+def _set_known_assets(known_assets=None):
+    global _known_assets
+    _known_assets = known_assets or {}
+
+
+def _init_worker(known_assets=None):
+    _set_known_assets(known_assets)
+    # Connections inherited from the parent must not be reused
+    from cli.db.session import engine
+    engine.dispose(close=False)
+
+
+def _run(fn, items, jobs: int, initargs=()):
+    """
+    Yield (item, result, error) for `fn(*item)` over `items`, in completion
+    order, with at most a couple of tasks queued per worker so staged
+    files don't pile up. `jobs` <= 1 runs everything in this process.
+    """
+    if jobs <= 1 or len(items) <= 1:
+        _set_known_assets(*initargs)
+        for item in items:
+            try:
+                yield item, fn(*item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as pool:
+        pending = {}
+        queue = iter(items)
+        while True:
+            for item in queue:
+                pending[pool.submit(fn, *item)] = item
+                if len(pending) >= jobs * 2:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, None if error else future.result(), error
+
+
+def collect_bundles(paths):
+    """Expand directories in `paths` to the *.project bundles they contain."""
+    bundles = []
+    for path in paths:
+        if os.path.isdir(path):
+            bundles.extend(sorted(glob.glob(os.path.join(path, "*.project"))))
+        else:
+            bundles.append(path)
+    return bundles
+
+
+def parse_bundle(bundle_path: str, stage_dir: str) -> dict:
+    """
+    Read a bundle in a worker: project.json, text rows with their hashes,
+    and asset contents staged under `stage_dir`. Assets whose manifest hash
+    matches the stored one (see `_known_assets`) are not extracted.
+    """
+    from cli.utils.bundler import BUNDLE_FOLDERS, MANIFEST_NAME, MANIFEST_VERSION, project_members
+    from cli.utils.importer import resource_name, text_values
+
+    meta = None
+    manifest = {}
+    rows = {"template": {}, "recipe": {}, "asset": {}}
+    files = {}
+    with project_members(bundle_path) as members:
+        for path, size, open_member in members:
+            if path == "project.json":
+                if meta is None:
+                    with open_member() as f:
+                        meta = json.load(f)
+                continue
+            if path == MANIFEST_NAME:
+                with open_member() as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    manifest = data.get("resources", {})
+                continue
+
+            folder, fname = path
+            kind = BUNDLE_FOLDERS[folder]
+            if kind != "asset":
+                with open_member() as f:
+                    rows[kind][resource_name(kind, fname)] = text_values(f.read().decode("utf-8"))
+                continue
+
+            expected = manifest.get(f"asset/{fname}", {}).get("sha256")
+            stored = _known_assets.get(meta["name"], {}).get(fname) if meta else None
+            if expected and expected == stored:
+                rows["asset"][fname] = {"source_path": "imported", "content": b"", "sha256": expected}
+                continue
+            staged = os.path.join(stage_dir, f"{len(files)}")
+            digest = hashlib.sha256()
+            with open_member() as src, open(staged, 'wb') as dst:
+                while chunk := src.read(1024 * 1024):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            if expected and digest.hexdigest() != expected:
+                raise ValueError(f"Invalid bundle: asset '{fname}' does not match its manifest hash.")
+            rows["asset"][fname] = {"source_path": "imported", "content": b"", "sha256": digest.hexdigest()}
+            files[fname] = staged
+
+    if meta is None:
+        raise ValueError("Invalid bundle: project.json not found.")
+    return {"meta": meta, "rows": rows, "files": files}
+
+
+def _apply_parsed(session, parsed: dict, overwrite: bool, prune: bool) -> ImportSummary:
+    """Write one parsed bundle through `session`. Nothing is committed."""
+    from cli.db.models import Asset, Recipe, Template
+    from cli.utils.bundler import _begin_project_import
+    from cli.utils.importer import bulk_upsert, prune_missing, stream_asset_files
+
+    summary = ImportSummary()
+    rows, files = parsed["rows"], parsed["files"]
+    project_id = _begin_project_import(session, parsed["meta"], overwrite)
+    for kind, model in (("template", Template), ("recipe", Recipe)):
+        summary.add(*bulk_upsert(session, model, project_id, rows[kind], overwrite))
+
+    inserted, updated, skipped, unchanged = bulk_upsert(
+        session, Asset, project_id, rows["asset"], overwrite, update_columns=["content"]
+    )
+    missing = [name for name in inserted + updated if name not in files]
+    if missing:
+        raise ValueError(f"Asset '{missing[0]}' changed while importing; run the import again.")
+    stream_asset_files(session, project_id, {name: files[name] for name in inserted + updated})
+    summary.add(inserted, updated, skipped, unchanged)
+
+    if prune:
+        for kind, model in (("template", Template), ("recipe", Recipe), ("asset", Asset)):
+            summary.removed += prune_missing(session, model, project_id, rows[kind])
+    return summary
+
+
+def import_bundles(paths, overwrite: bool = False, prune: bool = False, jobs: int = None):
+    """
+    Import many bundles (paths or directories of *.project files). Bundles
+    are parsed by `jobs` worker processes while this process writes the
+    results, BATCH_SIZE projects per transaction. If a project in a batch
+    fails, the batch is rolled back and its projects are retried one per
+    transaction, so one bad bundle doesn't cost the others.
+    Yields (bundle path, ImportSummary or None, error or None).
+    """
+    from sqlmodel import select
+    from cli.db.models import Asset, Project
+    from cli.db.session import get_session
+
+    bundles = collect_bundles(paths)
+    jobs = jobs or os.cpu_count() or 1
+
+    with get_session() as session:
+        known_assets = {}
+        for project_name, asset_name, sha256 in session.exec(
+            select(Project.name, Asset.name, Asset.sha256).join(Asset, Asset.project_id == Project.id)
+        ).all():
+            known_assets.setdefault(project_name, {})[asset_name] = sha256
+
+        with tempfile.TemporaryDirectory() as stage_root:
+            items = []
+            for index, bundle_path in enumerate(bundles):
+                stage_dir = os.path.join(stage_root, str(index))
+                os.mkdir(stage_dir)
+                items.append((bundle_path, stage_dir))
+
+            batch = []
+
+            def flush():
+                results = []
+                try:
+                    for bundle_path, stage_dir, parsed in batch:
+                        results.append((bundle_path, _apply_parsed(session, parsed, overwrite, prune), None))
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    results = []
+                    for bundle_path, stage_dir, parsed in batch:
+                        try:
+                            summary = _apply_parsed(session, parsed, overwrite, prune)
+                            session.commit()
+                            results.append((bundle_path, summary, None))
+                        except Exception as e:
+                            session.rollback()
+                            results.append((bundle_path, None, e))
+                for _, stage_dir, _ in batch:
+                    shutil.rmtree(stage_dir, ignore_errors=True)
+                batch.clear()
+                return results
+
+            for (bundle_path, stage_dir), parsed, error in _run(parse_bundle, items, jobs, (known_assets,)):
+                if error is not None:
+                    shutil.rmtree(stage_dir, ignore_errors=True)
+                    yield bundle_path, None, error
+                    continue
+                batch.append((bundle_path, stage_dir, parsed))
+                if len(batch) >= BATCH_SIZE:
+                    yield from flush()
+            yield from flush()
+
+
+def export_projects(names, output_dir: str, overwrite: bool = False, compression: str = "gz",
+                    level: int = None, fmt: str = "tar", jobs: int = None):
+    """
+    Export each named project to OUTPUT_DIR/<name>.project, `jobs` bundles
+    at a time. Yields (project name, output path, error or None).
+    """
+    from cli.utils.bundler import create_bundle
+
+    os.makedirs(output_dir, exist_ok=True)
+    items = [
+        (name, os.path.join(output_dir, f"{name}.project"), overwrite, compression, level, fmt)
+        for name in names
+    ]
+    for (name, output, *_), _, error in _run(create_bundle, items, jobs or os.cpu_count() or 1):
+        yield name, output, error
@@ -1,22 +1,38 @@
 import os
+import io
 import json
-import tarfile
+import time
 import tempfile
 import shutil
 import subprocess
 import glob
+from contextlib import contextmanager
 from cli.db.session import get_session
 from cli.db.models import Project, Template, Recipe, Asset
+from cli.db.blobs import asset_digest, open_asset_content
+from cli.engine.manifest import MANIFEST_NAME as OUTPUT_MANIFEST_NAME, hash_file, hash_text
+from cli.utils.archive import bundle_members, open_bundle_writer, open_tar_reader, sniff_format
+from cli.utils.importer import ImportSummary, bulk_upsert, prune_missing, resource_name, stream_asset_files, text_values
+from sqlalchemy import LargeBinary, cast, func, insert
 from sqlmodel import select
 
-def create_bundle(project_name: str, output_path: str, overwrite: bool = False):
+def create_bundle(project_name: str, output_path: str, overwrite: bool = False,
+                  compression: str = "gz", level: int = None, fmt: str = "tar"):
     """
-    Export a project and its resources to a .project tarball.
+    Export a project and its resources to a .project bundle.
     Structure:
     /project.json
+    /manifest.json
     /templates/name
     /recipes/name.lua
     /assets/name
+
+    manifest.json maps "type/name" to the sha256 and size of every resource,
+    so importers can skip resources they already have. Rows are streamed
+    into the archive as they are fetched (assets straight from their
+    blobs), so nothing is staged on disk and memory use per entry is
+    bounded. `fmt` is "tar" or "zip" (indexed, for random access) and
+    `compression` is "gz", "zstd" or "none".
     """
     if os.path.exists(output_path) and not overwrite:
         raise FileExistsError(f"Output file '{output_path}' exists.")
@@ -25,60 +41,81 @@ def create_bundle(project_name: str, output_path: str, overwrite: bool = False):
         proj = session.exec(select(Project).where(Project.name == project_name)).first()
         if not proj:
             raise ValueError(f"Project '{project_name}' not found.")
-            
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Metadata
+
+        root = os.path.basename(project_name)
+        mtime = time.time()
+
+        def add_text(writer, path, text):
+            data = text.encode("utf-8")
+            writer.add_stream(f"{root}/{path}", io.BytesIO(data), len(data), mtime)
+
+        writer = open_bundle_writer(output_path, fmt, compression, level)
+        try:
+            writer.add_dir(root, mtime)
+
+            # Metadata goes first so importers can read it before any content
             meta = {
                 "name": proj.name,
                 "created_at": str(proj.created_at),
                 "default_recipe": proj.default_recipe
             }
-            with open(os.path.join(tmpdir, "project.json"), 'w') as f:
-                json.dump(meta, f)
-                
+            add_text(writer, "project.json", json.dumps(meta))
+            add_text(writer, MANIFEST_NAME, json.dumps(bundle_manifest(session, proj.id), sort_keys=True))
+
             # Templates
-            tmpl_dir = os.path.join(tmpdir, "templates")
-            os.makedirs(tmpl_dir)
-            
-            recipes_dir = os.path.join(tmpdir, "recipes")
-            os.makedirs(recipes_dir)
-            
-            assets_dir = os.path.join(tmpdir, "assets")
-            os.makedirs(assets_dir)
-            
-            # Export Templates
-            templates = session.exec(select(Template).where(Template.project_id == proj.id)).all()
-            for t in templates:
-                # Sanitize filename? assume name is safe or simple
-                # Template content is string
-                with open(os.path.join(tmpl_dir, t.name), 'w') as f:
-                    f.write(t.content)
-                    
-            # Export Recipes
-            recipes = session.exec(select(Recipe).where(Recipe.project_id == proj.id)).all()
-            for r in recipes:
-                # Add .lua extension if missing for clarity? Or keep exact name. 
-                # User asks "name", assuming name is identifier.
-                fname = r.name + ".lua" if not r.name.endswith(".lua") else r.name
-                # Be careful on import to map back to 'name'
-                # Let's save metadata about mapping? 
-                # Or just use filename as name.
-                with open(os.path.join(recipes_dir, fname), 'w') as f:
-                    f.write(r.content)
-            
-            # Export Assets
-            assets = session.exec(select(Asset).where(Asset.project_id == proj.id)).all()
-            for a in assets:
-                 with open(os.path.join(assets_dir, a.name), 'wb') as f:
-                     f.write(a.content)
-                     
-            # Create Tarball
-            with tarfile.open(output_path, "w:gz") as tar:
-                tar.add(tmpdir, arcname=os.path.basename(project_name))
-
-def import_project_from_dir(root_dir: str, overwrite: bool = False):
+            writer.add_dir(f"{root}/templates", mtime)
+            for name, content in session.exec(select(Template.name, Template.content).where(Template.project_id == proj.id)):
+                add_text(writer, f"templates/{name}", content)
+
+            # Recipes (.lua appended so the import can map the file back to the name)
+            writer.add_dir(f"{root}/recipes", mtime)
+            for name, content in session.exec(select(Recipe.name, Recipe.content).where(Recipe.project_id == proj.id)):
+                fname = name + ".lua" if not name.endswith(".lua") else name
+                add_text(writer, f"recipes/{fname}", content)
+
+            # Assets, read from the blob in chunks. length() of a blob is
+            # answered from the record header, so legacy rows without a
+            # stored size don't need loading either
+            writer.add_dir(f"{root}/assets", mtime)
+            assets = session.exec(
+                select(Asset.id, Asset.name, func.coalesce(Asset.size, func.length(Asset.content)))
+                .where(Asset.project_id == proj.id)
+            ).all()
+            for asset_id, name, size in assets:
+                with open_asset_content(session, asset_id) as blob:
+                    writer.add_stream(f"{root}/assets/{name}", blob, size, mtime)
+        finally:
+            writer.close()
+
+def bundle_manifest(session, project_id: int) -> dict:
+    """
+    Build the manifest of a project's resources: {"type/name": {"sha256", "size"}}.
+    Hashes come from the rows; legacy rows without one are hashed here.
+    """
+    resources = {}
+    for kind, model in (("template", Template), ("recipe", Recipe)):
+        rows = session.exec(
+            select(model.name, model.sha256, func.length(cast(model.content, LargeBinary)))
+            .where(model.project_id == project_id)
+        ).all()
+        for name, sha256, size in rows:
+            if sha256 is None:
+                content = session.exec(select(model.content).where(model.project_id == project_id).where(model.name == name)).first()
+                sha256 = hash_text(content)
+            resources[f"{kind}/{name}"] = {"sha256": sha256, "size": size}
+
+    for asset_id, name in session.exec(select(Asset.id, Asset.name).where(Asset.project_id == project_id)).all():
+        size, sha256 = asset_digest(session, asset_id)
+        resources[f"asset/{name}"] = {"sha256": sha256, "size": size}
+    return {"version": MANIFEST_VERSION, "resources": resources}
+
+def import_project_from_dir(root_dir: str, overwrite: bool = False, prune: bool = False,
+                            source=None) -> ImportSummary:
     """
     Import a project from a directory structure.
+    Resources whose content hash matches the stored one are not rewritten;
+    with `prune`, resources missing from the directory are deleted.
+    `source` is an optional (uri, commit) recorded on the project.
     """
     project_json_path = os.path.join(root_dir, "project.json")
     if not os.path.exists(project_json_path):
@@ -87,125 +124,306 @@ def import_project_from_dir(root_dir: str, overwrite: bool = False):
     with open(project_json_path, 'r') as f:
         meta = json.load(f)
         
-    project_name = meta['name']
-    
+    summary = ImportSummary()
     with get_session() as session:
-        # Check project existence
-        existing = session.exec(select(Project).where(Project.name == project_name)).first()
-        if existing:
-            if not overwrite:
-                raise FileExistsError(f"Project '{project_name}' already exists.")
-            # Update project metadata
-            existing.default_recipe = meta.get("default_recipe")
-            session.add(existing)
-            session.commit()
-            session.refresh(existing)
-        else:
-            existing = Project(name=project_name, default_recipe=meta.get("default_recipe"))
-            session.add(existing)
-            session.commit()
-            # Reload to get ID
-            existing = session.exec(select(Project).where(Project.name == project_name)).first()
-            
-        project_id = existing.id
+        project_id = _begin_project_import(session, meta, overwrite, source)
         
-        # Import Templates
-        tmpl_dir = os.path.join(root_dir, "templates")
-        if os.path.exists(tmpl_dir):
-            for fname in os.listdir(tmpl_dir):
-                fpath = os.path.join(tmpl_dir, fname)
-                if os.path.isdir(fpath): continue
+        # Templates (.j2 stripped from the name) and recipes (.lua stripped)
+        for kind, model, folder in (("template", Template, "templates"), ("recipe", Recipe, "recipes")):
+            rows = {}
+            for fname, fpath in _list_files(os.path.join(root_dir, folder)):
                 with open(fpath, 'r') as f:
-                    content = f.read()
-                
-                # Strip .j2 for name if present
-                tmpl_name = fname[:-3] if fname.endswith(".j2") else fname
-                
-                # Update or Create
-                t = session.exec(select(Template).where(Template.name == tmpl_name).where(Template.project_id == project_id)).first()
-                if t:
-                    if overwrite:
-                        t.content = content
-                        session.add(t)
-                else:
-                    t = Template(name=tmpl_name, content=content, project_id=project_id)
-                    session.add(t)
+                    rows[resource_name(kind, fname)] = text_values(f.read())
+            summary.add(*bulk_upsert(session, model, project_id, rows, overwrite))
+            if prune:
+                summary.removed += prune_missing(session, model, project_id, rows)
                     
-        # Import Recipes
-        recipes_dir = os.path.join(root_dir, "recipes")
-        if os.path.exists(recipes_dir):
-            for fname in os.listdir(recipes_dir):
-                fpath = os.path.join(recipes_dir, fname)
-                if os.path.isdir(fpath): continue
-                with open(fpath, 'r') as f:
-                    content = f.read()
-                
-                # Strip .lua for name if we added it
-                rec_name = fname[:-4] if fname.endswith(".lua") else fname
-                
-                r = session.exec(select(Recipe).where(Recipe.name == rec_name).where(Recipe.project_id == project_id)).first()
-                if r:
-                    if overwrite:
-                        r.content = content
-                        session.add(r)
-                else:
-                    r = Recipe(name=rec_name, content=content, project_id=project_id)
-                    session.add(r)
+        # Assets: rows first, then contents streamed in. source_path is lost
+        # in bundle, set to "imported" (and left alone on overwrite)
+        assets = dict(_list_files(os.path.join(root_dir, "assets")))
+        rows = {fname: {"source_path": "imported", "content": b"", "sha256": hash_file(fpath)} for fname, fpath in assets.items()}
+        inserted, updated, skipped, unchanged = bulk_upsert(session, Asset, project_id, rows, overwrite, update_columns=["content"])
+        stream_asset_files(session, project_id, {fname: assets[fname] for fname in inserted + updated})
+        summary.add(inserted, updated, skipped, unchanged)
+        if prune:
+            summary.removed += prune_missing(session, Asset, project_id, rows)
                     
-        # Import Assets
-        assets_dir = os.path.join(root_dir, "assets")
-        if os.path.exists(assets_dir):
-            for fname in os.listdir(assets_dir):
-                fpath = os.path.join(assets_dir, fname)
-                if os.path.isdir(fpath): continue
-                with open(fpath, 'rb') as f:
-                     content = f.read()
-                
-                a = session.exec(select(Asset).where(Asset.name == fname).where(Asset.project_id == project_id)).first()
-                if a:
-                    if overwrite:
-                        a.content = content
-                        session.add(a)
+        session.commit()
+    return summary
+
+def _begin_project_import(session, meta: dict, overwrite: bool, source=None) -> int:
+    """
+    Create or update the project row described by `meta` (project.json)
+    and return its id. Flushed only; the caller commits with the resources.
+    `source` is the (uri, commit) the project was imported from, if any.
+    """
+    project_name = meta['name']
+    # Check project existence
+    existing = session.exec(select(Project).where(Project.name == project_name)).first()
+    if existing:
+        if not overwrite:
+            raise FileExistsError(f"Project '{project_name}' already exists.")
+        # Update project metadata
+        existing.default_recipe = meta.get("default_recipe")
+        session.add(existing)
+    else:
+        existing = Project(name=project_name, default_recipe=meta.get("default_recipe"))
+        session.add(existing)
+    existing.source_uri, existing.source_commit = source or (None, None)
+    session.flush()
+    return existing.id
+
+def _list_files(directory: str):
+    """
+    (relative path, path) of the regular files under `directory`, if it
+    exists. Files in subfolders are named "sub/name", which is how nested
+    resources (e.g. from `kt import --templates-dir`) are exported.
+    """
+    entries = []
+    for dirpath, dirnames, fnames in os.walk(directory):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, directory)
+        for fname in sorted(fnames):
+            rel = fname if rel_dir == "." else os.path.join(rel_dir, fname)
+            entries.append((rel.replace(os.sep, "/"), os.path.join(dirpath, fname)))
+    return entries
+
+BUNDLE_FOLDERS = {"templates": "template", "recipes": "recipe", "assets": "asset"}
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def _member_parts(member_name: str):
+    """Path components of a member name; None for absolute paths and `..` components."""
+    if member_name.startswith("/"):
+        return None
+    parts = [part for part in member_name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    return parts
+
+def _project_path(parts, root):
+    """
+    Map member path components to their path inside the project rooted at
+    `root`: "project.json", "manifest.json" or (folder, relative path)
+    where the path may be nested ("a/b/deep.j2"). None for anything else.
+    """
+    if parts[:len(root)] != root:
+        return None
+    parts = parts[len(root):]
+    if parts in (["project.json"], [MANIFEST_NAME]):
+        return parts[0]
+    if len(parts) >= 2 and parts[0] in BUNDLE_FOLDERS:
+        return parts[0], "/".join(parts[1:])
+    return None
+
+@contextmanager
+def project_members(source):
+    """
+    Iterate over the project files of a bundle (path or binary file object)
+    as (path, size, open) tuples, with paths as returned by `_project_path`.
+    Bundles may hold the project at the archive root or inside one
+    top-level folder; the first project.json at either level decides which
+    (whatever the folder is called), and is always yielded first.
+
+    Members that come before project.json (only in older bundles) are read
+    in a second pass over the archive, which needs `source` to be a path or
+    a seekable file. Nothing is yielded for a bundle without project.json.
+    """
+    with bundle_members(source) as members:
+        yield _project_members(source, members)
+
+def _project_members(source, members):
+    root = None
+    pending = set()
+    for member_name, size, open_member in members:
+        parts = _member_parts(member_name)
+        if parts is None:
+            continue
+        if root is None:
+            if parts[-1] != "project.json" or len(parts) > 2:
+                pending.add(member_name)
+                continue
+            root = parts[:-1]
+        path = _project_path(parts, root)
+        if path is not None:
+            yield path, size, open_member
+
+    if root is None or not pending:
+        return
+    if not isinstance(source, (str, os.PathLike)):
+        if not source.seekable():
+            raise ValueError("Invalid bundle: resources come before project.json in a non-seekable stream.")
+        source.seek(0)
+    with bundle_members(source) as members:
+        for member_name, size, open_member in members:
+            if member_name in pending:
+                path = _project_path(_member_parts(member_name), root)
+                if path is not None:
+                    yield path, size, open_member
+
+def import_bundle_stream(source, overwrite: bool = False, prune: bool = False, origin=None) -> ImportSummary:
+    """
+    Import a project from a .project bundle (a path or a binary file
+    object) by reading its members in order (tarballs in stream mode) and
+    upserting each one directly into the database. Nothing is extracted to disk.
+
+    project.json is written first by `create_bundle`. For older bundles where
+    resources come before it, those are read in a second pass over the
+    archive (see `project_members`), which needs `source` to be a path or a
+    seekable file.
+
+    Resources already stored with the same content hash are left alone:
+    templates and recipes are compared after reading them, assets against
+    the bundle's manifest.json before their content is read. With `prune`,
+    resources of the project that are not in the bundle are deleted.
+    `origin` is an optional (uri, commit) recorded on the project.
+    """
+    from cli.db.blobs import write_asset_content
+
+    summary = ImportSummary()
+    rows = {"template": {}, "recipe": {}}
+    asset_names = set()
+    meta = None
+    manifest = {}
+    project_id = None
+    assets = {}
+
+    def import_asset(name, size, open_member):
+        asset_names.add(name)
+        asset_id, stored_sha256 = assets.get(name, (None, None))
+        expected = manifest.get(f"asset/{name}", {}).get("sha256")
+        if asset_id is not None:
+            if expected and expected == stored_sha256:
+                summary.unchanged += 1
+                return
+            if not overwrite:
+                summary.skipped += 1
+                return
+            summary.updated += 1
+        else:
+            # source_path is lost in bundle, set to "imported"
+            asset_id = session.execute(
+                insert(Asset).values(name=name, project_id=project_id, source_path="imported", content=b"")
+            ).inserted_primary_key[0]
+            assets[name] = (asset_id, None)
+            summary.added += 1
+        with open_member() as stream:
+            _, sha256 = write_asset_content(session, asset_id, stream, size=size)
+        if expected and sha256 != expected:
+            raise ValueError(f"Invalid bundle: asset '{name}' does not match its manifest hash.")
+
+    with get_session() as session:
+        with project_members(source) as members:
+            for path, size, open_member in members:
+                if path == "project.json":
+                    if meta is not None:
+                        continue
+                    with open_member() as f:
+                        meta = json.load(f)
+                    project_id = _begin_project_import(session, meta, overwrite, origin)
+                    assets = {
+                        name: (asset_id, sha256)
+                        for asset_id, name, sha256 in session.exec(
+                            select(Asset.id, Asset.name, Asset.sha256).where(Asset.project_id == project_id)
+                        ).all()
+                    }
+                    continue
+                if path == MANIFEST_NAME:
+                    with open_member() as f:
+                        data = json.load(f)
+                    if data.get("version") == MANIFEST_VERSION:
+                        manifest = data.get("resources", {})
+                    continue
+
+                folder, fname = path
+                kind = BUNDLE_FOLDERS[folder]
+                if kind == "asset":
+                    import_asset(fname, size, open_member)
                 else:
-                    # source_path is lost in bundle, set to "imported"
-                    a = Asset(name=fname, source_path="imported", content=content, project_id=project_id)
-                    session.add(a)
-                    
+                    with open_member() as f:
+                        rows[kind][resource_name(kind, fname)] = text_values(f.read().decode("utf-8"))
+
+        if meta is None:
+            raise ValueError("Invalid bundle: project.json not found.")
+
+        summary.add(*bulk_upsert(session, Template, project_id, rows["template"], overwrite))
+        summary.add(*bulk_upsert(session, Recipe, project_id, rows["recipe"], overwrite))
+        if prune:
+            summary.removed += prune_missing(session, Template, project_id, rows["template"])
+            summary.removed += prune_missing(session, Recipe, project_id, rows["recipe"])
+            summary.removed += prune_missing(session, Asset, project_id, asset_names)
         session.commit()
+    return summary
+
+def inspect_bundle(bundle_path: str):
+    """
+    Describe a bundle without importing it. Returns (format, project.json
+    metadata, entries) where entries are (kind, name, size, sha256) tuples;
+    sha256 is None for bundles without a manifest. Zip bundles are listed
+    from their central directory without reading any resource.
+    """
+    fmt = sniff_format(bundle_path)
+    meta, manifest, entries = {}, {}, []
+    with project_members(bundle_path) as members:
+        for path, size, open_member in members:
+            if path == "project.json":
+                with open_member() as f:
+                    meta = json.load(f)
+            elif path == MANIFEST_NAME:
+                with open_member() as f:
+                    manifest = json.load(f).get("resources", {})
+            else:
+                kind = BUNDLE_FOLDERS[path[0]]
+                entries.append((kind, resource_name(kind, path[1]), size))
+    resources = [
+        (kind, name, size, manifest.get(f"{kind}/{name}", {}).get("sha256"))
+        for kind, name, size in entries
+    ]
+    return fmt, meta, resources
+
+def read_bundle_entry(bundle_path: str, ref: str, out):
+    """
+    Copy one resource, given as "type/name" (e.g. "template/app"), from a
+    bundle to the binary file `out`. Zip bundles seek straight to the entry;
+    tarballs are scanned until it is found.
+    """
+    kind, _, name = ref.partition("/")
+    if kind not in BUNDLE_FOLDERS.values() or not name:
+        raise ValueError(f"Invalid resource '{ref}' (expected template/NAME, recipe/NAME or asset/NAME).")
+    with project_members(bundle_path) as members:
+        for path, _, open_member in members:
+            if not isinstance(path, tuple) or BUNDLE_FOLDERS[path[0]] != kind:
+                continue
+            if resource_name(kind, path[1]) == name:
+                with open_member() as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                return
+    raise KeyError(f"'{ref}' not found in bundle.")
 
-def extract_bundle(bundle_path: str, overwrite: bool = False):
+def extract_bundle(bundle_path: str, overwrite: bool = False, prune: bool = False,
+                   source=None) -> ImportSummary:
     """
-    Import a project from a .project tarball.
+    Import a project from a .project bundle.
     """
     if not os.path.exists(bundle_path):
         raise FileNotFoundError(f"Bundle '{bundle_path}' not found.")
-        
-    with tempfile.TemporaryDirectory() as tmpdir:
-        with tarfile.open(bundle_path, "r:gz") as tar:
-            tar.extractall(path=tmpdir)
-            
-        # Find root folder (likely named after project)
-        # We need to find 'project.json'
-        # Since we tarred 'tmpdir' as arcname=project_name, it's inside a folder.
-        root_dir = None
-        for item in os.listdir(tmpdir):
-            if os.path.isdir(os.path.join(tmpdir, item)):
-                if os.path.exists(os.path.join(tmpdir, item, "project.json")):
-                    root_dir = os.path.join(tmpdir, item)
-                    break
-        
-        if not root_dir:
-             # Try root of tmpdir
-             if os.path.exists(os.path.join(tmpdir, "project.json")):
-                 root_dir = tmpdir
-             else:
-                 raise ValueError("Invalid bundle: project.json not found.")
-                 
-        import_project_from_dir(root_dir, overwrite)
+    return import_bundle_stream(bundle_path, overwrite, prune, origin=source)
+
+def import_project_from_url(url: str, overwrite: bool = False, prune: bool = False,
+                            sha256: str = None) -> ImportSummary:
+    """
+    Import a project from a bundle at `url`. The download goes through the
+    on-disk HTTP cache (see `DownloadCache`), so an unchanged bundle costs
+    one conditional request; `sha256` pins the expected bundle hash.
+    """
+    from cli.utils.download import DownloadCache
+
+    path, _ = DownloadCache().fetch(url, sha256=sha256)
+    return import_bundle_stream(path, overwrite, prune)
 
 def expand_bundle_to_path(bundle_path: str, extract_path: str, overwrite: bool = False):
     """
-    Extract a .project tarball to a specified path.
+    Extract a .project bundle (tarball or zip) to a specified path.
     """
     if not os.path.exists(bundle_path):
         raise FileNotFoundError(f"Bundle '{bundle_path}' not found.")
@@ -214,8 +432,13 @@ def expand_bundle_to_path(bundle_path: str, extract_path: str, overwrite: bool =
         os.makedirs(extract_path)
         
     with tempfile.TemporaryDirectory() as tmpdir:
-        with tarfile.open(bundle_path, "r:gz") as tar:
-            tar.extractall(path=tmpdir)
+        if sniff_format(bundle_path) == "zip":
+            import zipfile
+            with zipfile.ZipFile(bundle_path) as zf:
+                zf.extractall(path=tmpdir)
+        else:
+            with open_tar_reader(bundle_path, stream=False) as tar:
+                tar.extractall(path=tmpdir, filter="data")
             
         # Find root folder (likely named after project)
         root_dir = None
@@ -248,10 +471,11 @@ def expand_bundle_to_path(bundle_path: str, extract_path: str, overwrite: bool =
             else:
                 shutil.copy2(s, d)
 
-def bundle_path_to_archive(source_path: str, output_path: str, overwrite: bool = False):
+def bundle_path_to_archive(source_path: str, output_path: str, overwrite: bool = False,
+                           compression: str = "gz", level: int = None, fmt: str = "tar"):
     """
-    Create a .project tarball from a directory.
-    Ignores .git, README.md, .gitignore at the root.
+    Create a .project bundle (tarball, or indexed zip with fmt="zip") from a directory.
+    Ignores .git, README.md, .gitignore and .kt-manifest.json at the root.
     """
     if not os.path.exists(source_path):
         raise FileNotFoundError(f"Source path '{source_path}' not found.")
@@ -262,21 +486,36 @@ def bundle_path_to_archive(source_path: str, output_path: str, overwrite: bool =
     if os.path.exists(output_path) and not overwrite:
         raise FileExistsError(f"Output file '{output_path}' exists. Use --overwrite to replace.")
         
-    ignore_list = {".git", "README.md", ".gitignore"}
+    # The output manifest of recipe runs in the project folder isn't part of the project
+    ignore_list = {".git", "README.md", ".gitignore", OUTPUT_MANIFEST_NAME}
     
     # We want the archive to have a root folder named after the project
     with open(os.path.join(source_path, "project.json"), 'r') as f:
         meta = json.load(f)
     project_name = meta.get("name", os.path.basename(os.path.abspath(source_path)))
     
-    with tarfile.open(output_path, "w:gz") as tar:
+    # project.json and a manifest of the resource files go first, so
+    # importers can skip resources they already have
+    resources = {}
+    for folder, kind in BUNDLE_FOLDERS.items():
+        for fname, fpath in _list_files(os.path.join(source_path, folder)):
+            resources[f"{kind}/{resource_name(kind, fname)}"] = {"sha256": hash_file(fpath), "size": os.path.getsize(fpath)}
+    manifest = json.dumps({"version": MANIFEST_VERSION, "resources": resources}, sort_keys=True).encode("utf-8")
+
+    writer = open_bundle_writer(output_path, fmt, compression, level)
+    try:
+        writer.add_path(os.path.join(source_path, "project.json"), f"{project_name}/project.json")
+        writer.add_stream(f"{project_name}/{MANIFEST_NAME}", io.BytesIO(manifest), len(manifest), time.time())
+
         for item in os.listdir(source_path):
-            if item in ignore_list:
+            if item in ignore_list or item in ("project.json", MANIFEST_NAME):
                 continue
             
             s = os.path.join(source_path, item)
             # We want to add it under a folder named project_name
-            tar.add(s, arcname=os.path.join(project_name, item))
+            writer.add_path(s, f"{project_name}/{item}")
+    finally:
+        writer.close()
 
 def init_bundle_structure(target_path: str, default_recipe: str = None):
     """
@@ -332,33 +571,89 @@ def init_bundle_structure(target_path: str, default_recipe: str = None):
         with open(example_asset, 'w') as f:
             f.write("This is an example asset for your bundle project.\n")
 
-def import_project_from_git(uri: str, overwrite: bool = False):
+# Top-level paths of a repository that make up a project
+GIT_PROJECT_PATHS = ("project.json", "templates", "recipes", "assets")
+
+def _git(*args, git_dir: str = None, **kwargs) -> str:
+    """Run a git command and return its stdout, raising RuntimeError on failure."""
+    cmd = ["git"] + (["--git-dir", git_dir] if git_dir else []) + list(args)
+    try:
+        return subprocess.run(cmd, check=True, capture_output=True, text=True, **kwargs).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"git {args[0]} failed: {e.stderr.strip()}")
+
+def git_mirror_dir(uri: str) -> str:
+    """Bare mirror that caches fetches of `uri` across imports."""
+    import click
+    import hashlib
+
+    key = hashlib.sha256(uri.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(click.get_app_dir("kt"), "git", f"{key}.git")
+
+def fetch_git_mirror(uri: str):
+    """
+    Shallow-fetch the default branch of `uri` into its bare mirror and
+    return (mirror dir, commit). The mirror persists, so later fetches only
+    transfer objects it doesn't have yet.
+    """
+    git_dir = git_mirror_dir(uri)
+    if not os.path.exists(os.path.join(git_dir, "HEAD")):
+        os.makedirs(git_dir, exist_ok=True)
+        _git("init", "--bare", "--quiet", git_dir)
+    _git("fetch", "--depth", "1", "--force", "--no-tags", "--quiet", uri, "HEAD", git_dir=git_dir)
+    commit = _git("rev-parse", "FETCH_HEAD^{commit}", git_dir=git_dir).strip()
+    # Keep the fetched commit reachable so gc doesn't drop it
+    _git("update-ref", "refs/kt/head", commit, git_dir=git_dir)
+    return git_dir, commit
+
+def import_project_from_git(uri: str, overwrite: bool = False, prune: bool = False) -> ImportSummary:
     """
     Import a project from a Git repository.
-    Clones the repo to a temporary directory, checks for a .project file,
-    and imports accordingly.
+    The default branch is shallow-fetched into a bare mirror cached under
+    the app dir (see `fetch_git_mirror`), and only the project paths
+    (project.json, templates/, recipes/, assets/ and root *.project
+    bundles) of that commit are checked out into a temporary directory.
+    A .project bundle in the root takes precedence over the folder layout.
+    Without `overwrite`, the import is skipped when the commit is the one
+    the project was last imported from; with it, the commit is imported
+    again, restoring resources edited or deleted since.
     """
+    git_dir, commit = fetch_git_mirror(uri)
+
+    with get_session() as session:
+        imported = session.exec(
+            select(Project.id).where(Project.source_uri == uri).where(Project.source_commit == commit)
+        ).first()
+    if imported is not None and not overwrite:
+        summary = ImportSummary()
+        summary.up_to_date = commit
+        return summary
+
+    paths = [
+        path for path in _git("ls-tree", "--name-only", commit, git_dir=git_dir).splitlines()
+        if path in GIT_PROJECT_PATHS or path.endswith(".project")
+    ]
+    if not paths:
+        raise ValueError(f"Invalid project repository: 'project.json' not found in {uri}")
+
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Clone the repository
+        proc = subprocess.Popen(
+            ["git", "--git-dir", git_dir, "archive", "--format=tar", commit, "--", *paths],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
         try:
-            subprocess.run(["git", "clone", uri, "."], cwd=tmpdir, check=True, capture_output=True, text=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to clone repository: {e.stderr}")
+            with open_tar_reader(proc.stdout) as tar:
+                tar.extractall(path=tmpdir, filter="data")
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read().decode("utf-8", "replace")
+            proc.stderr.close()
+            if proc.wait() != 0:
+                raise RuntimeError(f"git archive failed: {stderr.strip()}")
 
-        # Search for .project file in the root
-        project_bundles = glob.glob(os.path.join(tmpdir, "*.project"))
-        
+        # Prompt says "If the repo contains a .project file in the root, the project should be imported from that archive."
+        project_bundles = sorted(glob.glob(os.path.join(tmpdir, "*.project")))
         if project_bundles:
-            # If multiple bundles, just take the first one or logic it? 
-            # Prompt says "If the repo contains a .project file in the root, the project should be imported from that archive."
-            extract_bundle(project_bundles[0], overwrite)
-        else:
-            # Check for regular project structure (project.json)
-            if os.path.exists(os.path.join(tmpdir, "project.json")):
-                import_project_from_dir(tmpdir, overwrite)
-            else:
-                # If neither, maybe it's just a folder that needs to be imported as is?
-                # The prompt says: "If no .project archive is present, then the bundler should attempt to import the project as if it was from a folder."
-                # import_project_from_dir raises ValueError if project.json is missing.
-                # If the user wants to import from a folder, they probably expect project.json to be there.
-                import_project_from_dir(tmpdir, overwrite)
+            return extract_bundle(project_bundles[0], overwrite, prune, source=(uri, commit))
+        # Otherwise import the project as if it was from a folder
+        return import_project_from_dir(tmpdir, overwrite, prune, source=(uri, commit))
@@ -0,0 +1,24 @@
+_console = None
+
+
+def get_console():
+    """Return the shared rich Console, importing rich on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+class _LazyConsole:
+    """
+    Stand-in for a rich Console that only imports rich when something is
+    actually printed. Keeps `kt` startup (and quiet, non-TTY runs) free of
+    rich's import and setup cost.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_console(), name)
+
+
+console = _LazyConsole()
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import urllib.error
+import urllib.request
+
+import click
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_cache_dir() -> str:
+    return os.path.join(click.get_app_dir("kt"), "http-cache")
+
+
+class DownloadCache:
+    """
+    On-disk cache of downloaded bundles under the app dir, keyed by URL.
+
+    Each entry is the response body plus a small JSON record of its ETag,
+    Last-Modified and sha256, used to revalidate the body with a single
+    conditional request before it is reused.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or get_cache_dir()
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def body_path(self, url: str) -> str:
+        return os.path.join(self.root, f"{self._key(url)}.body")
+
+    def _meta_path(self, url: str) -> str:
+        return os.path.join(self.root, f"{self._key(url)}.json")
+
+    def lookup(self, url: str) -> dict:
+        """The cached record for `url`, or {} if its body isn't cached."""
+        try:
+            with open(self._meta_path(url), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if meta.get("url") != url or not os.path.exists(self.body_path(url)):
+            return {}
+        return meta
+
+    def fetch(self, url: str, sha256: str = None, timeout: float = 60):
+        """
+        Return (path, fresh) for the body of `url`, downloading it only if
+        the cached copy is missing or stale. The response is streamed to
+        disk in chunks and hashed on the way. With `sha256`, a body that
+        doesn't match is rejected and never cached. `fresh` is False when
+        the cached copy was reused.
+        """
+        sha256 = sha256.lower() if sha256 else None
+        path = self.body_path(url)
+        meta = self.lookup(url)
+        # A cached body with another hash than the pinned one can't be reused
+        if sha256 and meta and meta.get("sha256") != sha256:
+            meta = {}
+
+        request = urllib.request.Request(url, headers={"User-Agent": "kt"})
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and meta:
+                return path, False
+            raise RuntimeError(f"Download failed: HTTP {e.code} {e.reason}")
+        except urllib.error.URLError as e:
+            raise RuntimeError(f"Download failed: {e.reason}")
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        digest = hashlib.sha256()
+        try:
+            with response, open(tmp_path, 'wb') as f:
+                while chunk := response.read(CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+                headers = response.headers
+            if sha256 and digest.hexdigest() != sha256:
+                raise ValueError(f"Downloaded file does not match the expected sha256 ({digest.hexdigest()}).")
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with open(self._meta_path(url), 'w') as f:
+            json.dump({
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "sha256": digest.hexdigest(),
+            }, f)
+        return path, True
@@ -0,0 +1,150 @@
+import glob
+import os
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+from cli.engine.manifest import hash_text
+
+
+def resource_name(kind: str, rel_path: str) -> str:
+    """Derive a resource name from a path relative to the import root."""
+    name = rel_path.replace(os.sep, "/")
+    # Same conventions as bundles: templates drop .j2, recipes drop .lua
+    if kind == "template" and name.endswith(".j2"):
+        name = name[:-3]
+    elif kind == "recipe" and name.endswith(".lua"):
+        name = name[:-4]
+    return name
+
+
+def collect_files(root: str, pattern: str = "**/*") -> List[Tuple[str, str]]:
+    """
+    Return (relative_path, full_path) for every file under `root` matching
+    `pattern` (a glob relative to `root`; `**` recurses). Hidden files are skipped.
+    """
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Directory '{root}' not found.")
+    matches = []
+    for rel in sorted(glob.glob(pattern, root_dir=root, recursive=True)):
+        full = os.path.join(root, rel)
+        if os.path.isfile(full):
+            matches.append((rel, full))
+    return matches
+
+
+class ImportSummary:
+    """Tally of what a project import did to its resources."""
+
+    FIELDS = ("added", "updated", "unchanged", "skipped", "removed")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        # Set to the source revision when an import is skipped as up to date
+        self.up_to_date = None
+
+    def add(self, inserted, updated, skipped, unchanged):
+        """Count the name lists returned by `bulk_upsert`."""
+        self.added += len(inserted)
+        self.updated += len(updated)
+        self.skipped += len(skipped)
+        self.unchanged += len(unchanged)
+
+    def __str__(self):
+        parts = [f"{getattr(self, field)} {field}" for field in self.FIELDS if getattr(self, field)]
+        return ", ".join(parts) or "nothing to import"
+
+
+def text_values(content: str) -> dict:
+    """Column values for a template or recipe row with the given content."""
+    return {"content": content, "sha256": hash_text(content)}
+
+
+def bulk_upsert(session, model, project_id, rows: Dict[str, dict], overwrite: bool = False,
+                update_columns: Optional[List[str]] = None) -> Tuple[List[str], List[str], List[str], List[str]]:
+    """
+    Insert or update many resources of one type in a single pass.
+
+    `rows` maps resource name -> column values. Existing names (and content
+    hashes) for the project are fetched with one query; rows whose `sha256`
+    matches the stored one are left alone. The rest are written with one
+    `INSERT ... ON CONFLICT (project_id, name) DO UPDATE` executemany,
+    updating `update_columns` (default: every value column) on conflict.
+    Unassigned resources, or a database whose unique name index couldn't be
+    created, get a bulk INSERT plus a bulk UPDATE by primary key instead.
+    Nothing is committed. Returns the (inserted, updated, skipped, unchanged) names.
+    """
+    from cli.db.session import has_index
+
+    existing = {
+        name: (row_id, sha256)
+        for row_id, name, sha256 in session.exec(
+            select(model.id, model.name, model.sha256).where(model.project_id == project_id)
+        ).all()
+    }
+
+    inserted, updated, skipped, unchanged = [], [], [], []
+    for name, values in rows.items():
+        if name not in existing:
+            inserted.append(name)
+        elif values.get("sha256") and values["sha256"] == existing[name][1]:
+            unchanged.append(name)
+        elif overwrite:
+            updated.append(name)
+        else:
+            skipped.append(name)
+
+    names = inserted + updated
+    if not names:
+        return inserted, updated, skipped, unchanged
+
+    table = model.__table__
+    if project_id is not None and has_index(session, f"ux_{table.name}_project_name"):
+        params = [{"name": name, "project_id": project_id, **rows[name]} for name in names]
+        columns = update_columns or [col for col in params[0] if col not in ("name", "project_id")]
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.project_id, table.c.name],
+            index_where=table.c.project_id.isnot(None),
+            set_={col: stmt.excluded[col] for col in columns},
+        )
+        session.execute(stmt, params)
+    else:
+        if inserted:
+            session.execute(insert(model), [{"name": name, "project_id": project_id, **rows[name]} for name in inserted])
+        if updated:
+            session.execute(update(model), [
+                {"id": existing[name][0], **{col: val for col, val in rows[name].items() if update_columns is None or col in update_columns}}
+                for name in updated
+            ])
+    return inserted, updated, skipped, unchanged
+
+
+def prune_missing(session, model, project_id, keep) -> int:
+    """Delete the project's resources of one type whose names are not in `keep`. Returns the count."""
+    keep = set(keep)
+    stale = [
+        row_id
+        for row_id, name in session.exec(select(model.id, model.name).where(model.project_id == project_id)).all()
+        if name not in keep
+    ]
+    for start in range(0, len(stale), 500):
+        session.execute(delete(model).where(model.id.in_(stale[start:start + 500])))
+    return len(stale)
+
+
+def stream_asset_files(session, project_id, paths: Dict[str, str]):
+    """
+    Fill in the content of freshly upserted assets (name -> file path) from
+    their files, one bounded-size chunk at a time. Nothing is committed.
+    """
+    from cli.db.blobs import write_asset_content
+    from cli.db.models import Asset
+
+    ids = dict(
+        session.exec(select(Asset.name, Asset.id).where(Asset.project_id == project_id)).all()
+    )
+    for name, path in paths.items():
+        with open(path, 'rb') as f:
+            write_asset_content(session, ids[name], f)
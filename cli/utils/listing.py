@@ -0,0 +1,102 @@
+import json
+
+import click
+from sqlmodel import select
+
+from cli.utils.console import console
+from cli.db.models import Asset, Project, Recipe, Template
+
+# Columns shown for each listing; content columns are never selected
+LIST_COLUMNS = {
+    Project: ("id", "name", "created_at", "default_recipe"),
+    Template: ("id", "name", "project_id", "sha256"),
+    Recipe: ("id", "name", "project_id", "sha256"),
+    Asset: ("id", "name", "source_path", "size", "sha256"),
+}
+
+# (header, column, column options) of the rich table; machine-readable
+# output gets all of LIST_COLUMNS
+_ID = ("ID", "id", {"justify": "right", "style": "cyan"})
+_NAME = ("Name", "name", {"style": "magenta"})
+TABLE_COLUMNS = {
+    Project: (_ID, _NAME, ("Created At", "created_at", {"justify": "right"})),
+    Template: (_ID, _NAME),
+    Recipe: (_ID, _NAME),
+    Asset: (_ID, _NAME, ("Source Path", "source_path", {"style": "dim"})),
+}
+
+# Rows fetched from SQLite per round trip when streaming
+FETCH_SIZE = 500
+
+
+def list_options(f):
+    """Add the shared --limit/--offset/--sort/--filter/--json/--ndjson options."""
+    options = [
+        click.option("--limit", type=click.IntRange(min=0), help="Show at most this many rows"),
+        click.option("--offset", type=click.IntRange(min=0), default=0, help="Skip this many rows first"),
+        click.option("--sort", help="Sort by a column (prefix with '-' for descending), e.g. -name"),
+        click.option("--filter", "name_filter", help="Only names matching this glob (e.g. 'svelte/*')"),
+        click.option("--json", "list_format", flag_value="json", help="Print a JSON array instead of a table"),
+        click.option("--ndjson", "list_format", flag_value="ndjson", help="Print one JSON object per line"),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+def listing_query(model, project_id=None, assigned=True, sort=None, name_filter=None, limit=None, offset=0):
+    """
+    SELECT the listing columns of `model` with sorting, filtering and paging
+    done by SQLite. Resource listings are scoped to `project_id` (unassigned
+    resources when it's None) unless `assigned` is False (projects).
+    """
+    columns = LIST_COLUMNS[model]
+    query = select(*(getattr(model, name) for name in columns))
+    if assigned:
+        query = query.where(model.project_id == project_id)
+    if name_filter:
+        query = query.where(model.name.op("GLOB")(name_filter))
+
+    descending = bool(sort) and sort.startswith("-")
+    key = (sort or "id").lstrip("-")
+    if key not in columns:
+        raise click.BadParameter(f"'{key}' is not one of: {', '.join(columns)}.", param_hint="--sort")
+    order = getattr(model, key)
+    query = query.order_by(order.desc() if descending else order, model.id)
+
+    if limit is not None:
+        query = query.limit(limit)
+    if offset:
+        query = query.offset(offset)
+    return query
+
+
+def print_listing(session, model, query, title: str, list_format: str = None):
+    """
+    Print the rows of a `listing_query`. JSON and NDJSON rows are written
+    as they are fetched; only the table view collects them first.
+    """
+    columns = LIST_COLUMNS[model]
+    rows = session.exec(query.execution_options(yield_per=FETCH_SIZE))
+
+    if list_format == "ndjson":
+        for row in rows:
+            click.echo(json.dumps(dict(zip(columns, row)), default=str))
+        return
+    if list_format == "json":
+        click.echo("[", nl=False)
+        for index, row in enumerate(rows):
+            click.echo(("," if index else "") + "\n  " + json.dumps(dict(zip(columns, row)), default=str), nl=False)
+        click.echo("\n]")
+        return
+
+    from rich.table import Table
+
+    table = Table(title=title)
+    positions = []
+    for header, name, options in TABLE_COLUMNS[model]:
+        table.add_column(header, **options)
+        positions.append(columns.index(name))
+    for row in rows:
+        table.add_row(*(str(row[position]) for position in positions))
+    console.print(table)
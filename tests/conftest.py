@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# kt keeps its database and caches under the app dir, and the database
+# engine is created when cli.db.session is imported: point it at a scratch
+# directory before any test module imports cli.
+os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="kt-tests-")
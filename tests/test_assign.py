@@ -0,0 +1,60 @@
+import pytest
+from click.testing import CliRunner
+from sqlmodel import select
+
+from cli.commands.assign_cmd import assign_cmd
+from cli.db.models import Asset, Project, Recipe, Template
+from cli.db.session import get_session
+
+
+def make_projects(prefix, Model, **values):
+    """Projects `<prefix>-a` and `<prefix>-b`, each with a resource named "dup"; returns their ids."""
+    ids = []
+    with get_session() as session:
+        for name in (f"{prefix}-a", f"{prefix}-b"):
+            project = Project(name=name)
+            session.add(project)
+            session.flush()
+            session.add(Model(name="dup", project_id=project.id, **values))
+            ids.append(project.id)
+        session.commit()
+    return ids
+
+
+@pytest.mark.parametrize("option, Model, values", [
+    ("--template", Template, {"content": ""}),
+    ("--recipe", Recipe, {"content": ""}),
+    ("--asset", Asset, {"content": b"", "source_path": "test"}),
+])
+def test_assign_refuses_name_clash(option, Model, values):
+    prefix = f"clash{option}"
+    source_id, target_id = make_projects(prefix, Model, **values)
+
+    result = CliRunner().invoke(assign_cmd, [option, "dup", "--project", f"{prefix}-b"])
+
+    assert result.exception is None
+    assert "already has" in result.output
+    assert "assigned" not in result.output
+    with get_session() as session:
+        owners = session.exec(select(Model.project_id).where(Model.name == "dup")
+                              .where(Model.project_id.in_([source_id, target_id]))).all()
+    assert sorted(owners) == [source_id, target_id]
+
+
+def test_clash_leaves_other_moves_undone():
+    _, target_id = make_projects("partial", Recipe, content="")
+    with get_session() as session:
+        session.add(Template(name="partial-solo", content=""))
+        session.commit()
+
+    result = CliRunner().invoke(assign_cmd, ["--template", "partial-solo", "--recipe", "dup",
+                                             "--project", "partial-b"])
+
+    assert "already has a recipe named 'dup'" in result.output
+    with get_session() as session:
+        assert session.exec(select(Template.project_id).where(Template.name == "partial-solo")).one() is None
+
+    result = CliRunner().invoke(assign_cmd, ["--template", "partial-solo", "--project", "partial-b"])
+    assert "Template 'partial-solo' assigned to 'partial-b'." in result.output
+    with get_session() as session:
+        assert session.exec(select(Template.project_id).where(Template.name == "partial-solo")).one() == target_id
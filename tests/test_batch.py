@@ -0,0 +1,51 @@
+import io
+
+import click
+import pytest
+
+from cli.engine.batch import run_configs
+from cli.engine.core import RecipeEngine
+from cli.engine.reporter import Reporter
+
+RECIPE = """
+local name = r.question({ prompt = "Name", store = "name" })
+local go = r.confirm({ prompt = "Go?", default = true })
+r.touch(r.f("$(name).txt"), { content = tostring(go) })
+"""
+
+
+@pytest.fixture
+def configs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Anything that still prompted would read this instead of failing
+    monkeypatch.setattr("sys.stdin", io.StringIO("typed\n" * 10))
+    (tmp_path / "a.toml").write_text('name = "a"\n')
+    (tmp_path / "b.toml").write_text('other = 1\n')
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 2], ids=["in-process", "pool"])
+def test_prompts_never_block_batch_runs(configs, jobs, capfd):
+    results = {r.config: r for r in run_configs(RECIPE, ["a.toml", "b.toml"], jobs=jobs)}
+
+    assert results["a.toml"].ok
+    assert (configs / "a.txt").read_text() == "true"
+
+    failed = results["b.toml"]
+    assert not failed.ok
+    assert "r.question is not available in batch runs; set 'name' in the config" in failed.errors[0]
+    assert not (configs / "typed.txt").exists()
+    # Failures go to the summary only, without tracebacks
+    assert "Traceback" not in capfd.readouterr().err
+
+
+def test_error_without_message_is_named(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    def abort(*args, **kwargs):
+        raise click.Abort()
+    monkeypatch.setattr(click, "prompt", abort)
+
+    engine = RecipeEngine(reporter=Reporter(mode="quiet"))
+    with pytest.raises(RuntimeError, match="Lua execution error: Abort"):
+        engine.execute('r.question({ prompt = "Name" })')
@@ -0,0 +1,25 @@
+import pytest
+
+from cli.engine.config_cache import generate_config
+from cli.engine.reporter import Reporter
+
+
+def generate(recipe):
+    return generate_config(recipe, reporter=Reporter(mode="quiet"))
+
+
+def test_plain_config_is_cached():
+    recipe = 'r.config({ port = { default = 8000 } })'
+    config, cached = generate(recipe)
+    assert not cached
+    again, cached = generate(recipe)
+    assert cached
+    assert again.text() == config.text()
+
+
+@pytest.mark.parametrize("expression", ['os.getenv("HOME")', 'os.time()', 'os.date("%Y")'])
+def test_config_reading_environment_or_clock_is_not_cached(expression):
+    recipe = f'r.config({{ value = {{ default = tostring({expression}) }} }})'
+    generate(recipe)
+    _, cached = generate(recipe)
+    assert not cached
@@ -0,0 +1,77 @@
+import hashlib
+import http.server
+import os
+import threading
+
+import pytest
+
+from cli.utils.download import DownloadCache
+
+BODY = b"bundle bytes\n" * 1000
+ETAG = '"v1"'
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            self.server.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.server.statuses.append(200)
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/demo.project"
+
+
+def test_cached_body_is_revalidated_with_etag(server, tmp_path):
+    cache = DownloadCache(str(tmp_path))
+
+    path, fresh = cache.fetch(url(server))
+    assert fresh
+    with open(path, "rb") as f:
+        assert f.read() == BODY
+
+    again, fresh = cache.fetch(url(server), sha256=hashlib.sha256(BODY).hexdigest())
+    assert not fresh
+    assert again == path
+    assert server.statuses == [200, 304]
+
+
+def test_sha256_mismatch_is_rejected_and_not_cached(server, tmp_path):
+    cache = DownloadCache(str(tmp_path))
+
+    with pytest.raises(ValueError, match="sha256"):
+        cache.fetch(url(server), sha256="0" * 64)
+    assert cache.lookup(url(server)) == {}
+    assert os.listdir(tmp_path) == []
+
+
+def test_pinned_hash_of_other_body_refetches(server, tmp_path):
+    cache = DownloadCache(str(tmp_path))
+    cache.fetch(url(server))
+
+    # The cached body doesn't match the pin, so it isn't revalidated but fetched again
+    with pytest.raises(ValueError, match="sha256"):
+        cache.fetch(url(server), sha256="0" * 64)
+    assert server.statuses == [200, 200]
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess
+
+import pytest
+
+from sqlmodel import select
+
+from cli.db.models import Project, Template
+from cli.db.session import get_session
+from cli.utils.bundler import fetch_git_mirror, git_mirror_dir, import_project_from_git
+
+
+def git(repo, *args):
+    env = dict(os.environ, GIT_AUTHOR_NAME="kt", GIT_AUTHOR_EMAIL="kt@example.com",
+               GIT_COMMITTER_NAME="kt", GIT_COMMITTER_EMAIL="kt@example.com")
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True,
+                          text=True, env=env).stdout.strip()
+
+
+def commit_template(repo, content):
+    (repo / "templates" / "hello.j2").write_text(content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "--quiet", "-m", "update")
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path, request):
+    repo = tmp_path / "src"
+    (repo / "templates").mkdir(parents=True)
+    (repo / "project.json").write_text(json.dumps({"name": f"git-{request.node.name}"}))
+    git(repo, "init", "--quiet")
+    return repo
+
+
+def test_reimport_of_same_commit_is_up_to_date(repo):
+    commit = commit_template(repo, "Hello {{ name }}!\n")
+    uri = repo.as_uri()
+
+    summary = import_project_from_git(uri)
+    assert summary.up_to_date is None
+    assert summary.added == 1
+
+    summary = import_project_from_git(uri)
+    assert summary.up_to_date == commit
+    assert summary.added == summary.updated == 0
+
+
+def test_overwrite_reimports_same_commit(repo):
+    uri = repo.as_uri()
+    commit_template(repo, "original\n")
+    import_project_from_git(uri)
+    with get_session() as session:
+        template = session.exec(
+            select(Template).join(Project).where(Project.source_uri == uri).where(Template.name == "hello")
+        ).one()
+        template.content = "edited locally\n"
+        session.add(template)
+        session.commit()
+
+    summary = import_project_from_git(uri, overwrite=True)
+    assert summary.up_to_date is None
+    assert summary.updated == 1
+    with get_session() as session:
+        template = session.exec(
+            select(Template).join(Project).where(Project.source_uri == uri).where(Template.name == "hello")
+        ).one()
+        assert template.content == "original\n"
+
+
+def test_new_commit_updates_mirror_and_project(repo):
+    uri = repo.as_uri()
+    first = commit_template(repo, "v1\n")
+    import_project_from_git(uri)
+
+    second = commit_template(repo, "v2\n")
+    git_dir, commit = fetch_git_mirror(uri)
+    assert git_dir == git_mirror_dir(uri)
+    assert commit == second != first
+    assert git(git_dir, "rev-parse", "refs/kt/head") == second
+
+    summary = import_project_from_git(uri, overwrite=True)
+    assert summary.up_to_date is None
+    assert summary.updated == 1
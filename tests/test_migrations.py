@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from cli.db import session as db_session
+
+# Schema of a database created before the resource tables got hashes, the
+# unique (project_id, name) index and ON DELETE actions
+BASELINE_SCHEMA = """
+CREATE TABLE project (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, created_at DATETIME NOT NULL, default_recipe VARCHAR,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_project_name ON project (name);
+CREATE TABLE template (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, content VARCHAR NOT NULL, project_id INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(project_id) REFERENCES project (id)
+);
+CREATE INDEX ix_template_name ON template (name);
+CREATE TABLE recipe (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, content VARCHAR NOT NULL, project_id INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(project_id) REFERENCES project (id)
+);
+CREATE INDEX ix_recipe_name ON recipe (name);
+CREATE TABLE asset (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, source_path VARCHAR NOT NULL, content BLOB NOT NULL,
+    project_id INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(project_id) REFERENCES project (id)
+);
+CREATE INDEX ix_asset_name ON asset (name);
+
+INSERT INTO project VALUES (1, 'legacy', '2024-01-01 00:00:00', 'init');
+INSERT INTO template VALUES (1, 'greeting', 'Hello {{ name }}', 1);
+INSERT INTO recipe VALUES (1, 'init', 'r.template("greeting", {})', 1);
+INSERT INTO asset VALUES (1, 'logo', 'logo.png', x'89504e47', 1);
+"""
+
+RESOURCE_TABLES = ("template", "recipe", "asset")
+
+
+@pytest.fixture
+def baseline_db(tmp_path, monkeypatch):
+    """A baseline-schema database that init_db migrates instead of the test database."""
+    path = tmp_path / "kt.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", db_session._enable_foreign_keys)
+    monkeypatch.setattr(db_session, "engine", engine)
+    monkeypatch.setattr(db_session, "_initialized", False)
+    yield path
+    engine.dispose()
+
+
+def test_migration_adds_on_delete_actions(baseline_db):
+    db_session.init_db()
+
+    with sqlite3.connect(baseline_db) as conn:
+        for table in RESOURCE_TABLES:
+            foreign_keys = conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+            assert [(fk[2], fk[3], fk[6]) for fk in foreign_keys] == [("project", "project_id", "SET NULL")]
+            assert conn.execute(f"SELECT name, project_id FROM {table}").fetchall() != []
+        # Asset content is moved last and legacy hashes are filled in
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(asset)")]
+        assert columns[-1] == "content"
+        assert conn.execute("SELECT size, sha256 IS NOT NULL FROM asset").fetchone() == (4, 1)
+
+
+def test_migrated_foreign_keys_act_on_delete(baseline_db):
+    db_session.init_db()
+
+    with db_session.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM project WHERE id = 1")
+    with sqlite3.connect(baseline_db) as conn:
+        for table in RESOURCE_TABLES:
+            assert conn.execute(f"SELECT project_id FROM {table}").fetchall() == [(None,)]
+
+
+def test_migrated_database_is_not_rebuilt_again(baseline_db, monkeypatch):
+    db_session.init_db()
+
+    rebuilt = []
+    create_table = db_session.CreateTable
+    monkeypatch.setattr(db_session, "CreateTable", lambda table: rebuilt.append(table.name) or create_table(table))
+    monkeypatch.setattr(db_session, "_initialized", False)
+    db_session.init_db()
+    assert rebuilt == []
+
+
+def test_migration_keeps_unique_names_and_search_index(baseline_db):
+    db_session.init_db()
+
+    with sqlite3.connect(baseline_db) as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {f"ux_{table}_project_name" for table in RESOURCE_TABLES} <= indexes
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO template (name, content, project_id) VALUES ('greeting', '', 1)")
+        if "template_fts" in {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}:
+            hits = conn.execute("SELECT rowid FROM template_fts WHERE template_fts MATCH 'hello'").fetchall()
+            assert hits == [(1,)]
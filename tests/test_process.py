@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+import pytest
+
+from cli.engine.process import CommandResult, ProcessSupervisor
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="process groups and rusage are POSIX only")
+
+PYTHON = sys.executable
+
+
+def collect():
+    lines = []
+    return lines, lambda line, err: lines.append((line, err))
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_output_is_streamed_and_failures_keep_the_tail():
+    lines, echo = collect()
+    script = "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"
+    result = ProcessSupervisor(echo=echo).run([PYTHON, "-c", script], attach=False)
+
+    assert result.failure == "exit 3"
+    assert result.returncode == 3
+    assert sorted(lines) == [("err", True), ("out", False)]
+    assert sorted(result.tail) == ["err", "out"]
+    assert result.cpu is not None and result.max_rss is not None
+
+
+def test_capture_returns_stdout():
+    result = ProcessSupervisor().run("echo hello", shell=True, capture=True)
+    assert result.ok
+    assert result.output == "hello\n"
+
+
+def test_supervised_commands_get_no_stdin():
+    result = ProcessSupervisor().run([PYTHON, "-c", "import sys; print(repr(sys.stdin.read()))"], capture=True)
+    assert result.output.strip() == "''"
+
+
+def test_timeout_kills_command_and_its_children(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    # The command starts a grandchild that would outlive a plain kill of the command
+    script = (
+        "import subprocess, sys, time;"
+        f"p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']);"
+        f"open({str(pid_file)!r}, 'w').write(str(p.pid));"
+        "time.sleep(60)"
+    )
+    started = time.monotonic()
+    result = ProcessSupervisor().run([PYTHON, "-c", script], timeout=1)
+
+    assert result.failure == "timed out after 1s"
+    assert time.monotonic() - started < 10
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while alive(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not alive(child)
+
+
+def test_default_timeout_applies_and_per_call_timeout_overrides():
+    supervisor = ProcessSupervisor(timeout=0.5)
+    assert supervisor.run([PYTHON, "-c", "import time; time.sleep(30)"]).failure == "timed out after 0.5s"
+    assert supervisor.run([PYTHON, "-c", "import time; time.sleep(1)"], timeout=10).ok
+
+
+def test_run_timeout_is_shared_by_all_commands():
+    supervisor = ProcessSupervisor(total_timeout=1)
+    sleep = [PYTHON, "-c", "import time; time.sleep(30)"]
+
+    first = supervisor.run(sleep)
+    assert first.failure == "timed out (run time limit reached)"
+    second = supervisor.run(sleep)
+    assert second.failure == "not started (run time limit reached)"
+    assert [command for command, _ in supervisor.history] == [" ".join(sleep)] * 2
+
+    # A new run starts the clock again
+    supervisor.start()
+    assert supervisor.run([PYTHON, "-c", "pass"]).ok
+
+
+def test_attached_commands_inherit_stdio(capfd):
+    lines, echo = collect()
+    result = ProcessSupervisor(echo=echo).run([PYTHON, "-c", "print('direct')"])
+
+    assert result.ok
+    assert lines == [] and result.tail == []
+    assert "direct" in capfd.readouterr().out
+
+
+def test_usage_marks_rss_upper_bound():
+    exact = CommandResult(0, None, [], 1.5, 0.25, 2048, None)
+    bound = exact._replace(rss_upper_bound=True)
+    assert exact.usage() == "1.50s, cpu 0.25s, max rss 2.0 MB"
+    assert bound.usage() == "1.50s, cpu 0.25s, max rss ≤ 2.0 MB"
+
+
+def test_timed_out_run_is_reported_and_recipe_carries_on(tmp_path, monkeypatch):
+    from cli.engine.core import RecipeEngine
+    from cli.engine.reporter import Reporter
+
+    monkeypatch.chdir(tmp_path)
+    engine = RecipeEngine(reporter=Reporter(mode="quiet"), command_timeout=0.5)
+    engine.execute(f"""
+        r.run({{ "{PYTHON}", "-c", "import time; time.sleep(30)" }})
+        r.touch("after.txt", {{ content = "done" }})
+    """)
+
+    assert engine.reporter.errors == 1
+    (_, result), = engine.processes.history
+    assert result.failure == "timed out after 0.5s"
+    assert (tmp_path / "after.txt").read_text() == "done"
@@ -0,0 +1,76 @@
+import hashlib
+
+import pytest
+
+from cli.engine.core import RecipeEngine
+from cli.engine.reporter import Reporter
+from cli.engine.resolver import FsResolver
+
+
+class FallbackResolver:
+    """Stands in for the database: knows one template of another project."""
+
+    def template(self, name):
+        return "from the database" if name == "other::shared" else None
+
+    def recipe(self, name):
+        return None
+
+    def asset(self, name):
+        return None
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "demo"
+    (root / "templates" / "sub").mkdir(parents=True)
+    (root / "recipes").mkdir()
+    (root / "assets").mkdir()
+    (root / "templates" / "hello.j2").write_text("Hello {{ name }}!")
+    (root / "templates" / "sub" / "deep.j2").write_text("deep")
+    (root / "recipes" / "init.lua").write_text('r.template("hello", { destination = "out.txt", context = { name = "kt" } })')
+    (root / "assets" / "data.bin").write_bytes(b"\x00\x01" * 1000)
+    return root
+
+
+def test_resources_are_named_as_on_import(project):
+    resolver = FsResolver(str(project), "demo", base=FallbackResolver())
+
+    assert resolver.template("hello") == "Hello {{ name }}!"
+    assert resolver.template("demo::hello") == "Hello {{ name }}!"
+    assert resolver.template("sub/deep") == "deep"
+    assert resolver.recipe("init").startswith("r.template")
+    assert resolver.template("missing") is None
+
+
+def test_other_projects_resolve_through_base(project):
+    resolver = FsResolver(str(project), "demo", base=FallbackResolver())
+    assert resolver.template("other::shared") == "from the database"
+    assert resolver.template("other::hello") is None
+
+
+def test_asset_is_hashed_and_streamed_from_disk(project):
+    asset = FsResolver(str(project), "demo", base=FallbackResolver()).asset("data.bin")
+    data = b"\x00\x01" * 1000
+    assert asset.size == len(data)
+    assert asset.digest == hashlib.sha256(data).hexdigest()
+    assert b"".join(asset.chunks()) == data
+
+
+def test_edits_are_read_live_and_new_files_after_reindex(project):
+    resolver = FsResolver(str(project), "demo", base=FallbackResolver())
+    (project / "templates" / "hello.j2").write_text("changed")
+    assert resolver.template("hello") == "changed"
+
+    (project / "templates" / "new.j2").write_text("new")
+    assert resolver.template("new") is None
+    resolver.reindex()
+    assert resolver.template("new") == "new"
+
+
+def test_recipe_renders_from_working_tree(project, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    resolver = FsResolver(str(project), "demo", base=FallbackResolver())
+    engine = RecipeEngine(reporter=Reporter(mode="quiet"), resolver=resolver)
+    engine.execute(resolver.recipe("init"))
+    assert (tmp_path / "out.txt").read_text() == "Hello kt!"
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from cli.engine.core import RecipeEngine
+from cli.engine.reporter import Reporter
+from cli.engine.resolver import FsResolver
+from cli.engine.watch import Watcher
+
+
+class EmptyResolver:
+    def template(self, name):
+        return None
+
+    def recipe(self, name):
+        return None
+
+    def asset(self, name):
+        return None
+
+
+@pytest.mark.parametrize("polling", [False, True], ids=["native", "polling"])
+def test_watcher_batches_changes_and_skips_scratch_files(tmp_path, polling):
+    (tmp_path / "a.txt").write_text("a")
+    with Watcher(dirs=[str(tmp_path)], debounce=0.3, polling=polling) as watcher:
+        def edit():
+            (tmp_path / "a.txt").write_text("changed")
+            (tmp_path / "b.txt").write_text("new")
+            (tmp_path / ".a.txt.swp").write_text("editor scratch")
+        timer = threading.Timer(0.3, edit)
+        timer.start()
+        try:
+            changed = watcher.wait()
+        finally:
+            timer.join()
+    assert changed == {str(tmp_path / "a.txt"), str(tmp_path / "b.txt")}
+
+
+RECIPE = 'r.template("page", { destination = "page.txt", context = { n = 1 } })'
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "proj"
+    (root / "templates").mkdir(parents=True)
+    (root / "templates" / "page.j2").write_text("v1 {{ n }}")
+    out = tmp_path / "out"
+    out.mkdir()
+    monkeypatch.chdir(out)
+    return root, out
+
+
+def rerun(root, replace_own_outputs):
+    engine = RecipeEngine(reporter=Reporter(mode="quiet"), resolver=FsResolver(str(root), base=EmptyResolver()))
+    engine.replace_own_outputs = replace_own_outputs
+    engine.execute(RECIPE)
+    return engine
+
+
+def test_watch_reruns_replace_outputs_kt_wrote(project):
+    root, out = project
+    rerun(root, False)
+    assert (out / "page.txt").read_text() == "v1 1"
+
+    (root / "templates" / "page.j2").write_text("v2 {{ n }}")
+    # A plain run leaves the existing file alone without overwrite ...
+    rerun(root, False)
+    assert (out / "page.txt").read_text() == "v1 1"
+    # ... a watch re-run replaces it, since it is still what kt wrote
+    rerun(root, True)
+    assert (out / "page.txt").read_text() == "v2 1"
+
+
+def test_watch_reruns_keep_hand_edits(project):
+    root, out = project
+    rerun(root, True)
+    (out / "page.txt").write_text("edited by hand")
+
+    (root / "templates" / "page.j2").write_text("v2 {{ n }}")
+    rerun(root, True)
+    assert (out / "page.txt").read_text() == "edited by hand"